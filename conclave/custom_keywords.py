@@ -2,16 +2,33 @@
 def concurrent_keywords(self):
     return ['*','Concurrently ', '(background) Given ', '(background) When ', '(background) Then ', '(background) And ']
 
+def step_keyword_index(dialect):
+    """
+    Return the step keywords of a dialect indexed by their first character. The index is
+    built once per dialect and keeps the keywords in matching order
+    """
+    index = dialect.__dict__.get("step_keyword_index")
+    if index is None:
+        index = {}
+        keywords = (dialect.given_keywords +
+                    dialect.when_keywords +
+                    dialect.then_keywords +
+                    dialect.and_keywords +
+                    dialect.concurrent_keywords +
+                    dialect.but_keywords)
+        for keyword in keywords:
+            bucket = index.setdefault(keyword[:1], [])
+            if keyword not in bucket:
+                bucket.append(keyword)
+        dialect.step_keyword_index = index
+    return index
+
 def match_stepline(self,token):
-    keywords = (self.dialect.given_keywords +
-                self.dialect.when_keywords +
-                self.dialect.then_keywords +
-                self.dialect.and_keywords +
-                self.dialect.concurrent_keywords +
-                self.dialect.but_keywords)
-    for keyword in (k for k in keywords if token.line.startswith(k)):
-        title = token.line.get_rest_trimmed(len(keyword))
-        self._set_token_matched(token, 'StepLine', title, keyword)
-        return True
+    text = token.line.get_line_text()
+    for keyword in step_keyword_index(self.dialect).get(text[:1], ()):
+        if text.startswith(keyword):
+            title = token.line.get_rest_trimmed(len(keyword))
+            self._set_token_matched(token, 'StepLine', title, keyword)
+            return True
 
     return False
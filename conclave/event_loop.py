@@ -0,0 +1,47 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+from typing import Any, Coroutine
+
+
+class EventLoopThread:
+
+    """
+    Runs an asyncio event loop in a daemon thread. Coroutines can be submitted from any
+    thread and a concurrent.futures.Future is returned, so async scenarios can be
+    waited on together with the scenarios running in the thread and process pools
+    """
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.__run, daemon=True, name="paraworld-event-loop")
+        self.thread.start()
+
+    def __run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine) -> Any:
+        """
+        Run a coroutine on the event loop and wait for its result
+        """
+        return self.submit(coro).result()
+
+
+_eventLoops: dict[int, EventLoopThread] = {}
+_lock = threading.Lock()
+
+
+def getEventLoop() -> EventLoopThread:
+    """
+    Return the event loop shared by all async scenarios of the current process
+    """
+    with _lock:
+        # a forked worker process must not use the event loop thread of its parent
+        pid = os.getpid()
+        if pid not in _eventLoops:
+            _eventLoops[pid] = EventLoopThread()
+        return _eventLoops[pid]
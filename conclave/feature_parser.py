@@ -0,0 +1,97 @@
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+from typing import Any, Optional
+from gherkin.dialect import Dialect
+from gherkin.parser import Parser
+from gherkin.token_matcher import TokenMatcher
+from gherkin.token_scanner import TokenScanner
+
+from .custom_keywords import concurrent_keywords, match_stepline
+
+Dialect.concurrent_keywords = concurrent_keywords
+TokenMatcher.match_StepLine = match_stepline
+
+
+def parseFeatureFile(featureFile: str, cachedHash: str = None) -> tuple[str, Optional[dict[str, Any]]]:
+    """
+    Parse a feature file and return the hash of its content together with its gherkin
+    document. When the content still has the cached hash the file is not parsed again
+    and None is returned instead of the document
+    """
+    with open(featureFile, "r", encoding='utf8') as fh:
+        content = fh.read()
+    contentHash = hashlib.sha256(content.encode()).hexdigest()
+    if contentHash == cachedHash:
+        return contentHash, None
+    # the content is passed to the scanner, which otherwise opens the file itself
+    return contentHash, Parser().parse(TokenScanner(content))
+
+
+class FeatureParser:
+
+    """
+    Parses feature files into gherkin documents. Files are parsed in a process pool when
+    there are many of them and the documents can be cached on disk, so that only the
+    files that changed since the last run are parsed again. The cache is keyed by the
+    path of the file, its modification time and the hash of its content.
+    """
+    # below this number of files starting the worker processes costs more than it saves
+    minFilesForPool = 16
+
+    def __init__(self, cacheFile: str = None, maxProcesses: int = None, startMethod: str = "spawn") -> None:
+        self.cacheFile = cacheFile
+        self.maxProcesses = maxProcesses if maxProcesses is not None else multiprocessing.cpu_count()
+        self.startMethod = startMethod
+        self.cache: dict[str, dict[str, Any]] = {}
+        self.parsedFiles = 0
+        self.cachedFiles = 0
+        if cacheFile is not None and os.path.isfile(cacheFile):
+            with open(cacheFile, "r", encoding='utf8') as fh:
+                self.cache = json.load(fh).get("files", {})
+
+    def parseFiles(self, featureFiles: list[str]) -> list[tuple[str, dict[str, Any]]]:
+        """
+        Parse the feature files and return the file names with their gherkin documents in
+        the order of the files
+        """
+        documents: dict[str, dict[str, Any]] = {}
+        stale: list[str] = []
+        for featureFile in featureFiles:
+            entry = self.cache.get(featureFile)
+            if entry is not None and entry["mtime"] == os.stat(featureFile).st_mtime_ns:
+                documents[featureFile] = entry["document"]
+            else:
+                stale.append(featureFile)
+
+        cachedHashes = [self.cache[f]["hash"] if f in self.cache else None for f in stale]
+        if self.maxProcesses > 1 and len(stale) >= self.minFilesForPool:
+            processes = min(self.maxProcesses, len(stale))
+            with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context(self.startMethod)) as pool:
+                results = list(pool.map(parseFeatureFile, stale, cachedHashes, chunksize=math.ceil(len(stale) / (processes * 4))))
+        else:
+            results = [parseFeatureFile(f, h) for f,h in zip(stale, cachedHashes)]
+
+        for featureFile,(contentHash,document) in zip(stale, results):
+            if document is None:
+                # touched but not changed
+                document = self.cache[featureFile]["document"]
+            else:
+                self.parsedFiles += 1
+            self.cache[featureFile] = {"mtime": os.stat(featureFile).st_mtime_ns, "hash": contentHash, "document": document}
+            documents[featureFile] = document
+        self.cachedFiles += len(featureFiles) - len([d for _,d in results if d is not None])
+
+        if self.cacheFile is not None and stale:
+            self.save()
+        return [(f, documents[f]) for f in featureFiles]
+
+    def save(self):
+        dirs = os.path.dirname(self.cacheFile)
+        if dirs:
+            os.makedirs(dirs, exist_ok=True)
+        with open(self.cacheFile, "w", encoding='utf8') as fh:
+            json.dump({"files": self.cache}, fh)
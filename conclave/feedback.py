@@ -1,63 +1,151 @@
+import copy
 from dataclasses import asdict
 from multiprocessing import Process
+from multiprocessing.connection import wait
 import multiprocessing
 import os
-import time
-import queue
-from typing import Any
+import threading
+from typing import Any, Optional
 
-from .feedback_schema import BaseFeedback, ScenarioFeedback, StepFeedback
+from .feedback_channel import FeedbackChannel
+from .feedback_schema import BaseFeedback, FeatureInfo, FeedbackStatus, ScenarioFeedback, ScenarioInfo, StepFeedback
 from .feedback_adapter import FeedbackAdapter
+from .feedback_worker import AdapterStats, FeedbackAdapterWorker, OverflowPolicy
 
 class Feedback:
 
+    """
+    Delivers the feedback of scenarios and steps to the feedback adapters in a separate
+    process. Scenarios send batches of records through the FeedbackChannel over a pipe:
+    ("meta", key, scenarioInfo, featureInfo, scenarioId) once per scenario run,
+    ("step", key, ...) for every step event and ("scenario", message) for scenario events.
+    The feedback process turns them back into ScenarioFeedback and StepFeedback objects and
+    hands them to a FeedbackAdapterWorker per adapter, so a slow adapter only delays itself.
+    The metadata of a scenario is dropped once its final record has been handed over
+    """
     def __init__(self) -> None:
-        self.messageQueue = multiprocessing.Manager().Queue()
-        self.adapters: list[FeedbackAdapter] = []
+        # locks created in a fork context can not be shared with spawned worker processes
+        self.messageQueue = multiprocessing.get_context("spawn").SimpleQueue()
+        self.channel = FeedbackChannel(self.messageQueue)
+        self.adapters: list[tuple[FeedbackAdapter, dict[str, Any]]] = []
+        self.statsReader,self.statsWriter = multiprocessing.Pipe(duplex=False)
+        self.statsLock = threading.Lock()
+        self.stats: list[AdapterStats] = []
+        self.metadata: dict[str, tuple[ScenarioInfo, FeatureInfo]] = {}
+        self.metadataKeys: dict[str, list[str]] = {}
         self.process = Process(daemon=True,target=self.runFeedback, args=(self.messageQueue,))
 
-    def runFeedback(self,q: multiprocessing.Queue):
+    def runFeedback(self,q: multiprocessing.SimpleQueue):
         selfPid = os.getpid()
+        metadata = self.metadata
+        workers = [FeedbackAdapterWorker(adapter, **options) for adapter,options in self.adapters]
         while True:
-            try:
-                msg = q.get(block=True)
-                #print(f"message recv: {msg}")
-                if msg == "STOP":
-                    break
-                else:
-                    for adapter in self.adapters:
-                        fb = asdict(BaseFeedback())
-                        fb = BaseFeedback(**{k:(msg[k] if k in msg else v) for k,v in fb.items()})
-                        if fb.type == "ScenarioFeedback":
-                            sfb = asdict(ScenarioFeedback())
-                            sfb = ScenarioFeedback(**{k:(msg[k] if k in msg else v) for k,v in sfb.items()})
-                            try:
-                                adapter.onNotifyScenario(sfb)
-                            except Exception as e:
-                                print(f"notify feedback failed: {e}")
-                        elif fb.type == "StepFeedback":
-                            sfb = asdict(StepFeedback())
-                            sfb = StepFeedback(**{k:(msg[k] if k in msg else v) for k,v in sfb.items()})
-                            try:
-                                adapter.onNotifyStep(sfb)
-                            except Exception as e:
-                                print(f"notify feedback failed: {e}")
-            except queue.Empty:
-                pass
+            batch = q.get()
+            #print(f"message recv: {batch}")
+            if batch == "STOP":
+                for worker in workers:
+                    worker.stop()
+                self.statsWriter.send([worker.stats for worker in workers])
+                break
+            elif batch[0] == "adapter":
+                workers.append(FeedbackAdapterWorker(batch[1], **batch[2]))
+            elif batch[0] == "stats":
+                self.statsWriter.send([copy.copy(worker.stats) for worker in workers])
+            else:
+                for record in batch:
+                    if record[0] == "meta":
+                        metadata[record[1]] = (ScenarioInfo(*record[2]), FeatureInfo(*record[3]))
+                        # a retried scenario sends its metadata once per run
+                        self.metadataKeys.setdefault(record[4], []).append(record[1])
+                    elif record[0] == "step":
+                        for worker in workers:
+                            worker.put(self.__getStepFeedback(record, metadata))
+                    else:
+                        for worker in workers:
+                            feedback = self.__getScenarioFeedback(record[1])
+                            if feedback is not None:
+                                worker.put(feedback)
+                        msg = record[1]
+                        if msg.get("type") == "ScenarioFeedback" and msg.get("status") != FeedbackStatus.STARTING:
+                            # the final record of the scenario, its step events have all been received
+                            for key in self.metadataKeys.pop(msg.get("id"), []):
+                                metadata.pop(key, None)
+
+    def __getScenarioFeedback(self, msg: dict[str, Any]) -> Optional[ScenarioFeedback]:
+        fb = asdict(BaseFeedback())
+        fb = BaseFeedback(**{k:(msg[k] if k in msg else v) for k,v in fb.items()})
+        if fb.type != "ScenarioFeedback":
+            return None
+        sfb = asdict(ScenarioFeedback())
+        return ScenarioFeedback(**{k:(msg[k] if k in msg else v) for k,v in sfb.items()})
+
+    def __getStepFeedback(self, record: tuple, metadata: dict[str, tuple[ScenarioInfo, FeatureInfo]]) -> StepFeedback:
+        _,key,status,threadId,pid,start,end,elapsed,error,log,line,column,keyword,text = record
+        scenario,feature = metadata.get(key, (None, None))
+        return StepFeedback(
+            threadId=threadId,
+            pid=pid,
+            startTime=start,
+            endTime=end,
+            elapsed=elapsed,
+            status=status,
+            error=error,
+            log=log,
+            line=line,
+            column=column,
+            keyword=keyword,
+            text=text,
+            # adapters have always received the scenario and feature as dictionaries
+            scenario=asdict(scenario) if scenario else None,
+            feature=asdict(feature) if feature else None,
+            scenarioKey=key
+        )
 
     def startFeedback(self):
         self.process.start()
     
     def stopFeedback(self):
-        self.messageQueue.put_nowait("STOP")
+        self.channel.flush()
+        self.messageQueue.put("STOP")
+        with self.statsLock:
+            # stop waiting for the counters if the feedback process exits without sending them
+            if self.process.is_alive() and self.statsReader in wait([self.statsReader, self.process.sentinel], timeout=120):
+                self.stats = self.statsReader.recv()
         self.process.join(timeout=120)
+
+    def getStats(self) -> list[AdapterStats]:
+        """
+        Return the counters of the adapters. After the feedback has been stopped the final
+        counters are returned
+        """
+        if not self.process.is_alive():
+            return self.stats
+        with self.statsLock:
+            self.messageQueue.put(("stats",))
+            if self.statsReader in wait([self.statsReader, self.process.sentinel], timeout=10):
+                return self.statsReader.recv()
+        return []
     
     def notify(self, msg: Any):
+        """
+        Send a scenario feedback message or a batch of records received from a remote worker
+        """
         try:
-            self.messageQueue.put_nowait(msg)
+            if isinstance(msg, list):
+                self.messageQueue.put(msg)
+            else:
+                self.channel.put_nowait(msg)
         except Exception as e:
             pass
     
-    def addAdapter(self,adapter: FeedbackAdapter):
-        self.adapters.append(adapter)
+    def addAdapter(self,adapter: FeedbackAdapter, maxBuffer: int = 10000, overflow: str = OverflowPolicy.BLOCK, batchSize: int = 100):
+        """
+        Add an adapter. Adapters added after the feedback has started are sent to the
+        feedback process and must be picklable
+        """
+        FeedbackAdapterWorker.validateOptions(maxBuffer, overflow, batchSize)
+        options = {"maxBuffer": maxBuffer, "overflow": overflow, "batchSize": batchSize}
+        self.adapters.append((adapter, options))
+        if self.process.is_alive():
+            self.messageQueue.put(("adapter", adapter, options))
     
@@ -1,3 +1,5 @@
+from typing import Union
+
 from .feedback_schema import ScenarioFeedback, StepFeedback
 
 class FeedbackAdapter:
@@ -11,6 +13,17 @@ class FeedbackAdapter:
     def onNotifyStep(self,schema: StepFeedback):
         raise NotImplementedError
 
+    def onNotifyBatch(self,events: list[Union[ScenarioFeedback, StepFeedback]]):
+        """
+        Called with the next events in the order they were sent. Override it to handle
+        events in batches. By default every event is passed to onNotifyScenario or onNotifyStep
+        """
+        for event in events:
+            if isinstance(event, ScenarioFeedback):
+                self.onNotifyScenario(event)
+            else:
+                self.onNotifyStep(event)
+
 
 class NullFeedbackAdapter(FeedbackAdapter):
 
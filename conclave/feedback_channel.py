@@ -0,0 +1,171 @@
+from dataclasses import astuple
+import multiprocessing
+import multiprocessing.context
+import multiprocessing.queues
+import os
+import threading
+import time
+import uuid
+from typing import Any
+
+from .feedback_schema import FeatureInfo, ScenarioInfo
+
+
+class _Batcher:
+
+    """
+    Collects the feedback records of a process and puts them on the transport as one
+    batch. A batch is sent when it is full or after the flush interval, and the flush
+    thread only wakes up when there are records to send
+    """
+    def __init__(self, transport: Any, interval: float, maxBatch: int) -> None:
+        self.transport = transport
+        self.interval = interval
+        self.maxBatch = maxBatch
+        self.buffer: list[tuple] = []
+        self.condition = threading.Condition()
+        self.sendLock = threading.Lock()
+        self.thread = threading.Thread(target=self.__run, daemon=True, name="paraworld-feedback")
+        self.thread.start()
+
+    def add(self, record: tuple):
+        with self.condition:
+            self.buffer.append(record)
+            full = len(self.buffer) >= self.maxBatch
+            self.condition.notify()
+        if full:
+            self.flush()
+
+    def flush(self):
+        # the send lock keeps the batches in the order their records were added
+        with self.sendLock:
+            with self.condition:
+                batch,self.buffer = self.buffer,[]
+            if batch:
+                try:
+                    self.transport.put(batch)
+                except Exception:
+                    pass
+
+    def __run(self):
+        while True:
+            with self.condition:
+                while not self.buffer:
+                    self.condition.wait()
+            # give the records of the next steps a chance to join the batch
+            time.sleep(self.interval)
+            self.flush()
+
+
+_transports: dict[str, Any] = {}
+_batchers: dict[tuple[int, str], _Batcher] = {}
+_lock = threading.Lock()
+
+
+class FeedbackChannel:
+
+    """
+    Sends feedback from scenarios and steps to the feedback process. Records are batched
+    per process and flushed on a short interval. Step events are small tuples that refer
+    to the scenario and feature metadata, which every ScenarioFeedbackSender sends once.
+
+    The channel is passed to the scenarios in place of a queue. A transport created with
+    multiprocessing.SimpleQueue can only be shared with a process when it is started,
+    so worker processes receive it through the pool initializer and every other copy of
+    the channel finds it by the name of the channel
+    """
+    def __init__(self, transport: Any, interval: float = 0.05, maxBatch: int = 500) -> None:
+        self.name = uuid.uuid4().hex
+        self.transport = transport
+        self.interval = interval
+        self.maxBatch = maxBatch
+        _transports[self.name] = transport
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if isinstance(state["transport"], multiprocessing.queues.SimpleQueue) and multiprocessing.context.get_spawning_popen() is None:
+            state["transport"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.transport is not None:
+            _transports.setdefault(self.name, self.transport)
+
+    def __getBatcher(self) -> _Batcher:
+        key = (os.getpid(), self.name)
+        batcher = _batchers.get(key)
+        if batcher is None:
+            with _lock:
+                # a forked process must not use the flush thread of its parent
+                if key not in _batchers:
+                    transport = self.transport if self.transport is not None else _transports.get(self.name)
+                    if transport is None:
+                        return None
+                    _batchers[key] = _Batcher(transport, self.interval, self.maxBatch)
+                batcher = _batchers[key]
+        return batcher
+
+    def send(self, record: tuple):
+        batcher = self.__getBatcher()
+        if batcher is not None:
+            batcher.add(record)
+
+    def put_nowait(self, msg: dict[str, Any]):
+        """
+        Send a scenario feedback message given as a dictionary
+        """
+        self.send(("scenario", msg))
+
+    def flush(self):
+        batcher = self.__getBatcher()
+        if batcher is not None:
+            batcher.flush()
+
+    def forScenario(self, gherkinScenario: Any, gherkinFeature: Any, scenarioId: str = None) -> "ScenarioFeedbackSender":
+        return ScenarioFeedbackSender(self, gherkinScenario, gherkinFeature, scenarioId)
+
+
+class ScenarioFeedbackSender:
+
+    """
+    Sends the feedback of a single scenario run. The scenario and feature metadata are
+    sent with the first step event and the step events only carry the key of the metadata.
+    The metadata also carries the scenario id, so the feedback process can drop it once the
+    final record of the scenario has been delivered
+    """
+    def __init__(self, channel: FeedbackChannel, gherkinScenario: Any, gherkinFeature: Any, scenarioId: str = None) -> None:
+        self.channel = channel
+        self.gherkinScenario = gherkinScenario
+        self.gherkinFeature = gherkinFeature
+        self.scenarioId = scenarioId
+        self.key: str = None
+
+    def __sendMetadata(self):
+        scenario = ScenarioInfo(
+            name=self.gherkinScenario["name"],
+            column=self.gherkinScenario["location"]["column"],
+            line=self.gherkinScenario["location"]["line"],
+            description=self.gherkinScenario["description"],
+            tags=[t["name"] for t in self.gherkinScenario["tags"]],
+            numberOfSteps=len(self.gherkinScenario["steps"])
+        )
+        feature = FeatureInfo(
+            description=self.gherkinFeature["description"],
+            name=self.gherkinFeature["name"],
+            tags=[t["name"] for t in self.gherkinFeature["tags"]]
+        )
+        self.key = uuid.uuid4().hex
+        self.channel.send(("meta", self.key, astuple(scenario), astuple(feature), self.scenarioId))
+
+    def step(self, step: Any, status: str, error: str, elapsed: float, pid: int, threadId: int, start: Any, end: Any, log: str):
+        if self.key is None:
+            self.__sendMetadata()
+        self.channel.send(("step", self.key, status, threadId, pid, start, end, elapsed, error, log,
+                           step["location"]["line"], step["location"]["column"], step["keyword"], step["text"]))
+
+    def put_nowait(self, msg: dict[str, Any]):
+        self.channel.put_nowait(msg)
+
+    def flush(self):
+        self.channel.flush()
@@ -62,4 +62,5 @@ class StepFeedback(BaseFeedback):
     text: str = None
     feature: FeatureInfo = None
     scenario: ScenarioInfo = None
+    scenarioKey: str = None
 
@@ -0,0 +1,151 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+import itertools
+import threading
+from typing import Any, Union
+
+from .feedback_adapter import FeedbackAdapter
+from .feedback_schema import ScenarioFeedback, StepFeedback
+
+
+class OverflowPolicy:
+    BLOCK = 'block'
+    DROP_OLDEST = 'drop-oldest'
+    COALESCE = 'coalesce'
+
+
+@dataclass
+class AdapterStats:
+    adapter: str
+    delivered: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    failed: int = 0
+    pending: int = 0
+    maxPending: int = 0
+    blocked: int = 0
+
+
+class FeedbackAdapterWorker:
+
+    """
+    Runs a feedback adapter in its own thread of the feedback process so a slow adapter
+    does not hold back the others. Events wait in a buffer of at most maxBuffer events.
+    When the buffer is full the overflow policy decides what happens to a new event:
+
+    block        wait until the adapter made room, which slows down the feedback
+    drop-oldest  drop the oldest event in the buffer
+    coalesce     replace the pending event of the same scenario run or step of that
+                 run with the new one. The oldest event is dropped when there is
+                 nothing to replace
+
+    The adapter receives up to batchSize events at a time through onNotifyBatch
+    """
+    def __init__(self, adapter: FeedbackAdapter, maxBuffer: int = 10000, overflow: str = OverflowPolicy.BLOCK, batchSize: int = 100) -> None:
+        FeedbackAdapterWorker.validateOptions(maxBuffer, overflow, batchSize)
+        self.adapter = adapter
+        self.maxBuffer = maxBuffer
+        self.overflow = overflow
+        self.batchSize = batchSize
+        self.stats = AdapterStats(adapter=type(adapter).__name__)
+        self.buffer: OrderedDict[Any, Union[ScenarioFeedback, StepFeedback]] = OrderedDict()
+        self.sequence = itertools.count()
+        # coalesce key of a pending event to its key in the buffer
+        self.pendingKeys: dict[tuple, int] = {}
+        self.stopped = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.__run, daemon=True, name=f"paraworld-adapter-{self.stats.adapter}")
+        self.thread.start()
+
+    @staticmethod
+    def validateOptions(maxBuffer: int, overflow: str, batchSize: int):
+        if overflow not in (OverflowPolicy.BLOCK, OverflowPolicy.DROP_OLDEST, OverflowPolicy.COALESCE):
+            raise ValueError(f"unsupported overflow policy: {overflow}")
+        if maxBuffer < 1 or batchSize < 1:
+            raise ValueError("maxBuffer and batchSize must be at least 1")
+
+    @staticmethod
+    def __coalesceKey(event: Union[ScenarioFeedback, StepFeedback]) -> tuple:
+        # outline rows and scenarios of the same name in other features have their own
+        # id and their own key, so only events of the same run replace each other
+        if isinstance(event, ScenarioFeedback):
+            return ("scenario", event.id)
+        return ("step", event.scenarioKey, event.line, event.column)
+
+    def put(self, event: Union[ScenarioFeedback, StepFeedback]):
+        with self.condition:
+            if len(self.buffer) >= self.maxBuffer:
+                if self.overflow == OverflowPolicy.BLOCK:
+                    self.stats.blocked += 1
+                    while len(self.buffer) >= self.maxBuffer and not self.stopped:
+                        self.condition.wait()
+                elif self.overflow == OverflowPolicy.COALESCE and self.__coalesce(event):
+                    return
+                else:
+                    self.__popOldest()
+                    self.stats.dropped += 1
+            key = next(self.sequence)
+            self.buffer[key] = event
+            if self.overflow == OverflowPolicy.COALESCE:
+                self.pendingKeys[self.__coalesceKey(event)] = key
+            self.stats.pending = len(self.buffer)
+            self.stats.maxPending = max(self.stats.maxPending, self.stats.pending)
+            self.condition.notify_all()
+
+    def __coalesce(self, event: Union[ScenarioFeedback, StepFeedback]) -> bool:
+        key = self.pendingKeys.get(self.__coalesceKey(event))
+        if key is None:
+            return False
+        self.buffer[key] = event
+        self.stats.coalesced += 1
+        return True
+
+    def __popOldest(self) -> Union[ScenarioFeedback, StepFeedback]:
+        key,event = self.buffer.popitem(last=False)
+        if self.overflow == OverflowPolicy.COALESCE:
+            coalesceKey = self.__coalesceKey(event)
+            if self.pendingKeys.get(coalesceKey) == key:
+                del self.pendingKeys[coalesceKey]
+        return event
+
+    def stop(self, timeout: float = None):
+        """
+        Deliver the remaining events and stop the worker
+        """
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        self.thread.join(timeout)
+
+    def __run(self):
+        while True:
+            with self.condition:
+                while not self.buffer and not self.stopped:
+                    self.condition.wait()
+                if not self.buffer:
+                    return
+                batch = [self.__popOldest() for _ in range(min(self.batchSize, len(self.buffer)))]
+                self.stats.pending = len(self.buffer)
+                self.condition.notify_all()
+            self.__deliver(batch)
+
+    def __deliver(self, batch: list[Union[ScenarioFeedback, StepFeedback]]):
+        onNotifyBatch = getattr(type(self.adapter), "onNotifyBatch", None)
+        if onNotifyBatch is not None and onNotifyBatch is not FeedbackAdapter.onNotifyBatch:
+            try:
+                self.adapter.onNotifyBatch(batch)
+                self.stats.delivered += len(batch)
+            except Exception as e:
+                self.stats.failed += len(batch)
+                print(f"notify feedback failed: {e}")
+            return
+        for event in batch:
+            try:
+                if isinstance(event, ScenarioFeedback):
+                    self.adapter.onNotifyScenario(event)
+                else:
+                    self.adapter.onNotifyStep(event)
+                self.stats.delivered += 1
+            except Exception as e:
+                self.stats.failed += 1
+                print(f"notify feedback failed: {e}")
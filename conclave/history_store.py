@@ -0,0 +1,161 @@
+from contextlib import closing
+from dataclasses import dataclass
+import os
+import sqlite3
+from typing import Any, Optional
+
+from .scenario_history import ScenarioHistory
+from .task import Task
+from .testresult_info import TestResultInfo
+
+
+def percentile(values: list[float], p: float) -> Optional[float]:
+    """
+    Calculate the p-th percentile (0-100) of a list of values using linear interpolation
+    """
+    if not values:
+        return None
+    values = sorted(values)
+    rank = (len(values) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+@dataclass
+class ScenarioStats:
+    id: str
+    name: str
+    feature: str
+    runs: int
+    p50: float
+    p95: float
+    failureRate: float
+
+
+class HistoryStore:
+
+    """
+    Embedded SQLite store that records the result of every run, scenario and step so
+    that timings and failure rates can be queried across runs.
+
+    Example usage:
+
+    store = HistoryStore("history.db")
+    tr = TaskRunner(historyStore=store)
+    tr.run(["my.feature"])
+    for stats in store.getScenarioStats():
+        print(f"{stats.name}: p95 {stats.p95}")
+    """
+    def __init__(self, fileName: str = "paraworld_history.db") -> None:
+        self.fileName = fileName
+        dirs = os.path.dirname(fileName)
+        if dirs:
+            os.makedirs(dirs, exist_ok=True)
+        with closing(self.__connect()) as conn, conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    start TEXT, end TEXT, elapsed REAL, success INTEGER, numCpu INTEGER, pid INTEGER
+                );
+                CREATE TABLE IF NOT EXISTS scenarios (
+                    runId INTEGER, scenarioId TEXT, name TEXT, feature TEXT, featureFile TEXT,
+                    status TEXT, elapsed REAL, pid INTEGER, threadId INTEGER, mode TEXT,
+                    startTime TEXT, endTime TEXT
+                );
+                CREATE TABLE IF NOT EXISTS steps (
+                    runId INTEGER, scenarioId TEXT, stepIndex INTEGER, keyword TEXT, text TEXT, line INTEGER,
+                    status TEXT, elapsed REAL, pid INTEGER, threadId INTEGER, startTime TEXT, endTime TEXT
+                );
+                CREATE INDEX IF NOT EXISTS scenarios_scenarioId ON scenarios (scenarioId);
+                CREATE INDEX IF NOT EXISTS steps_scenarioId ON steps (scenarioId);
+            """)
+
+    def __connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.fileName, timeout=60)
+
+    def recordRun(self, taskReport: Any, testResult: TestResultInfo) -> int:
+        """
+        Record a run with all its scenarios and steps. Returns the id of the run
+        """
+        with closing(self.__connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO runs (start, end, elapsed, success, numCpu, pid) VALUES (?,?,?,?,?,?)",
+                (testResult.start, testResult.end, testResult.elapsed, int(testResult.success), testResult.numCpu, testResult.pid)
+            )
+            runId = cursor.lastrowid
+            scenarioRows = []
+            stepRows = []
+            for t in taskReport:
+                task: Task = t["task"]
+                result = t["scenario"]
+                scenarioRows.append((
+                    # cached scenarios did not run so they are kept out of the timing statistics
+                    runId, t["id"], t["name"], t["feature"], task.featureFile, "cached" if t.get("cached") else t["status"], t["elapsed"],
+                    result.pid if result else None, result.threadId if result else None, task.getMode(),
+                    str(result.startTime) if result and result.startTime else None,
+                    str(result.endTime) if result and result.endTime else None
+                ))
+                if result and result.steps:
+                    for index,step in enumerate(result.steps):
+                        stepRows.append((
+                            runId, t["id"], index, step["keyword"], step["text"], step["location"]["line"],
+                            step.get("status"), step.get("elapsed"), step.get("pid"), step.get("threadId"),
+                            str(step["start"]) if step.get("start") else None,
+                            str(step["end"]) if step.get("end") else None
+                        ))
+            conn.executemany("INSERT INTO scenarios VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", scenarioRows)
+            conn.executemany("INSERT INTO steps VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", stepRows)
+        return runId
+
+    def __getScenarioRows(self, scenarioId: str = None, lastRuns: int = None) -> list[tuple]:
+        query = "SELECT scenarioId, name, feature, status, elapsed FROM scenarios WHERE status IN ('success','failed')"
+        params = []
+        if scenarioId is not None:
+            query += " AND scenarioId = ?"
+            params.append(scenarioId)
+        if lastRuns is not None:
+            query += " AND runId IN (SELECT id FROM runs ORDER BY id DESC LIMIT ?)"
+            params.append(lastRuns)
+        query += " ORDER BY runId"
+        with closing(self.__connect()) as conn:
+            return conn.execute(query, params).fetchall()
+
+    def getDurationPercentile(self, scenarioId: str, p: float, lastRuns: int = None) -> Optional[float]:
+        return percentile([r[4] for r in self.__getScenarioRows(scenarioId, lastRuns)], p)
+
+    def getFailureRate(self, scenarioId: str, lastRuns: int = None) -> float:
+        rows = self.__getScenarioRows(scenarioId, lastRuns)
+        if not rows:
+            return 0.0
+        return len([r for r in rows if r[3] == "failed"]) / len(rows)
+
+    def getScenarioStats(self, lastRuns: int = None) -> list[ScenarioStats]:
+        """
+        Return the p50/p95 elapsed time and failure rate of every executed scenario
+        """
+        scenarios: dict[str, list[tuple]] = {}
+        for row in self.__getScenarioRows(lastRuns=lastRuns):
+            scenarios.setdefault(row[0], []).append(row)
+        stats = []
+        for scenarioId,rows in scenarios.items():
+            durations = [r[4] for r in rows]
+            stats.append(ScenarioStats(
+                id=scenarioId,
+                name=rows[-1][1],
+                feature=rows[-1][2],
+                runs=len(rows),
+                p50=percentile(durations, 50),
+                p95=percentile(durations, 95),
+                failureRate=len([r for r in rows if r[3] == "failed"]) / len(rows)
+            ))
+        return stats
+
+    def getScenarioHistory(self, lastRuns: int = 10) -> ScenarioHistory:
+        """
+        Return a ScenarioHistory of the latest runs that can be used by the scheduling policies
+        """
+        history = ScenarioHistory(maxSamples=lastRuns if lastRuns else 10)
+        for row in self.__getScenarioRows(lastRuns=lastRuns):
+            history.record(row[0], row[4], row[3] == "failed")
+        return history
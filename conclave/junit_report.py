@@ -78,6 +78,15 @@ class JUnitReport(TemplateBase):
     def __getAllFailedFeatures(self, features: Any):
         return len(list(filter(lambda f: f['status'] == 'failed', features)))
 
+    def __getLogs(self, result: Any) -> str:
+        """
+        Return the log of a scenario. A scenario with a log file references the file as an
+        attachment, since its log may have been truncated
+        """
+        if not getattr(result, "logFile", None):
+            return result.message
+        return f"{result.message or ''}[[ATTACHMENT|{result.logFile}]]\n"
+
     def generateReport(self,taskReport: Any, testResult: TestResultInfo, outputFilename="junit_output.xml"):
         features = []
         for key, group in groupby(sorted(taskReport,key=lambda x:x["feature"]), lambda x: x["feature"]):
@@ -90,7 +99,7 @@ class JUnitReport(TemplateBase):
                 scenario: Scenario = task.scenario
                 feature: Any = task.feature
                 if t['scenario']:
-                    scenarios.append({"detail": t['scenario'].scenario, "status": t["status"], "elapsed": t["elapsed"], "error": t["error"], "startTime": t['scenario'].startTime, "endTime": t['scenario'].endTime, "logs": t['scenario'].message})
+                    scenarios.append({"detail": t['scenario'].scenario, "status": t["status"], "elapsed": t["elapsed"], "error": t["error"], "startTime": t['scenario'].startTime, "endTime": t['scenario'].endTime, "logs": self.__getLogs(t['scenario'])})
                 else:
                     scenarios.append({"detail": scenario.gherkinScenario, "status": t["status"], "elapsed": t["elapsed"], "error": t["error"], "logs": None})
             features.append({"name": key, "status": featureStatus, "scenarios":scenarios, "description": feature['description']})
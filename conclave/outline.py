@@ -0,0 +1,43 @@
+import copy
+import re
+from typing import Any, Optional
+
+
+def _substitute(text: str, values: dict[str, str]) -> str:
+    return re.sub(r"<([^<>]+)>", lambda m: values.get(m.group(1), m.group(0)), text)
+
+
+def expandOutline(scenario: Any) -> list[tuple[Any, Optional[int]]]:
+    """
+    Expand a Scenario Outline into one scenario per row of its Examples tables. The
+    placeholders in the name, steps, doc strings and data tables are replaced by the
+    values of the row and each row gets the tags of the outline and of its Examples.
+    Returns the scenarios together with their row number counted over all Examples
+    tables. A scenario without Examples is returned as is with no row number
+    """
+    if not scenario.get("examples"):
+        return [(scenario, None)]
+    expanded = []
+    rowNumber = 0
+    for exampleIndex,examples in enumerate(scenario["examples"], 1):
+        header = [c["value"] for c in examples.get("tableHeader", {}).get("cells", [])]
+        for rowIndex,row in enumerate(examples.get("tableBody", []), 1):
+            rowNumber += 1
+            values = dict(zip(header, [c["value"] for c in row["cells"]]))
+            steps = copy.deepcopy(scenario["steps"])
+            for step in steps:
+                step["text"] = _substitute(step["text"], values)
+                if "docString" in step:
+                    step["docString"]["content"] = _substitute(step["docString"]["content"], values)
+                for tableRow in step.get("dataTable", {}).get("rows", []):
+                    for cell in tableRow["cells"]:
+                        cell["value"] = _substitute(cell["value"], values)
+            rowScenario = {k: v for k,v in scenario.items() if k not in ("steps","examples")}
+            rowScenario["name"] = f"{_substitute(scenario['name'], values)} -- @{exampleIndex}.{rowIndex} {examples['name']}".rstrip()
+            rowScenario["tags"] = scenario["tags"] + examples["tags"]
+            # the row location makes the derived scenario id unique for every row
+            rowScenario["location"] = row["location"]
+            rowScenario["steps"] = steps
+            rowScenario["examples"] = []
+            expanded.append((rowScenario, rowNumber))
+    return expanded
@@ -0,0 +1,107 @@
+import contextlib
+import contextvars
+import io
+import sys
+import threading
+from typing import Any, Optional
+
+from .task_logger import TaskLogger
+
+
+class StepOutput:
+
+    """
+    Output captured from a step. Complete lines are written to the log of the step and
+    a line longer than maxLine characters is written in parts, so a step writing without
+    newlines does not grow the buffer
+    """
+    def __init__(self, logger: TaskLogger, maxLine: int = 65536) -> None:
+        self.logger = logger
+        self.maxLine = maxLine
+        self.partial: dict[str, str] = {}
+        self.lock = threading.Lock()
+
+    def write(self, stream: str, text: str):
+        with self.lock:
+            lines = (self.partial.pop(stream, "") + text).split("\n")
+            rest = lines.pop()
+            while len(rest) > self.maxLine:
+                lines.append(rest[:self.maxLine])
+                rest = rest[self.maxLine:]
+            if rest:
+                self.partial[stream] = rest
+        for line in lines:
+            self.logger.output(stream, line)
+
+    def flush(self):
+        with self.lock:
+            partial,self.partial = self.partial,{}
+        for stream,line in partial.items():
+            self.logger.output(stream, line)
+
+
+_current: contextvars.ContextVar[Optional[StepOutput]] = contextvars.ContextVar("paraworld_step_output", default=None)
+_lock = threading.Lock()
+
+
+class _CaptureStream(io.TextIOBase):
+
+    """
+    Replaces sys.stdout or sys.stderr. Text written while a step captures its output goes
+    to the step and everything else goes to the original stream
+    """
+    def __init__(self, name: str, original: Any) -> None:
+        self.name = name
+        self.original = original
+
+    def write(self, text: str) -> int:
+        output = _current.get()
+        if output is None:
+            return self.original.write(text)
+        output.write(self.name, text)
+        return len(text)
+
+    def flush(self):
+        self.original.flush()
+
+    def isatty(self) -> bool:
+        return self.original.isatty()
+
+    def fileno(self) -> int:
+        return self.original.fileno()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.original, name)
+
+
+def enableOutputCapture():
+    """
+    Install the capturing streams in the current process. Output is only captured inside
+    captureStepOutput, so the console output of the runner itself is left untouched
+    """
+    with _lock:
+        if not isinstance(sys.stdout, _CaptureStream):
+            sys.stdout = _CaptureStream("stdout", sys.stdout)
+        if not isinstance(sys.stderr, _CaptureStream):
+            sys.stderr = _CaptureStream("stderr", sys.stderr)
+
+
+@contextlib.contextmanager
+def captureStepOutput(logger: TaskLogger):
+    """
+    Capture the stdout and stderr written by the current thread or coroutine into the log
+    of a step when the logger has output capture enabled. The capture is inherited by
+    code that copies the context, such as asyncio tasks and asyncio.to_thread, but not by
+    threads the step starts itself
+    """
+    if not logger.captureOutput:
+        yield
+        return
+    enableOutputCapture()
+    output = StepOutput(logger)
+    token = _current.set(output)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+        output.flush()
@@ -0,0 +1,113 @@
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Connection
+import copy
+import threading
+import time
+from typing import Any, Callable
+
+from .scenario import Scenario
+from .scenario_context import ScenarioContext
+
+
+class RemoteExecutor:
+
+    """
+    Coordinator side of a connection to a RemoteWorker agent. Scenarios submitted to the
+    executor are sent to the agent and a future is returned which completes with the
+    ScenarioResult sent back by the agent
+    """
+    def __init__(self, address: str, authKey: str, onFeedback: Callable[[Any], None]) -> None:
+        if not authKey:
+            raise ValueError("authKey is required to connect to a remote worker")
+        host,port = address.rsplit(":", 1)
+        self.address = (host, int(port))
+        self.authKey = authKey
+        self.onFeedback = onFeedback
+        self.conn: Connection = None
+        self.capacity = 0
+        self.name = address
+        self.running = 0
+        self.futures: dict[str, Future] = {}
+        self.lock = threading.Lock()
+        self.reader: threading.Thread = None
+
+    def connect(self, timeout: float = 30):
+        """
+        Connect to the agent, retrying until the agent accepts the connection or the
+        timeout expires
+        """
+        deadline = time.time() + timeout
+        while True:
+            try:
+                self.conn = Client(self.address, authkey=self.authKey.encode())
+                break
+            except ConnectionRefusedError:
+                if time.time() >= deadline:
+                    raise Exception(f"could not connect to remote worker: {self.address[0]}:{self.address[1]}")
+                time.sleep(0.2)
+        self.conn.send(("hello",))
+        _,self.capacity,self.name = self.conn.recv()
+        self.reader = threading.Thread(target=self.__receive, daemon=True)
+        self.reader.start()
+
+    def hasFreeSlot(self) -> bool:
+        return self.running < self.capacity
+
+    def submit(self, taskId: str, scenario: Scenario, context: ScenarioContext) -> Future:
+        future = Future()
+        future.set_running_or_notify_cancel()
+        # the world proxy of the coordinator can not be used from another host, the agent
+        # provides its own world instead
+        remoteScenario = copy.copy(scenario)
+        remoteScenario.world = None
+        with self.lock:
+            self.futures[taskId] = future
+            self.running += 1
+            self.conn.send(("run", taskId, remoteScenario, context))
+        return future
+
+    def release(self):
+        with self.lock:
+            self.running -= 1
+
+    def cancel(self, taskId: str):
+        with self.lock:
+            try:
+                self.conn.send(("cancel", taskId))
+            except (OSError, EOFError):
+                pass
+
+    def shutdown(self):
+        if self.conn is None:
+            return
+        with self.lock:
+            try:
+                self.conn.send(("stop",))
+            except (OSError, EOFError):
+                pass
+        self.reader.join(timeout=10)
+        self.conn.close()
+        self.conn = None
+
+    def __receive(self):
+        while True:
+            try:
+                msg = self.conn.recv()
+            except (OSError, EOFError):
+                break
+            if msg[0] == "result":
+                with self.lock:
+                    future = self.futures.pop(msg[1], None)
+                if future is None:
+                    continue
+                if isinstance(msg[2], BaseException):
+                    future.set_exception(msg[2])
+                else:
+                    future.set_result(msg[2])
+            elif msg[0] == "feedback":
+                self.onFeedback(msg[1])
+        # the connection to the agent is lost, fail all scenarios still running on it
+        with self.lock:
+            futures, self.futures = self.futures, {}
+        for future in futures.values():
+            future.set_exception(ConnectionError(f"connection to remote worker {self.name} was lost"))
@@ -0,0 +1,247 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.connection import AuthenticationError, Listener, Connection
+import multiprocessing
+import os
+import queue
+import signal
+import socket
+import threading
+from typing import Any, Callable
+
+from .scenario import Scenario
+from .scenario_context import ScenarioContext
+from .world import World
+from .feedback_channel import FeedbackChannel
+from .worker import initializeWorker
+
+
+class RemoteWorker:
+
+    """
+    Worker agent that runs parallel scenarios on behalf of a coordinator TaskRunner on
+    another host. The agent must import the same step definitions as the coordinator.
+
+    Example usage:
+
+    if __name__ == '__main__':
+        RemoteWorker(authKey="secret", host="0.0.0.0", port=6000).serve()
+
+    Scenarios are sent as pickles, so anyone who can connect with the auth key can run
+    code on the agent. The agent only listens on the loopback interface unless another
+    host is given and always requires an auth key.
+
+    The coordinator then specifies the worker in its configuration:
+
+    tr.run(TaskRunnerConfig(featureFiles=["my.feature"], remoteWorkers=["workerhost:6000"], remoteAuthKey="secret"))
+
+    Protocol messages are pickled tuples sent over a multiprocessing connection:
+
+    coordinator -> worker: ("hello",), ("run", taskId, scenario, context), ("cancel", taskId), ("stop",)
+    worker -> coordinator: ("ready", capacity, name), ("result", taskId, result), ("feedback", batch)
+    """
+    def __init__(self, authKey: str, host: str = "127.0.0.1", port: int = 6000, maxProcesses: int = None,
+                 startMethod: str = "spawn", preloadModules: list[str] = None, workerInitializer: Callable = None,
+                 workerInitArgs: tuple = (), name: str = None) -> None:
+        if not authKey:
+            raise ValueError("authKey is required")
+        self.host = host
+        self.port = port
+        self.authKey = authKey
+        self.maxProcesses = maxProcesses if maxProcesses is not None else multiprocessing.cpu_count()
+        self.startMethod = startMethod
+        self.preloadModules = preloadModules if preloadModules is not None else []
+        self.workerInitializer = workerInitializer
+        self.workerInitArgs = workerInitArgs
+        self.name = name if name is not None else f"{socket.gethostname()}:{port}"
+        self.pool: ProcessPoolExecutor = None
+        self.sendLock = threading.Lock()
+        self.lock = threading.RLock()
+        self.taskPids: dict[str, int] = {}
+        self.tasks: dict[str, tuple[Scenario, ScenarioContext]] = {}
+        self.futures: dict[str, Future] = {}
+        self.cancelled: set[str] = set()
+        self.killedPools: set[ProcessPoolExecutor] = set()
+
+    def serve(self, maxConnections: int = None):
+        """
+        Accept coordinator connections and run their scenarios. A single coordinator is
+        served at a time. When maxConnections is given the agent stops after serving that
+        many coordinators
+        """
+        served = 0
+        manager = multiprocessing.Manager()
+        self.signalQueue = manager.Queue()
+        self.feedbackQueue = manager.Queue()
+        self.feedbackChannel = FeedbackChannel(self.feedbackQueue)
+        with Listener((self.host, self.port), authkey=self.authKey.encode()) as listener:
+            print(f"remote worker {self.name} listening on {self.host}:{self.port} with {self.maxProcesses} processes")
+            while maxConnections is None or served < maxConnections:
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, EOFError, OSError) as e:
+                    # a connection with a wrong key or a probe of the port does not stop the agent
+                    print(f"remote worker {self.name} rejected a connection: {e}")
+                    continue
+                served += 1
+                try:
+                    self.__handleCoordinator(conn)
+                finally:
+                    conn.close()
+                    self.__shutdownPool()
+        manager.shutdown()
+
+    def __getPool(self) -> ProcessPoolExecutor:
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.maxProcesses,
+                mp_context=multiprocessing.get_context(self.startMethod),
+                initializer=initializeWorker,
+                initargs=(self.preloadModules, self.workerInitializer, self.workerInitArgs)
+            )
+        return self.pool
+
+    def __shutdownPool(self):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False, cancel_futures=True)
+                self.pool = None
+            self.tasks = {}
+            self.futures = {}
+            self.cancelled = set()
+            self.taskPids = {}
+            self.killedPools = set()
+
+    def __send(self, conn: Connection, msg: Any):
+        with self.sendLock:
+            try:
+                conn.send(msg)
+            except (OSError, EOFError):
+                pass
+
+    def __forwardFeedback(self, conn: Connection, stop: threading.Event):
+        while not stop.is_set():
+            try:
+                msg = self.feedbackQueue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (OSError, EOFError):
+                break
+            self.__send(conn, ("feedback", msg))
+
+    def __watchPids(self, stop: threading.Event):
+        """
+        Record the worker process of every scenario as it starts and terminate the
+        process of a scenario that was cancelled before its process was known
+        """
+        while not stop.is_set():
+            try:
+                id,pid = self.signalQueue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (OSError, EOFError):
+                break
+            with self.lock:
+                self.taskPids[id] = pid
+                if id in self.cancelled:
+                    self.__kill(pid)
+
+    def __handleCoordinator(self, conn: Connection):
+        stop = threading.Event()
+        forwarder = threading.Thread(target=self.__forwardFeedback, args=(conn, stop), daemon=True)
+        forwarder.start()
+        watcher = threading.Thread(target=self.__watchPids, args=(stop,), daemon=True)
+        watcher.start()
+        try:
+            while True:
+                try:
+                    msg = conn.recv()
+                except (OSError, EOFError):
+                    break
+                if msg[0] == "hello":
+                    self.__send(conn, ("ready", self.maxProcesses, self.name))
+                elif msg[0] == "run":
+                    self.__runScenario(conn, msg[1], msg[2], msg[3])
+                elif msg[0] == "cancel":
+                    self.__cancelScenario(msg[1])
+                elif msg[0] == "stop":
+                    break
+        finally:
+            stop.set()
+            forwarder.join()
+            watcher.join()
+
+    def __runScenario(self, conn: Connection, taskId: str, scenario: Scenario, context: ScenarioContext):
+        # the world of the coordinator is not reachable from another host, so scenarios share
+        # the world of this agent
+        scenario.world = World()
+        with self.lock:
+            self.tasks[taskId] = (scenario, context)
+            self.__submit(conn, taskId)
+
+    def __submit(self, conn: Connection, taskId: str):
+        scenario,context = self.tasks[taskId]
+        pool = self.__getPool()
+        future = pool.submit(scenario.run, queue=self.signalQueue, feedbackQueue=self.feedbackChannel, context=context)
+        self.futures[taskId] = future
+        future.add_done_callback(lambda f: self.__done(conn, taskId, pool, f))
+
+    def __done(self, conn: Connection, taskId: str, pool: ProcessPoolExecutor, future: Future):
+        with self.lock:
+            if taskId not in self.tasks:
+                return
+            error = future.exception() if not future.cancelled() else None
+            if future.cancelled() or isinstance(error, BrokenProcessPool):
+                if taskId in self.cancelled:
+                    self.__finish(conn, taskId, Exception("scenario was cancelled"))
+                    return
+                if pool in self.killedPools:
+                    # the pool broke because the worker of a cancelled scenario was terminated
+                    if self.pool is pool:
+                        self.pool.shutdown(wait=False)
+                        self.pool = None
+                    if taskId in self.taskPids:
+                        # the scenario may have run steps with side effects, so it is not run again
+                        self.__finish(conn, taskId, Exception("worker pool restarted: the scenario was stopped when the worker of a cancelled scenario was terminated"))
+                    else:
+                        # a scenario that had not started yet runs in a new pool
+                        self.__submit(conn, taskId)
+                    return
+            if error is not None:
+                self.__finish(conn, taskId, error)
+            else:
+                self.__finish(conn, taskId, future.result())
+
+    def __finish(self, conn: Connection, taskId: str, result: Any):
+        del self.tasks[taskId]
+        self.futures.pop(taskId, None)
+        self.cancelled.discard(taskId)
+        self.taskPids.pop(taskId, None)
+        self.__send(conn, ("result", taskId, result))
+
+    def __kill(self, pid: int):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass
+        if self.pool is not None:
+            self.killedPools.add(self.pool)
+
+    def __cancelScenario(self, taskId: str):
+        """
+        Terminate the worker process of a scenario. A scenario whose process is not known
+        yet is terminated as soon as it starts. Terminating a worker breaks the pool: the
+        other scenarios that were running fail with worker pool restarted and the scenarios
+        that had not started are submitted to a new pool once the pool reports that it is
+        broken
+        """
+        with self.lock:
+            if taskId not in self.tasks:
+                return
+            self.cancelled.add(taskId)
+            # a scenario that has not been handed to a worker yet is simply not run
+            if self.futures[taskId].cancel():
+                return
+            pid = self.taskPids.get(taskId)
+            if pid is not None:
+                self.__kill(pid)
@@ -0,0 +1,93 @@
+import hashlib
+import inspect
+import json
+import os
+from typing import Any, Callable, Optional
+
+from .after_scenario import AfterScenario
+from .before_scenario import BeforeScenario
+from .step import Step
+from .task import Task
+
+
+class ResultCache:
+
+    """
+    Keeps the outcome of scenarios together with a hash of everything that determines
+    how they run: the gherkin scenario including its background steps, the source of
+    the matching step definitions and the source of the before/after scenario hooks.
+    A scenario whose hash matches its last passing run does not need to run again.
+
+    Example usage:
+
+    cache = ResultCache("paraworld_cache.json")
+    tr = TaskRunner(resultCache=cache)
+    tr.run(["my.feature"])
+    """
+    def __init__(self, fileName: str = "paraworld_cache.json") -> None:
+        self.fileName = fileName
+        self.scenarios: dict[str, dict[str, Any]] = {}
+        if os.path.isfile(fileName):
+            with open(fileName, "r", encoding='utf8') as fh:
+                self.scenarios = json.load(fh).get("scenarios", {})
+
+    @staticmethod
+    def __getSource(func: Callable) -> str:
+        func = inspect.unwrap(func)
+        try:
+            return inspect.getsource(func)
+        except (OSError, TypeError):
+            return func.__code__.co_code.hex()
+
+    def computeKey(self, task: Task) -> str:
+        """
+        Compute the hash of a scenario. Ids and locations are left out so that editing
+        other scenarios in the same feature file does not change the hash
+        """
+        scenario = task.scenario.gherkinScenario
+        steps = []
+        for step in task.scenario.steps:
+            func,_ = Step.getStep(step["text"])
+            steps.append({
+                "keyword": step["keyword"],
+                "text": step["text"],
+                "docString": step.get("docString", {}).get("content"),
+                "dataTable": [[c["value"] for c in r["cells"]] for r in step.get("dataTable", {}).get("rows", [])],
+                "definition": self.__getSource(func) if func is not None else None
+            })
+        data = {
+            "name": scenario["name"],
+            "description": scenario.get("description"),
+            "tags": [t["name"] for t in scenario["tags"]],
+            "steps": steps,
+            "hooks": [self.__getSource(m) for m in BeforeScenario.getMethods() + AfterScenario.getMethods()]
+        }
+        return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+    def getStatus(self, scenarioId: str) -> Optional[str]:
+        """
+        Return the status of the last run of the scenario
+        """
+        entry = self.scenarios.get(scenarioId)
+        return entry["status"] if entry else None
+
+    def isCachedPass(self, scenarioId: str, key: str) -> bool:
+        entry = self.scenarios.get(scenarioId)
+        return entry is not None and entry["key"] == key and entry["status"] == "success"
+
+    def recordTaskReport(self, taskReport: Any, keys: dict[str, str]):
+        """
+        Record the outcome of the executed scenarios. Skipped and cached scenarios keep
+        their earlier entry
+        """
+        for t in taskReport:
+            if t.get("cached") or t["status"] not in ("success","failed") or t["id"] not in keys:
+                continue
+            self.scenarios[t["id"]] = {"key": keys[t["id"]], "status": t["status"], "name": t["name"]}
+
+    def save(self):
+        dirs = os.path.dirname(self.fileName)
+        if dirs:
+            os.makedirs(dirs, exist_ok=True)
+        with open(self.fileName, "w", encoding='utf8') as fh:
+            json.dump({"scenarios": self.scenarios}, fh)
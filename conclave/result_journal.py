@@ -0,0 +1,175 @@
+from dataclasses import dataclass, fields
+import datetime
+import json
+import os
+import threading
+from typing import Any, Iterator
+
+from .helpers import excludeKeys
+from .scenario import Scenario
+from .scenario_result import ScenarioResult
+from .task import Task
+from .testresult_info import TestResultInfo
+
+
+def _toDatetime(value: Any) -> Any:
+    return datetime.datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _jsonDefault(o: Any) -> Any:
+    return o.isoformat() if isinstance(o, datetime.datetime) else str(o)
+
+
+def serializeEntry(entry: dict[str, Any]) -> dict[str, Any]:
+    """
+    Convert a task report entry to a dictionary that can be written as JSON
+    """
+    task: Task = entry["task"]
+    data = excludeKeys(entry, ["task","scenario"])
+    data["task"] = {f.name: getattr(task, f.name) for f in fields(task) if f.name not in ("scenario","feature")}
+    data["task"]["feature"] = excludeKeys(task.feature, ["children"])
+    data["task"]["gherkinScenario"] = task.scenario.gherkinScenario
+    data["scenario"] = vars(entry["scenario"]) if entry["scenario"] is not None else None
+    return data
+
+
+def deserializeEntry(data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Restore a task report entry converted with serializeEntry
+    """
+    taskData = dict(data["task"])
+    gherkinScenario = taskData.pop("gherkinScenario")
+    # restore the scenario the same way unpickling does, without creating a World
+    scenario = Scenario.__new__(Scenario)
+    scenario.__dict__.update(name=taskData["name"], gherkinScenario=gherkinScenario, gherkinFeature=taskData["feature"], id=taskData["id"])
+    entry = dict(data)
+    entry["task"] = Task(scenario=scenario, **taskData)
+    if data["scenario"] is not None:
+        result = ScenarioResult(**data["scenario"])
+        result.startTime = _toDatetime(result.startTime)
+        result.endTime = _toDatetime(result.endTime)
+        for step in result.steps or []:
+            step["start"] = _toDatetime(step.get("start"))
+            step["end"] = _toDatetime(step.get("end"))
+        entry["scenario"] = result
+    return entry
+
+
+def summarizeEntry(entry: dict[str, Any]) -> dict[str, Any]:
+    """
+    Return the task report entry without its task and scenario result
+    """
+    return excludeKeys(entry, ["task","scenario"])
+
+
+class ResultJournal:
+
+    """
+    Append-only journal of the task results of a run. Every record is a JSON object on
+    its own line and is flushed as soon as it is written, so the results of the tasks
+    completed so far survive a crash of the run:
+
+    {"type": "start", "start": ..., "pid": ..., "numCpu": ..., "groups": {...}}
+    {"type": "task", "entry": {...}}
+    {"type": "end", "testResult": {...}}
+
+    Set sync to also fsync every record, which protects the journal against a crash of
+    the machine at the cost of a disk write per task
+    """
+    def __init__(self, fileName: str, sync: bool = False) -> None:
+        self.fileName = fileName
+        self.sync = sync
+        self.lock = threading.Lock()
+        dirs = os.path.dirname(fileName)
+        if dirs:
+            os.makedirs(dirs, exist_ok=True)
+        self.fh = open(fileName, "w", encoding='utf8')
+
+    def __write(self, record: dict[str, Any]):
+        line = json.dumps(record, default=_jsonDefault) + "\n"
+        with self.lock:
+            if self.fh is None:
+                raise ValueError(f"result journal {self.fileName} is closed")
+            self.fh.write(line)
+            self.fh.flush()
+            if self.sync:
+                os.fsync(self.fh.fileno())
+
+    def start(self, start: str, pid: int, numCpu: int, groups: dict[str, list[str]]):
+        self.__write({"type": "start", "start": start, "pid": pid, "numCpu": numCpu, "groups": groups})
+
+    def append(self, entry: dict[str, Any]):
+        self.__write({"type": "task", "entry": serializeEntry(entry)})
+
+    def close(self, testResult: TestResultInfo = None):
+        """
+        Write the result of the run, when given, and close the journal
+        """
+        if testResult is not None:
+            self.__write({"type": "end", "testResult": vars(testResult)})
+        with self.lock:
+            if self.fh is not None:
+                self.fh.close()
+                self.fh = None
+
+
+@dataclass
+class JournalResult:
+    taskReport: list[dict[str, Any]]
+    testResult: TestResultInfo
+    groups: dict[str, list[str]]
+    complete: bool
+
+
+def readJournal(fileName: str) -> Iterator[dict[str, Any]]:
+    """
+    Yield the records of a result journal. The last line is ignored when it can not be
+    decoded, since it was being written when the run crashed
+    """
+    with open(fileName, "r", encoding='utf8') as fh:
+        pending = None
+        for number,line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+            if pending is not None:
+                raise ValueError(f"corrupt record on line {pending} of result journal {fileName}")
+            try:
+                record = json.loads(line)
+            except ValueError:
+                pending = number
+                continue
+            yield record
+
+
+def loadJournal(fileName: str) -> JournalResult:
+    """
+    Load the task report of a result journal. The test result of a journal without an end
+    record, because the run did not finish, is rebuilt from the journaled tasks and the
+    run is reported as failed
+    """
+    dateFormat = "%m/%d/%Y, %H:%M:%S"
+    header: dict[str, Any] = {}
+    taskReport: list[dict[str, Any]] = []
+    testResult: TestResultInfo = None
+    for record in readJournal(fileName):
+        if record["type"] == "start":
+            header = record
+        elif record["type"] == "task":
+            taskReport.append(deserializeEntry(record["entry"]))
+        elif record["type"] == "end":
+            testResult = TestResultInfo(**record["testResult"])
+    complete = testResult is not None
+    if not complete:
+        start = header.get("start", datetime.datetime.fromtimestamp(os.path.getmtime(fileName)).strftime(dateFormat))
+        startTimes = [t["scenario"].startTime for t in taskReport if t["scenario"] is not None and t["scenario"].startTime]
+        endTimes = [t["scenario"].endTime for t in taskReport if t["scenario"] is not None and t["scenario"].endTime]
+        testResult = TestResultInfo(
+            elapsed=(max(endTimes) - min(startTimes)).total_seconds() if startTimes and endTimes else 0,
+            start=start,
+            end=max(endTimes).strftime(dateFormat) if endTimes else start,
+            numCpu=header.get("numCpu", 0),
+            success=False,
+            pid=header.get("pid"),
+            hosts=sorted(set(t["host"] for t in taskReport if t.get("host")))
+        )
+    return JournalResult(taskReport=taskReport, testResult=testResult, groups=header.get("groups", {}), complete=complete)
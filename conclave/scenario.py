@@ -1,55 +1,61 @@
-from concurrent.futures import ThreadPoolExecutor, wait
-import concurrent
+from queue import SimpleQueue
+import asyncio
 from dataclasses import asdict
 import multiprocessing
 from typing import Any
 from datetime import datetime
-from .feedback_schema import FeatureInfo, ScenarioFeedback, ScenarioInfo, StepFeedback
+from .feedback_channel import FeedbackChannel, ScenarioFeedbackSender
+from .feedback_schema import FeatureInfo, ScenarioFeedback
 from .scenario_result import ScenarioResult
 from .scenario_context import ScenarioContext
 from .task_logger import TaskLogger
 import traceback
 import time
 import os
+import socket
 import threading
 from .step import Step
 from .world import World
 from .before_scenario import BeforeScenario
 from .after_scenario import AfterScenario
 from .scenario_scope import ScenarioScope
+from .event_loop import getEventLoop
+from .step_executor import StepExecutor, getStepExecutor
 
 class Scenario:
 
     """
     This class represents a scenario in Gherkin. A scenario consists of steps which
     will be executed one by one. All background steps will be executed before the
-    steps of a scenario
+    steps of a scenario. Scenarios in a Rule also run the background steps of the rule
     """
-    def __init__(self, name, gherkinScenario,gherkinFeature,id):
+    def __init__(self, name, gherkinScenario,gherkinFeature,id,gherkinRule=None,maxLogSize: int=None,logFile: str=None,captureOutput: bool=False):
         self.name = name
-        self.logger = TaskLogger(name)
+        self.logger = TaskLogger(name, maxLogSize, logFile, captureOutput)
         self.gherkinScenario = gherkinScenario
         self.id = id
         self.gherkinFeature = gherkinFeature
-        self.steps = self.__getAllSteps()
+        self.steps = self.__getAllSteps(gherkinRule)
         self.world = World()
-        self.pool = ThreadPoolExecutor()
-        self.workerQueue = []
-        self.lock = threading.Lock()
-        self.stopWorker = False
+        self.workerEvents: SimpleQueue = None
         self.stepsError = {}
         self.result = ScenarioResult(scenario=self.gherkinScenario,id=self.id,steps=self.steps,threadId=None,pid=None,startTime=None,endTime=None)
         self.context = None
         self.scenarioScope = ScenarioScope()
+        self.cancelled = False
 
-    def run(self, queue: multiprocessing.Queue, feedbackQueue: multiprocessing.Queue, context: ScenarioContext):
+    def run(self, queue: multiprocessing.Queue, feedbackQueue: FeedbackChannel, context: ScenarioContext):
         """
         Execute the scenario
         """
+        if context is not None and context.isAsync:
+            # async scenarios in a worker process share the event loop of the process
+            return getEventLoop().run(self.runAsync(queue, feedbackQueue, context))
         self.logger.log(f"Run scenario: {self.name}")
+        feedbackQueue = self.__getFeedbackSender(feedbackQueue)
         my_pid = os.getpid()
         if queue:
-            queue.put(my_pid)
+            queue.put((self.id, my_pid))
         self.logger.log(f"process pid: {my_pid}")
         self.logger.log(f"thread id: {threading.get_ident()}")
         start = time.time()
@@ -71,17 +77,73 @@ class Scenario:
             end = time.time()
             elapsed = end-start
             self.logger.log(f"elapsed time: {end-start}")
-            message = self.logger.msg
-            self.result.message = message
+            self.logger.close()
+            self.result.message = self.logger.msg
+            self.result.logFile = self.logger.logFile
             self.result.exception = exc
             self.result.elapsed = elapsed
             self.result.threadId = threading.get_ident()
             self.result.pid = os.getpid()
+            self.result.host = socket.gethostname()
             self.result.startTime = datetime.fromtimestamp(start)
             self.result.endTime = datetime.fromtimestamp(end)
+            self.__flushFeedback(feedbackQueue)
             return self.result
 
-    def notifyScenarioStarted(self,feedbackQueue: multiprocessing.Queue, context: ScenarioContext, start: float):
+    async def runAsync(self, queue: multiprocessing.Queue, feedbackQueue: FeedbackChannel, context: ScenarioContext):
+        """
+        Execute the scenario as a coroutine on an event loop. Async step definitions are
+        awaited on the loop, synchronous step definitions run in a worker thread and
+        concurrent steps become tasks on the same loop
+        """
+        self.logger.log(f"Run async scenario: {self.name}")
+        feedbackQueue = self.__getFeedbackSender(feedbackQueue)
+        my_pid = os.getpid()
+        if queue:
+            queue.put((self.id, my_pid))
+        start = time.time()
+        exc = None
+        self.context = context
+        try:
+            self.notifyScenarioStarted(feedbackQueue, self.context, start)
+            await self.__runStepsAsync(feedbackQueue)
+            if self.stepsError:
+                for key in self.stepsError:
+                    exc = f"Concurrent/parallel step: {key}\n{self.stepsError[key]}\n"
+        except Exception:
+            exc = f"failed: {traceback.format_exc()}"
+            if self.stepsError:
+                for key in self.stepsError:
+                    exc += f"\nConcurrent/parallel step: {key}\n{self.stepsError[key]}\n"
+            self.logger.error(f"{exc}")
+        finally:
+            end = time.time()
+            self.logger.log(f"elapsed time: {end-start}")
+            self.logger.close()
+            self.result.message = self.logger.msg
+            self.result.logFile = self.logger.logFile
+            self.result.exception = exc
+            self.result.elapsed = end-start
+            self.result.threadId = threading.get_ident()
+            self.result.pid = my_pid
+            self.result.host = socket.gethostname()
+            self.result.startTime = datetime.fromtimestamp(start)
+            self.result.endTime = datetime.fromtimestamp(end)
+            self.__flushFeedback(feedbackQueue)
+        return self.result
+
+    def __getFeedbackSender(self, feedbackQueue: FeedbackChannel) -> ScenarioFeedbackSender:
+        return feedbackQueue.forScenario(self.gherkinScenario, self.gherkinFeature, self.id) if feedbackQueue is not None else None
+
+    def __flushFeedback(self, feedbackQueue: ScenarioFeedbackSender):
+        # send the remaining step events before the result so they are not lost when the
+        # worker process is terminated
+        try:
+            feedbackQueue.flush()
+        except:
+            pass
+
+    def notifyScenarioStarted(self,feedbackQueue: ScenarioFeedbackSender, context: ScenarioContext, start: float):
         try:
             feed = ScenarioFeedback()
             contextDict = asdict(context)
@@ -112,12 +174,13 @@ class Scenario:
         return self.logger.msg
     
 
-    def __getBackgroundSteps(self):
+    def __getBackgroundSteps(self, gherkinRule):
         """
         Get all background steps for a scenario
         """
         backgroundSteps = []
-        for child in self.gherkinFeature["children"]:
+        children = self.gherkinFeature["children"] + (gherkinRule["children"] if gherkinRule else [])
+        for child in children:
             if "background" in child:
                 bg = child["background"]
                 if "steps" in bg:
@@ -133,16 +196,16 @@ class Scenario:
             steps.extend(self.gherkinScenario["steps"])
         return steps
 
-    def __getAllSteps(self):
+    def __getAllSteps(self, gherkinRule):
         """
         Get all steps for a scenario. This will be a combined list of background steps and main steps
         """
-        bgSteps = self.__getBackgroundSteps()
+        bgSteps = self.__getBackgroundSteps(gherkinRule)
         steps = self.__getSteps()
         bgSteps.extend(steps)
         return bgSteps
 
-    def __runSteps(self, feedbackQueue: multiprocessing.Queue):
+    def __runSteps(self, feedbackQueue: ScenarioFeedbackSender):
         """
         Execute all steps in the scenario
         """
@@ -158,6 +221,7 @@ class Scenario:
                     foundConcurrentSteps = True
 
             if foundConcurrentSteps:
+                self.workerEvents = SimpleQueue()
                 workerThread = threading.Thread(target=self.runWorkerThread,kwargs={'taskList':[],'feedbackQueue': feedbackQueue})
                 workerThread.start()
 
@@ -165,6 +229,8 @@ class Scenario:
 
             for step in allSteps:
                 exc = None
+                if self.cancelled:
+                    raise Exception(f"scenario cancelled before step: {step['keyword']}{step['text']}")
                 self.logger.log(f"execute step: {step['keyword']} {step['text']}")
                 func,match = Step.getStep(step['text'])
                 if func:
@@ -172,7 +238,7 @@ class Scenario:
                         self.logger.log(f"add step to worker queue: {step['keyword']} {step['text']}")
                         self.__addStepToWorkerPool(step)
                     else:
-                        result = func(self.logger,self.world,match,step,self.gherkinScenario,self.gherkinFeature,self.scenarioScope,feedbackQueue)
+                        result = Step.callStep(func,self.logger,self.world,match,step,self.gherkinScenario,self.gherkinFeature,self.scenarioScope,feedbackQueue)
                         if result.error:
                             self.__updateStep(step, "failed", result.error, result.elapsed, result.pid,result.threadId,result.start,result.end,result.log)
                             self.__notifyStep(step,"failed", result.error, result.elapsed, result.pid,result.threadId,result.start,result.end,result.log,feedbackQueue)
@@ -186,11 +252,71 @@ class Scenario:
                     raise Exception(f"Could not find matching step definition for: {step['keyword']}{step['text']}")
                     
         finally:
-            self.stopWorker = True
             if workerThread is not None:
+                self.workerEvents.put(("stop", None))
                 workerThread.join()
             self.runAfterScenarios()
     
+    async def __runStepsAsync(self, feedbackQueue: ScenarioFeedbackSender):
+        """
+        Execute all steps in the scenario on the event loop
+        """
+        concurrentSteps: dict[asyncio.Task, Any] = {}
+        try:
+            for step in self.steps:
+                self.__updateStep(step, "skipped", None, 0.0, None, None,None,None, "")
+
+            await asyncio.to_thread(self.runBeforeScenarios)
+
+            for step in self.steps:
+                if self.cancelled:
+                    raise Exception(f"scenario cancelled before step: {step['keyword']}{step['text']}")
+                self.logger.log(f"execute step: {step['keyword']} {step['text']}")
+                func,match = Step.getStep(step['text'])
+                if func:
+                    args = (self.logger,self.world,match,step,self.gherkinScenario,self.gherkinFeature,self.scenarioScope,feedbackQueue)
+                    if self.__isStepConcurrent(step):
+                        self.logger.log(f"add concurrent step for execution: {step['text']}")
+                        concurrentSteps[asyncio.ensure_future(Step.awaitStep(func,*args))] = step
+                    else:
+                        result = await Step.awaitStep(func,*args)
+                        if result.error:
+                            self.__updateStep(step, "failed", result.error, result.elapsed, result.pid,result.threadId,result.start,result.end,result.log)
+                            self.__notifyStep(step,"failed", result.error, result.elapsed, result.pid,result.threadId,result.start,result.end,result.log,feedbackQueue)
+                            raise Exception(result.error)
+                        else:
+                            self.__updateStep(step, "success", result.error, result.elapsed,result.pid,result.threadId,result.start,result.end,result.log)
+                            self.__notifyStep(step,"success", result.error, result.elapsed,result.pid,result.threadId,result.start,result.end,result.log,feedbackQueue)
+                else:
+                    self.__updateStep(step, "skipped", f"Could not find matching step definition for: {step['keyword']}{step['text']}",0.0,None,None,None,None,"")
+                    self.__notifyStep(step,"skipped", f"Could not find matching step definition for: {step['keyword']}{step['text']}",0.0,None,None,None,None,"",feedbackQueue)
+                    raise Exception(f"Could not find matching step definition for: {step['keyword']}{step['text']}")
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        finally:
+            if concurrentSteps:
+                if self.cancelled:
+                    for c in concurrentSteps:
+                        c.cancel()
+                await asyncio.wait(concurrentSteps)
+                self.stepsError = {}
+                for c,step in concurrentSteps.items():
+                    if c.cancelled():
+                        self.__updateStep(step,"skipped","scenario cancelled",0.0,None,None,None,None,"")
+                        self.__notifyStep(step,"skipped","scenario cancelled",0.0,None,None,None,None,"",feedbackQueue)
+                        continue
+                    result = c.result()
+                    if result.error:
+                        self.stepsError[step["keyword"]+step["text"]] = result.error
+                        self.logger.error(f"failed: {result.error}")
+                        self.__updateStep(step,"failed",result.error,result.elapsed,result.pid,result.threadId,result.start,result.end,result.log)
+                        self.__notifyStep(step,"failed",result.error,result.elapsed,result.pid,result.threadId,result.start,result.end,result.log,feedbackQueue)
+                    else:
+                        self.__updateStep(step,"success",None,result.elapsed,result.pid,result.threadId,result.start,result.end,result.log)
+                        self.__notifyStep(step,"success",None,result.elapsed,result.pid,result.threadId,result.start,result.end,result.log,feedbackQueue)
+            await asyncio.to_thread(self.runAfterScenarios)
+
     def __updateStep(self, step: Any, status: str,error: str, elapsed: int, pid: int,threadId: int,start: Any, end: Any, log: str):
         item = next((x for x in self.steps if x['id'] == step['id']), None)
         if item:
@@ -203,42 +329,14 @@ class Scenario:
             step["end"] = end
             step["log"] = log
     
-    def __notifyStep(self, step: Any,status: str,error: str, elapsed: int, pid: int,threadId: int,start: Any, end: Any, log: str, feedbackQueue: multiprocessing.Queue):
+    def __notifyStep(self, step: Any,status: str,error: str, elapsed: int, pid: int,threadId: int,start: Any, end: Any, log: str, feedbackQueue: ScenarioFeedbackSender):
         try:
-            msg = asdict(StepFeedback(
-                threadId=threadId,
-                elapsed=elapsed,
-                endTime=start,
-                pid=pid,
-                startTime=end,
-                status=status,
-                error=error,
-                log=log,
-                column=step["location"]["column"],
-                line=step["location"]["line"],
-                keyword=step["keyword"],
-                text=step["text"],
-                scenario=ScenarioInfo(
-                    name=self.gherkinScenario["name"],
-                    column=self.gherkinScenario["location"]["column"],
-                    line=self.gherkinScenario["location"]["line"],
-                    description=self.gherkinScenario["description"],
-                    tags=[t["name"] for t in self.gherkinScenario["tags"]],
-                    numberOfSteps=len(self.gherkinScenario["steps"])
-                ),
-                feature=FeatureInfo(
-                    description=self.gherkinFeature["description"],
-                    name=self.gherkinFeature["name"],
-                    tags=[t["name"] for t in self.gherkinFeature["tags"]]
-                )
-            ))
-            feedbackQueue.put_nowait(msg)
+            feedbackQueue.step(step,status,error,elapsed,pid,threadId,start,end,log)
         except:
             pass
 
     def __addStepToWorkerPool(self, step):
-        with self.lock:
-            self.workerQueue.append(step)
+        self.workerEvents.put(("step", step))
 
     def __isStepConcurrent(self, step):
         return step['keyword'] in ('Concurrently ', '(background) Given ','(background) When ','(background) Then ','(background) And ')
@@ -248,84 +346,76 @@ class Scenario:
         # step['keyword'] == '(background) When ' or \
         # step['keyword'] == '(background) And '
 
-    def __getNextSteps(self):
-        with self.lock:
-            steps, self.workerQueue = self.workerQueue, []
-        return steps
+    def __submitConcurrentStep(self, pool: StepExecutor, futures: dict, step: Any, feedbackQueue: ScenarioFeedbackSender):
+        func,match = Step.getStep(step['text'])
+        if func:
+            self.logger.log(f"add concurrent step for execution: {step['text']}")
+            future = pool.submit(self, Step.callStep, func, self.logger, self.world,match,step,self.gherkinScenario,self.gherkinFeature,self.scenarioScope,feedbackQueue)
+            futures[future] = step
+            future.add_done_callback(lambda f: self.workerEvents.put(("done", f)))
+        else:
+            self.__updateStep(step, "skipped", f"Could not find matching step definition for: {step['keyword']}{step['text']}",0.0,None,None,None,None,"")
+            self.__notifyStep(step,"skipped", f"Could not find matching step definition for: {step['keyword']}{step['text']}",0.0,None,None,None,None,"",feedbackQueue)
 
     def runWorkerThread(self, taskList, feedbackQueue):
+        """
+        Run the concurrent steps of the scenario on the step executor shared by all scenarios
+        of the process. The thread blocks on the worker events: steps queued by the scenario,
+        completed steps and the stop and cancel signals. Queued steps are submitted as soon
+        as they arrive and the thread exits when the last step completed after the stop signal
+        """
+        pool = getStepExecutor()
         futures = {}
+        stopped = False
+        self.stepsError = {}
         for step in taskList:
-            func,match = Step.getStep(step['text'])
-            if func:
-                futures[self.pool.submit(func, self.logger, self.world,match,step,self.gherkinScenario,self.gherkinFeature,self.scenarioScope,feedbackQueue)] = step
-            else:
-                self.__updateStep(step, "skipped", f"Could not find matching step definition for: {step['keyword']}{step['text']}",0.0,None,None,None,None,"")
-                self.__notifyStep(step,"skipped", f"Could not find matching step definition for: {step['keyword']}{step['text']}",0.0,None,None,None,None,"",feedbackQueue)
-        
-        self.logger.log(f"add steps for concurrent executions: {[t['keyword']+t['text'] for t in futures.values()]}")
+            self.__submitConcurrentStep(pool, futures, step, feedbackQueue)
 
-        self.stepsError = {}
-        while True:
-            # fix issue with 100% CPU usage when there are no concurrent tasks
-            # but we still call wait() with timeout of 1 seconds. This causes
-            # a busy wait loop that eats up all CPU time. Instead we will check
-            # if we have any concurrent tasks and then just sleep for 1 seconds
-            # before the next check
-            if not futures:
-                time.sleep(1)
-            else:
-                done, _ = wait(futures,return_when=concurrent.futures.FIRST_COMPLETED,timeout=1)
-                for c in done:
-                    fut = futures.pop(c)
-                    result = c.result()
-                    if result.error:
-                        self.stepsError[fut["keyword"]+fut["text"]] = result.error
-                        self.logger.error(f"failed: {result.error}")
-                        self.__updateStep(fut,"failed",result.error,result.elapsed,result.pid,result.threadId,result.start,result.end,result.log)
-                        self.__notifyStep(fut,"failed",result.error,result.elapsed,result.pid,result.threadId,result.start,result.end,result.log,feedbackQueue)
-                    else:
-                        self.__updateStep(fut,"success",None,result.elapsed,result.pid,result.threadId,result.start,result.end,result.log)
-                        self.__notifyStep(fut,"success",None,result.elapsed,result.pid,result.threadId,result.start,result.end,result.log,feedbackQueue)
-                    
-                    self.logger.log(f"completed step: {fut['keyword']} {fut['text']}")
-            nextSteps = self.__getNextSteps()
-            for step in nextSteps:
-                func,match = Step.getStep(step['text'])
-                if func:
-                    self.logger.log(f"add concurrent step for execution: {step['text']}")
-                    futures[self.pool.submit(func, self.logger, self.world,match,step,self.gherkinScenario,self.gherkinFeature,self.scenarioScope,feedbackQueue)] = step
+        while futures or not stopped:
+            event,item = self.workerEvents.get()
+            if event == "step":
+                self.__submitConcurrentStep(pool, futures, item, feedbackQueue)
+            elif event == "stop":
+                stopped = True
+            elif event == "cancel":
+                # scenario has been cancelled so cancel any concurrent steps that have not started
+                # yet and stop waiting for the running ones
+                for c,step in futures.items():
+                    c.cancel()
+                    self.__updateStep(step,"skipped","scenario cancelled",0.0,None,None,None,None,"")
+                    self.__notifyStep(step,"skipped","scenario cancelled",0.0,None,None,None,None,"",feedbackQueue)
+                break
+            elif item in futures:
+                fut = futures.pop(item)
+                result = item.result()
+                if result.error:
+                    self.stepsError[fut["keyword"]+fut["text"]] = result.error
+                    self.logger.error(f"failed: {result.error}")
+                    self.__updateStep(fut,"failed",result.error,result.elapsed,result.pid,result.threadId,result.start,result.end,result.log)
+                    self.__notifyStep(fut,"failed",result.error,result.elapsed,result.pid,result.threadId,result.start,result.end,result.log,feedbackQueue)
                 else:
-                    self.__updateStep(step, "skipped", f"Could not find matching step definition for: {step['keyword']}{step['text']}",0.0,None,None,None,None,"")
-                    self.__notifyStep(step,"skipped", f"Could not find matching step definition for: {step['keyword']}{step['text']}",0.0,None,None,None,None,"",feedbackQueue)
-            if not futures and self.stopWorker:
-                # To avoid scenarios where we have only concurrent steps remaining in the queue and the scenario has no more steps
-                # to execute. Then the main thread will set the variable stopWorker to True, but this thread has not gotten a chance
-                # to retrieve the pending concurrent steps to be executed. So we try and fetch any pending items one last time before
-                # exiting if no pending steps are found.
-                nextSteps = self.__getNextSteps()
-                for step in nextSteps:
-                    func,match = Step.getStep(step['text'])
-                    if func:
-                        self.logger.log(f"add concurrent step for execution: {step['text']}")
-                        futures[self.pool.submit(func, self.logger, self.world,match,step,self.gherkinScenario,self.gherkinFeature,self.scenarioScope,feedbackQueue)] = step
-                    else:
-                        self.__updateStep(step, "skipped", f"Could not find matching step definition for: {step['keyword']}{step['text']}",0.0,None,None,None,None,"")
-                        self.__notifyStep(step,"skipped", f"Could not find matching step definition for: {step['keyword']}{step['text']}",0.0,None,None,None,None,"",feedbackQueue)
-                if not futures:
-                    break
+                    self.__updateStep(fut,"success",None,result.elapsed,result.pid,result.threadId,result.start,result.end,result.log)
+                    self.__notifyStep(fut,"success",None,result.elapsed,result.pid,result.threadId,result.start,result.end,result.log,feedbackQueue)
+                self.logger.log(f"completed step: {fut['keyword']} {fut['text']}")
+
+    def cancel(self):
+        """
+        Cancel the scenario. It stops before its next step and concurrent steps that have
+        not started are cancelled
+        """
+        self.cancelled = True
+        events = self.workerEvents
+        if events is not None:
+            events.put(("cancel", None))
     
     def __getstate__(self):
         state = self.__dict__.copy()
-        del state["pool"]
-        del state["lock"]
+        state["workerEvents"] = None
+        # the background steps are already part of the scenario steps so the children of the
+        # feature do not need to be sent to the worker processes
+        state["gherkinFeature"] = {k:v for k,v in self.gherkinFeature.items() if k != "children"}
         return state
     
-    def __setstate__(self,state):
-        self.__dict__.update(state)
-        self.pool = ThreadPoolExecutor()
-        self.lock = threading.Lock()
-    
     def runAfterScenarios(self):
         sc = AfterScenario.getMethods()
         if sc:
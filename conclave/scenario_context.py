@@ -11,4 +11,5 @@ class ScenarioContext:
     isSetup: bool = False
     isConcurrent: bool = False
     isTeardown: bool = False
-    isParallel: bool = False
\ No newline at end of file
+    isParallel: bool = False
+    isAsync: bool = False
\ No newline at end of file
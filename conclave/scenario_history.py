@@ -0,0 +1,69 @@
+import json
+import os
+from typing import Any, Optional
+
+from .task import Task
+
+
+class ScenarioHistory:
+
+    """
+    Keeps the elapsed time and outcome of scenarios from earlier runs. The history is
+    used by the scheduling policies to estimate how long a scenario will take and how
+    likely it is to fail.
+    """
+    def __init__(self, maxSamples: int = 10) -> None:
+        self.maxSamples = maxSamples
+        self.durations: dict[str, list[float]] = {}
+        self.outcomes: dict[str, list[bool]] = {}
+
+    @staticmethod
+    def scenarioKey(task: Task) -> str:
+        return task.id
+
+    def record(self, key: str, elapsed: float, failed: bool):
+        samples = self.durations.setdefault(key, [])
+        samples.append(elapsed)
+        del samples[:-self.maxSamples]
+        outcomes = self.outcomes.setdefault(key, [])
+        outcomes.append(failed)
+        del outcomes[:-self.maxSamples]
+
+    def recordTaskReport(self, taskReport: Any):
+        """
+        Record the result of all executed scenarios in a task report. Skipped scenarios
+        are not recorded since they carry no timing information
+        """
+        for t in taskReport:
+            if t["scenario"] is None or t["status"] not in ("success","failed"):
+                continue
+            self.record(self.scenarioKey(t["task"]), t["scenario"].elapsed, t["status"] == "failed")
+
+    def getElapsed(self, key: str) -> Optional[float]:
+        samples = self.durations.get(key)
+        if not samples:
+            return None
+        return sum(samples) / len(samples)
+
+    def getFailureRate(self, key: str) -> float:
+        outcomes = self.outcomes.get(key)
+        if not outcomes:
+            return 0.0
+        return len([x for x in outcomes if x]) / len(outcomes)
+
+    def save(self, fileName: str):
+        dirs = os.path.dirname(fileName)
+        if dirs:
+            os.makedirs(dirs, exist_ok=True)
+        with open(fileName, "w", encoding='utf8') as fh:
+            json.dump({"durations": self.durations, "outcomes": self.outcomes}, fh)
+
+    @staticmethod
+    def load(fileName: str, maxSamples: int = 10) -> "ScenarioHistory":
+        history = ScenarioHistory(maxSamples)
+        if os.path.isfile(fileName):
+            with open(fileName, "r", encoding='utf8') as fh:
+                data = json.load(fh)
+            history.durations = data.get("durations", {})
+            history.outcomes = data.get("outcomes", {})
+        return history
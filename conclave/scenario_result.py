@@ -12,4 +12,6 @@ class ScenarioResult:
     threadId: int = None
     pid: int = None
     startTime: Any = None
-    endTime: Any = None
\ No newline at end of file
+    endTime: Any = None
+    host: str = None
+    logFile: str = None
\ No newline at end of file
@@ -0,0 +1,112 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+from .scenario_history import ScenarioHistory
+from .task import Task
+
+
+class SchedulingPolicy(ABC):
+
+    """
+    Decides the order in which ready tasks are handed to the thread and process pools.
+    Tasks with the lowest priority value are dispatched first. Tasks with the same
+    priority are dispatched in the order they were parsed. Subclasses must implement
+    priority().
+    """
+    def __init__(self, history: ScenarioHistory = None) -> None:
+        self.history = history
+        self.defaultElapsed = 0.0
+
+    def prepare(self, taskList: list[Task], groups: dict[str, list[str]]):
+        """
+        Called with all the tasks of a phase (setup, main or teardown) before any of them
+        are dispatched
+        """
+        if self.history is None:
+            self.history = ScenarioHistory()
+        known = [e for e in (self.history.getElapsed(ScenarioHistory.scenarioKey(t)) for t in taskList) if e is not None]
+        self.defaultElapsed = sum(known) / len(known) if known else 0.0
+
+    @abstractmethod
+    def priority(self, task: Task) -> Any:
+        """
+        Priority of a ready task, compared with the priority of the other ready tasks
+        """
+
+    def expectedElapsed(self, task: Task) -> float:
+        """
+        Expected elapsed time of a task. Tasks without history are expected to take the
+        average time of the tasks with history
+        """
+        elapsed = self.history.getElapsed(ScenarioHistory.scenarioKey(task))
+        return elapsed if elapsed is not None else self.defaultElapsed
+
+
+class FifoSchedulingPolicy(SchedulingPolicy):
+
+    def priority(self, task: Task) -> Any:
+        return 0
+
+
+class LongestProcessingTimeFirstPolicy(SchedulingPolicy):
+
+    """
+    Dispatch the tasks with the longest expected elapsed time first
+    """
+    def priority(self, task: Task) -> Any:
+        return -self.expectedElapsed(task)
+
+
+class CriticalPathFirstPolicy(SchedulingPolicy):
+
+    """
+    Dispatch the tasks with the longest chain of expected elapsed time through their
+    dependents (@depends_ and @dependsGroups_) first
+    """
+    def __init__(self, history: ScenarioHistory = None) -> None:
+        super().__init__(history)
+        self.criticalPath: dict[str, float] = {}
+
+    def prepare(self, taskList: list[Task], groups: dict[str, list[str]]):
+        super().prepare(taskList, groups)
+        tasksById = {t.id: t for t in taskList}
+        dependents: dict[str, set[str]] = {}
+        for t in taskList:
+            parents = set(t.depends)
+            for g in t.dependsGroups:
+                parents.update(groups.get(g, []))
+            for p in parents:
+                if p in tasksById and p != t.id:
+                    dependents.setdefault(p, set()).add(t.id)
+
+        self.criticalPath = {}
+        visiting: set[str] = set()
+        for t in taskList:
+            stack = [(t.id, False)]
+            while stack:
+                taskId, expanded = stack.pop()
+                if taskId in self.criticalPath:
+                    continue
+                children = dependents.get(taskId, set())
+                if not expanded:
+                    visiting.add(taskId)
+                    stack.append((taskId, True))
+                    # ignore edges that would close a cycle, such tasks never become ready anyway
+                    stack.extend((c, False) for c in children if c not in self.criticalPath and c not in visiting)
+                else:
+                    visiting.discard(taskId)
+                    longest = max((self.criticalPath.get(c, 0.0) for c in children), default=0.0)
+                    self.criticalPath[taskId] = self.expectedElapsed(tasksById[taskId]) + longest
+
+    def priority(self, task: Task) -> Any:
+        return -self.criticalPath.get(task.id, self.expectedElapsed(task))
+
+
+class FailingFirstPolicy(SchedulingPolicy):
+
+    """
+    Dispatch the tasks that failed most often in earlier runs first so failures are
+    reported early. Tasks with the same failure rate are dispatched longest first
+    """
+    def priority(self, task: Task) -> Any:
+        return (-self.history.getFailureRate(ScenarioHistory.scenarioKey(task)), -self.expectedElapsed(task))
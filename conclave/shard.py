@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+import datetime
+import json
+import os
+from typing import Any
+
+from .result_journal import deserializeEntry, serializeEntry
+from .scenario_history import ScenarioHistory
+from .task import Task
+from .testresult_info import TestResultInfo
+
+
+def partitionTasks(taskList: list[Task], groups: dict[str, list[str]], shardCount: int, history: ScenarioHistory = None) -> list[list[Task]]:
+    """
+    Partition the tasks into shardCount shards with a similar expected elapsed time.
+    Tasks connected through @depends_ or @dependsGroups_ tags are kept on the same shard.
+    Sequential tasks do not depend on each other and are spread like any other task, each
+    shard runs its own sequential tasks one after the other. The partition only depends
+    on the tasks and the history so every shard computes the same partition as long as
+    they use the same history
+    """
+    parent = list(range(len(taskList)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        i,j = find(i),find(j)
+        if i != j:
+            parent[max(i, j)] = min(i, j)
+
+    indexById: dict[str, list[int]] = {}
+    for i,t in enumerate(taskList):
+        indexById.setdefault(t.id, []).append(i)
+    for i,t in enumerate(taskList):
+        parents = list(t.depends)
+        for g in t.dependsGroups:
+            parents.extend(groups.get(g, []))
+        for p in parents:
+            for j in indexById.get(p, []):
+                union(i, j)
+        # tasks with the same id can not be told apart by their dependents
+        for j in indexById[t.id]:
+            union(i, j)
+
+    known = [e for e in (history.getElapsed(ScenarioHistory.scenarioKey(t)) for t in taskList) if e is not None] if history else []
+    defaultElapsed = sum(known) / len(known) if known else 1.0
+    components: dict[int, list[int]] = {}
+    weights: dict[int, float] = {}
+    for i,t in enumerate(taskList):
+        root = find(i)
+        elapsed = history.getElapsed(ScenarioHistory.scenarioKey(t)) if history else None
+        components.setdefault(root, []).append(i)
+        weights[root] = weights.get(root, 0.0) + (elapsed if elapsed is not None else defaultElapsed)
+
+    # longest processing time first: place the heaviest component on the least loaded shard
+    shards: list[list[int]] = [[] for _ in range(shardCount)]
+    loads = [0.0] * shardCount
+    for root in sorted(components, key=lambda r: (-weights[r], min(taskList[i].id for i in components[r]))):
+        shard = min(range(shardCount), key=lambda s: (loads[s], s))
+        shards[shard].extend(components[root])
+        loads[shard] += weights[root]
+    return [[taskList[i] for i in sorted(shard)] for shard in shards]
+
+
+@dataclass
+class ShardResult:
+    taskReport: list[dict[str, Any]]
+    testResult: TestResultInfo
+    groups: dict[str, list[str]]
+
+
+def saveShardResult(fileName: str, taskReport: list[dict[str, Any]], testResult: TestResultInfo, groups: dict[str, list[str]]):
+    """
+    Save the task report and test result of a shard as JSON so the results of all shards
+    can be merged with loadShardResults
+    """
+    dirs = os.path.dirname(fileName)
+    if dirs:
+        os.makedirs(dirs, exist_ok=True)
+    data = {
+        "testResult": vars(testResult),
+        "groups": groups,
+        "taskReport": [serializeEntry(t) for t in taskReport]
+    }
+    with open(fileName, "w", encoding='utf8') as fh:
+        json.dump(data, fh, default=lambda o: o.isoformat() if isinstance(o, datetime.datetime) else str(o))
+
+
+def loadShardResults(fileNames: list[str]) -> ShardResult:
+    """
+    Load and merge the results saved by saveShardResult. Setup and teardown scenarios
+    run on every shard, so scenarios reported by several shards are only kept once and
+    the failed result is kept over a successful one and a successful over a skipped one
+    """
+    rank = {"failed": 0, "success": 1, "skipped": 2}
+    entries: dict[tuple, dict[str, Any]] = {}
+    results: list[TestResultInfo] = []
+    groups: dict[str, list[str]] = {}
+    for fileName in fileNames:
+        with open(fileName, "r", encoding='utf8') as fh:
+            data = json.load(fh)
+        results.append(TestResultInfo(**data["testResult"]))
+        for name,ids in data["groups"].items():
+            members = groups.setdefault(name, [])
+            members.extend(i for i in ids if i not in members)
+        for t in data["taskReport"]:
+            key = (t["id"], t["feature"], t["name"])
+            if key not in entries or rank.get(t["status"], 0) < rank.get(entries[key]["status"], 0):
+                entries[key] = t
+    if not results:
+        raise ValueError("no shard results to merge")
+
+    dateFormat = "%m/%d/%Y, %H:%M:%S"
+    taskReport = [deserializeEntry(t) for t in entries.values()]
+    testResult = TestResultInfo(
+        # the shards run at the same time so the merged run takes as long as the slowest shard
+        elapsed=max(r.elapsed for r in results),
+        start=min((r.start for r in results), key=lambda d: datetime.datetime.strptime(d, dateFormat)),
+        end=max((r.end for r in results), key=lambda d: datetime.datetime.strptime(d, dateFormat)),
+        numCpu=sum(r.numCpu for r in results),
+        success=all(r.success for r in results) and not any(t["status"] == "failed" for t in taskReport),
+        pid=results[0].pid,
+        hosts=sorted(set(h for r in results for h in r.hosts))
+    )
+    return ShardResult(taskReport=taskReport, testResult=testResult, groups=groups)
@@ -1,17 +1,19 @@
-from dataclasses import asdict, dataclass
-import multiprocessing
 from typing import Any, Callable, Optional
+import asyncio
+import contextvars
+import inspect
 import time
 import traceback
 import functools
-import re
 import os
 import threading
 from datetime import datetime
 
-from .feedback_schema import FeatureInfo, ScenarioInfo, StepFeedback
+from .feedback_channel import ScenarioFeedbackSender
+from .output_capture import captureStepOutput
 from .task_logger import TaskLogger
 from .step_definition import StepDefinition
+from .step_index import StepIndex
 from .step_result import StepResult
 
 class Step:
@@ -23,85 +25,169 @@ class Step:
     @Step(pattern="I login to webiste")
     def mystep(logger, world, match):
         logger.log(f"mystep called")
+
+    A timeout in seconds can be given to fail the step if it does not complete in time:
+
+    @Step(pattern="I wait for the server", timeout=30)
+
+    A Python thread can not be stopped, so a synchronous step that times out is only
+    abandoned: it keeps running in a daemon thread until it returns, while the scenario
+    continues. Tag the scenario with @timeout_<seconds> to have a hung scenario stopped,
+    the worker process running it is then terminated
+
+    Step definitions can also be coroutines. They are awaited on the event loop of
+    scenarios tagged with @async and run with asyncio.run in other scenarios:
+
+    @Step(pattern="I call the api")
+    async def callApi(logger, world, match, context):
+        await asyncio.sleep(1)
     """ 
     stepDefinitions: list[StepDefinition] = []
+    stepIndex: StepIndex = StepIndex()
 
-    def __init__(self, pattern: str) -> None:
+    def __init__(self, pattern: str, timeout: float = None) -> None:
         self.pattern = pattern
+        self.timeout = timeout
 
     def __call__(self, func) -> Any:
-        
+        if inspect.iscoroutinefunction(func):
+            return self.__wrapCoroutine(func)
+
         @functools.wraps(func)
         def wrapper_func(*args,**kwargs):
             start = time.time()
             pid = os.getpid()
             threadId = threading.get_ident()
             result,exc,elapsed = None,None,0.0
-            logger = TaskLogger(f"{args[0].funcName}/{func.__name__}")
-            parentLogger = args[0]
-            newargs = list(args)
-            newargs[0] = logger
-            gherkinStep = newargs[3]
-            gherkinScenario = newargs[4]
-            gherkinFeature = newargs[5]
-            scenarioScope = newargs[6]
-            feedbackQueue = newargs[-1]
-            newargs.pop()
-            newargs.pop()
-            newargs.pop()
-            newargs.pop()
-            newargs.pop()
-            newargs.append(scenarioScope)
-            args2 = tuple(newargs)
+            logger,parentLogger,args2,gherkinStep,gherkinScenario,gherkinFeature,feedbackQueue = self.__stepArgs(func,args)
             try:
                 self.notifyStepStarted(feedbackQueue,start,gherkinStep,gherkinScenario,gherkinFeature)
-                result = func(*args2,**kwargs)
+                with captureStepOutput(logger):
+                    if self.timeout is None:
+                        result = func(*args2,**kwargs)
+                    else:
+                        result = self.__runWithTimeout(func,args2,kwargs)
             except Exception:
                 exc = traceback.format_exc()
             finally:
                 end = time.time()
                 elapsed = end-start
-                parentLogger.msg += logger.msg
+                parentLogger.extend(logger)
                 return StepResult(elapsed,result,exc,threadId,pid,datetime.fromtimestamp(start),datetime.fromtimestamp(end),logger.msg)
-        Step.stepDefinitions.append(StepDefinition(self.pattern,wrapper_func))
+        Step.register(StepDefinition(self.pattern,wrapper_func))
+        return wrapper_func
+
+    def __stepArgs(self, func: Callable, args: tuple) -> tuple:
+        """
+        Split the arguments passed by the scenario into the arguments of the step function
+        and the gherkin objects used for the feedback
+        """
+        parentLogger: TaskLogger = args[0]
+        logger = parentLogger.child(f"{parentLogger.funcName}/{func.__name__}")
+        newargs = list(args)
+        newargs[0] = logger
+        gherkinStep = newargs[3]
+        gherkinScenario = newargs[4]
+        gherkinFeature = newargs[5]
+        scenarioScope = newargs[6]
+        feedbackQueue = newargs[-1]
+        del newargs[3:]
+        newargs.append(scenarioScope)
+        return logger,parentLogger,tuple(newargs),gherkinStep,gherkinScenario,gherkinFeature,feedbackQueue
+
+    def __wrapCoroutine(self, func: Callable) -> Callable:
+
+        @functools.wraps(func)
+        async def wrapper_func(*args,**kwargs):
+            start = time.time()
+            pid = os.getpid()
+            threadId = threading.get_ident()
+            result,exc = None,None
+            logger,parentLogger,args2,gherkinStep,gherkinScenario,gherkinFeature,feedbackQueue = self.__stepArgs(func,args)
+            # unlike the synchronous wrapper the result is not returned from a finally block,
+            # so cancelling the scenario cancels the step
+            try:
+                self.notifyStepStarted(feedbackQueue,start,gherkinStep,gherkinScenario,gherkinFeature)
+                with captureStepOutput(logger):
+                    if self.timeout is None:
+                        result = await func(*args2,**kwargs)
+                    else:
+                        try:
+                            result = await asyncio.wait_for(func(*args2,**kwargs),self.timeout)
+                        except asyncio.TimeoutError:
+                            raise TimeoutError(f"step did not complete within {self.timeout} (s)")
+            except Exception:
+                exc = traceback.format_exc()
+            end = time.time()
+            parentLogger.extend(logger)
+            return StepResult(end-start,result,exc,threadId,pid,datetime.fromtimestamp(start),datetime.fromtimestamp(end),logger.msg)
+        Step.register(StepDefinition(self.pattern,wrapper_func))
         return wrapper_func
+
+    @staticmethod
+    def callStep(func: Callable, *args) -> StepResult:
+        """
+        Call a step definition from synchronous code. Coroutine step definitions are run
+        to completion in a new event loop
+        """
+        if inspect.iscoroutinefunction(func):
+            return asyncio.run(func(*args))
+        return func(*args)
+
+    @staticmethod
+    async def awaitStep(func: Callable, *args) -> StepResult:
+        """
+        Call a step definition from an async scenario. Synchronous step definitions run in
+        a worker thread so they do not block the event loop
+        """
+        if inspect.iscoroutinefunction(func):
+            return await func(*args)
+        return await asyncio.to_thread(func, *args)
     
-    def notifyStepStarted(self,queue: multiprocessing.Queue, start: float, gherkinStep: Any, gherkinScenario: Any, gherkinFeature: Any):
+    def __runWithTimeout(self, func: Callable, args: tuple, kwargs: dict) -> Any:
+        """
+        Run the step function in a separate daemon thread and wait for it to complete
+        within the timeout. A step that does not complete in time is abandoned and the step
+        fails, the thread keeps running until the step function returns
+        """
+        outcome = {}
+        def target():
+            try:
+                outcome["result"] = func(*args,**kwargs)
+            except BaseException as e:
+                outcome["error"] = e
+        # the thread runs in a copy of the context so the step output is still captured
+        thread = threading.Thread(target=contextvars.copy_context().run,args=(target,),daemon=True)
+        thread.start()
+        thread.join(self.timeout)
+        if thread.is_alive():
+            raise TimeoutError(f"step did not complete within {self.timeout} (s)")
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome.get("result")
+
+    def notifyStepStarted(self,queue: ScenarioFeedbackSender, start: float, gherkinStep: Any, gherkinScenario: Any, gherkinFeature: Any):
         try:
-            msg = asdict(StepFeedback(
-                threadId=threading.get_ident(),
-                elapsed=0,
-                endTime=None,
-                pid=os.getpid(),
-                startTime=datetime.fromtimestamp(start),
-                status="starting",
-                column=gherkinStep["location"]["column"],
-                line=gherkinStep["location"]["line"],
-                keyword=gherkinStep["keyword"],
-                text=gherkinStep["text"],
-                scenario=ScenarioInfo(
-                    name=gherkinScenario["name"],
-                    column=gherkinScenario["location"]["column"],
-                    line=gherkinScenario["location"]["line"],
-                    description=gherkinScenario["description"],
-                    tags=[t["name"] for t in gherkinScenario["tags"]],
-                    numberOfSteps=len(gherkinScenario["steps"])
-                ),
-                feature=FeatureInfo(
-                    description=gherkinFeature["description"],
-                    name=gherkinFeature["name"],
-                    tags=[t["name"] for t in gherkinFeature["tags"]]
-                )
-            ))
-            queue.put_nowait(msg)
+            queue.step(gherkinStep,"starting",None,0,os.getpid(),threading.get_ident(),datetime.fromtimestamp(start),None,None)
         except:
             pass
- 
-    
+
+    @staticmethod
+    def register(definition: StepDefinition):
+        Step.stepDefinitions.append(definition)
+        Step.stepIndex.add(definition)
+
     @staticmethod
     def getStep(text: str) -> Optional[Callable]:
-        for step in Step.stepDefinitions:
-            result = re.search(step.pattern,text)
-            if result:
-                return step.func,result
-        return None,None
+        definition,result = Step.stepIndex.find(text)
+        if definition is None:
+            return None,None
+        return definition.func,result
+
+    @staticmethod
+    def findAmbiguousSteps(texts: list[str]) -> dict[str, list[StepDefinition]]:
+        """
+        Return the step texts that are matched by more than one step definition. Only the
+        first registered definition is used for those steps
+        """
+        return Step.stepIndex.findAmbiguous(texts)
@@ -0,0 +1,129 @@
+import collections
+import concurrent.futures
+import os
+import threading
+from typing import Any, Callable
+
+
+class StepExecutor:
+
+    """
+    Thread pool shared by all scenarios of a process to run their concurrent and
+    background steps. At most maxWorkers threads are started, and they are only started
+    when steps are submitted. Every scenario has its own queue and the threads take the
+    next step from the queues in turn, so a scenario submitting many steps does not
+    hold back the steps of the other scenarios.
+
+    The runner also runs its concurrent scenarios in a StepExecutor. The threads are
+    daemon threads, so unlike a ThreadPoolExecutor a cancelled scenario that is still
+    running its step does not keep the process from exiting
+    """
+    def __init__(self, maxWorkers: int = 64, name: str = "paraworld-step") -> None:
+        if maxWorkers < 1:
+            raise ValueError("maxWorkers must be at least 1")
+        self.maxWorkers = maxWorkers
+        self.name = name
+        self.stopped = False
+        self.queues: dict[Any, collections.deque] = {}
+        self.owners: collections.deque = collections.deque()
+        self.threads: list[threading.Thread] = []
+        self.idleThreads = 0
+        self.queued = 0
+        self.condition = threading.Condition()
+
+    def submit(self, owner: Any, fn: Callable, *args, **kwargs) -> concurrent.futures.Future:
+        """
+        Queue a call on behalf of owner, typically a scenario, and return its future. The
+        future can be cancelled until a thread starts running it
+        """
+        future = concurrent.futures.Future()
+        with self.condition:
+            if self.stopped:
+                raise RuntimeError("cannot submit after shutdown")
+            if owner not in self.queues:
+                self.queues[owner] = collections.deque()
+                self.owners.append(owner)
+            self.queues[owner].append((future, fn, args, kwargs))
+            self.queued += 1
+            # idle threads that were notified may not have taken their step yet
+            if self.queued > self.idleThreads and len(self.threads) < self.maxWorkers:
+                thread = threading.Thread(target=self.__work, daemon=True, name=f"{self.name}-{len(self.threads)}")
+                self.threads.append(thread)
+                thread.start()
+            self.condition.notify()
+        return future
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """
+        Stop the threads once they have no more calls to run, like the shutdown of an
+        executor. With cancel_futures the queued calls are cancelled
+        """
+        with self.condition:
+            self.stopped = True
+            if cancel_futures:
+                while self.owners:
+                    self.__next()[0].cancel()
+            self.condition.notify_all()
+        if wait:
+            for thread in self.threads:
+                thread.join()
+
+    def __next(self) -> tuple:
+        owner = self.owners.popleft()
+        queue = self.queues[owner]
+        item = queue.popleft()
+        self.queued -= 1
+        if queue:
+            self.owners.append(owner)
+        else:
+            del self.queues[owner]
+        return item
+
+    def __work(self):
+        while True:
+            with self.condition:
+                while not self.owners:
+                    if self.stopped:
+                        return
+                    self.idleThreads += 1
+                    self.condition.wait()
+                    self.idleThreads -= 1
+                future,fn,args,kwargs = self.__next()
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+_stepExecutors: dict[int, StepExecutor] = {}
+_maxWorkers = 64
+_lock = threading.Lock()
+
+
+def configureStepExecutor(maxWorkers: int):
+    """
+    Set the maximum number of step threads of the current process. The executor keeps
+    its threads if it has already been created and only starts new ones up to the limit
+    """
+    global _maxWorkers
+    if maxWorkers < 1:
+        raise ValueError("maxStepThreads must be at least 1")
+    with _lock:
+        _maxWorkers = maxWorkers
+        executor = _stepExecutors.get(os.getpid())
+        if executor is not None:
+            executor.maxWorkers = maxWorkers
+
+
+def getStepExecutor() -> StepExecutor:
+    """
+    Return the step executor shared by all scenarios of the current process
+    """
+    with _lock:
+        # a forked worker process must not use the threads of its parent
+        pid = os.getpid()
+        if pid not in _stepExecutors:
+            _stepExecutors[pid] = StepExecutor(_maxWorkers)
+        return _stepExecutors[pid]
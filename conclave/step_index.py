@@ -0,0 +1,143 @@
+import re
+import threading
+from typing import Any, Optional
+
+from .step_definition import StepDefinition
+
+
+_SPECIAL = set(".^$*+?{}[]\\|()")
+
+
+def _hasTopLevelAlternation(pattern: str) -> bool:
+    depth,inClass,i = 0,False,0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if inClass:
+            inClass = c != "]"
+        elif c == "[":
+            inClass = True
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+def literalPrefix(pattern: str) -> str:
+    """
+    Return the literal text every string matched by an anchored pattern starts with.
+    The prefix is empty when the pattern is not anchored with ^ or starts with a
+    special construct
+    """
+    if not pattern.startswith("^") or _hasTopLevelAlternation(pattern):
+        return ""
+    prefix = []
+    i = 1
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            if i + 1 >= len(pattern) or pattern[i+1].isalnum():
+                break
+            literal,size = pattern[i+1],2
+        elif c in _SPECIAL:
+            break
+        else:
+            literal,size = c,1
+        quantifier = pattern[i+size:i+size+1]
+        # an optional character is not part of the prefix
+        if quantifier and quantifier in "*?{":
+            break
+        prefix.append(literal)
+        i += size
+        if quantifier == "+":
+            break
+    return "".join(prefix)
+
+
+class StepIndex:
+
+    """
+    Index of the step definitions used to find the definition matching a step text.
+    Patterns are compiled once when they are registered and anchored patterns are put
+    in buckets keyed by the start of their literal prefix, so a lookup only runs the
+    patterns that can possibly match. Lookups are memoized per process and the first
+    registered definition that matches wins, the same as a linear search.
+    """
+    def __init__(self, bucketLength: int = 8, maxMemo: int = 100000) -> None:
+        self.bucketLength = bucketLength
+        self.maxMemo = maxMemo
+        self.definitions: list[tuple[re.Pattern, StepDefinition]] = []
+        self.buckets: dict[str, list[int]] = {}
+        self.bucketLengths: list[int] = []
+        self.unanchored: list[int] = []
+        self.memo: dict[str, tuple[Optional[StepDefinition], Optional[re.Match]]] = {}
+        self.duplicates: list[str] = []
+        self.__patterns: set[str] = set()
+        self.__lock = threading.Lock()
+
+    def add(self, definition: StepDefinition):
+        regex = re.compile(definition.pattern)
+        with self.__lock:
+            if definition.pattern in self.__patterns:
+                self.duplicates.append(definition.pattern)
+            self.__patterns.add(definition.pattern)
+            order = len(self.definitions)
+            self.definitions.append((regex, definition))
+            key = literalPrefix(definition.pattern)[:self.bucketLength]
+            if key:
+                self.buckets.setdefault(key, []).append(order)
+                if len(key) not in self.bucketLengths:
+                    self.bucketLengths.append(len(key))
+            else:
+                self.unanchored.append(order)
+            # a new definition can match texts that were looked up before
+            self.memo = {}
+
+    def __candidates(self, text: str) -> list[int]:
+        candidates = list(self.unanchored)
+        for length in self.bucketLengths:
+            candidates.extend(self.buckets.get(text[:length], []))
+        candidates.sort()
+        return candidates
+
+    def find(self, text: str) -> tuple[Optional[StepDefinition], Optional[re.Match]]:
+        """
+        Return the first registered definition matching the text and the match
+        """
+        memo = self.memo
+        if text in memo:
+            return memo[text]
+        result = (None, None)
+        for order in self.__candidates(text):
+            regex,definition = self.definitions[order]
+            match = regex.search(text)
+            if match:
+                result = (definition, match)
+                break
+        if len(memo) >= self.maxMemo:
+            memo.clear()
+        memo[text] = result
+        return result
+
+    def findAll(self, text: str) -> list[StepDefinition]:
+        """
+        Return every definition matching the text in the order they were registered
+        """
+        return [self.definitions[o][1] for o in self.__candidates(text) if self.definitions[o][0].search(text)]
+
+    def findAmbiguous(self, texts: Any) -> dict[str, list[StepDefinition]]:
+        """
+        Return the step texts matched by more than one definition
+        """
+        ambiguous = {}
+        for text in set(texts):
+            matches = self.findAll(text)
+            if len(matches) > 1:
+                ambiguous[text] = matches
+        return ambiguous
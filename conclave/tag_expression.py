@@ -0,0 +1,97 @@
+import re
+from typing import Any
+
+
+class TagExpression:
+
+    """
+    Boolean tag expression such as "@smoke and not (@slow or @flaky)". The operators
+    are not, and and or in decreasing order of precedence and parentheses can be used
+    for grouping. An expression can be evaluated against the tags of a scenario or
+    against a TagIndex, which selects the matching scenarios with set operations
+    instead of visiting every scenario.
+    """
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.tokens = re.findall(r"\(|\)|[^\s()]+", text)
+        self.position = 0
+        self.node = self.__parseOr()
+        if self.position < len(self.tokens):
+            raise ValueError(f"invalid tag expression: {text}. Unexpected '{self.tokens[self.position]}'")
+
+    @staticmethod
+    def anyOf(tags: list[str]) -> "TagExpression":
+        return TagExpression(" or ".join(tags))
+
+    def __peek(self) -> str:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def __next(self) -> str:
+        token = self.__peek()
+        if token is None:
+            raise ValueError(f"invalid tag expression: {self.text}. Unexpected end of expression")
+        self.position += 1
+        return token
+
+    def __parseOr(self) -> Any:
+        node = self.__parseAnd()
+        while self.__peek() == "or":
+            self.__next()
+            node = ("or", node, self.__parseAnd())
+        return node
+
+    def __parseAnd(self) -> Any:
+        node = self.__parseNot()
+        while self.__peek() == "and":
+            self.__next()
+            node = ("and", node, self.__parseNot())
+        return node
+
+    def __parseNot(self) -> Any:
+        if self.__peek() == "not":
+            self.__next()
+            return ("not", self.__parseNot())
+        return self.__parsePrimary()
+
+    def __parsePrimary(self) -> Any:
+        token = self.__next()
+        if token == "(":
+            node = self.__parseOr()
+            if self.__next() != ")":
+                raise ValueError(f"invalid tag expression: {self.text}. Missing ')'")
+            return node
+        if not token.startswith("@"):
+            raise ValueError(f"invalid tag expression: {self.text}. Tags must start with @ but got '{token}'")
+        return ("tag", token)
+
+    def evaluate(self, tags: set[str]) -> bool:
+        """
+        Check whether a set of tags matches the expression
+        """
+        def visit(node):
+            if node[0] == "tag":
+                return node[1] in tags
+            if node[0] == "not":
+                return not visit(node[1])
+            if node[0] == "and":
+                return visit(node[1]) and visit(node[2])
+            return visit(node[1]) or visit(node[2])
+        return visit(self.node)
+
+    def select(self, postings: dict[str, set[int]], universe: set[int]) -> set[int]:
+        """
+        Return the keys matching the expression given the keys tagged with each tag and
+        the set of all keys
+        """
+        def visit(node):
+            if node[0] == "tag":
+                return postings.get(node[1], set())
+            if node[0] == "not":
+                return universe - visit(node[1])
+            if node[0] == "and":
+                return visit(node[1]) & visit(node[2])
+            return visit(node[1]) | visit(node[2])
+        return visit(self.node)
+
+    def __str__(self) -> str:
+        return self.text
@@ -0,0 +1,82 @@
+from dataclasses import dataclass, field
+from typing import Any, Union
+
+from .outline import expandOutline
+from .tag_expression import TagExpression
+
+
+@dataclass
+class IndexedScenario:
+    featureFile: str
+    feature: Any
+    scenario: Any
+    tags: set[str] = field(default_factory=set)
+    rule: Any = None
+    outlineRow: int = None
+
+
+class TagIndex:
+
+    """
+    Inverted index from tag to the scenarios carrying it. Scenarios inherit the tags of
+    their feature and rule and Scenario Outlines are indexed as one scenario per row
+    of their Examples. The index is built while the feature files are parsed so selecting
+    the scenarios matching a tag expression only touches the matching scenarios.
+
+    Example usage:
+
+    index = TagIndex.fromDocuments(FeatureParser().parseFiles(["features/login.feature"]))
+    for s in index.select("@smoke and not @slow"):
+        print(f"{s.featureFile}: {s.scenario['name']}")
+    """
+    def __init__(self) -> None:
+        self.scenarios: list[IndexedScenario] = []
+        self.postings: dict[str, set[int]] = {}
+        self.allKeys: set[int] = set()
+
+    @staticmethod
+    def fromDocuments(documents: list[tuple[str, Any]]) -> "TagIndex":
+        index = TagIndex()
+        for featureFile,document in documents:
+            index.addDocument(featureFile, document)
+        return index
+
+    def addDocument(self, featureFile: str, document: Any):
+        if not document or "feature" not in document or "children" not in document["feature"]:
+            return
+        feature = document["feature"]
+        for child in feature["children"]:
+            if "scenario" in child:
+                self.add(featureFile, feature, child["scenario"])
+            elif "rule" in child:
+                for ruleChild in child["rule"]["children"]:
+                    if "scenario" in ruleChild:
+                        self.add(featureFile, feature, ruleChild["scenario"], child["rule"])
+
+    def add(self, featureFile: str, feature: Any, scenario: Any, rule: Any = None):
+        ruleTags = {t["name"] for t in rule.get("tags", [])} if rule else set()
+        for expanded,outlineRow in expandOutline(scenario):
+            key = len(self.scenarios)
+            tags = {t["name"] for t in feature["tags"]} | ruleTags | {t["name"] for t in expanded["tags"]}
+            self.scenarios.append(IndexedScenario(featureFile, feature, expanded, tags, rule, outlineRow))
+            self.allKeys.add(key)
+            for tag in tags:
+                self.postings.setdefault(tag, set()).add(key)
+
+    def select(self, expression: Union[str, TagExpression, None] = None) -> list[IndexedScenario]:
+        """
+        Return the scenarios matching a tag expression in the order they were added. All
+        scenarios are returned when no expression is given
+        """
+        if expression is None:
+            return list(self.scenarios)
+        if isinstance(expression, str):
+            expression = TagExpression(expression)
+        keys = expression.select(self.postings, self.allKeys)
+        return [self.scenarios[k] for k in sorted(keys)]
+
+    def getTags(self) -> dict[str, int]:
+        """
+        Return every tag with the number of scenarios carrying it
+        """
+        return {tag: len(keys) for tag,keys in sorted(self.postings.items())}
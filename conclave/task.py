@@ -18,5 +18,16 @@ class Task:
     isConcurrent: bool = False
     isTeardown: bool = False
     isParallel: bool = False
-    
-        
\ No newline at end of file
+    featureFile: str = None
+    timeout: float = None
+    resources: list[str] = field(default_factory=list)
+    isAsync: bool = False
+
+    def getMode(self) -> str:
+        """
+        Return whether the task runs in a "thread", in a "process" or on the event loop
+        of the runner ("async")
+        """
+        if self.isParallel and not self.isConcurrent:
+            return "process"
+        return "async" if self.isAsync else "thread"
@@ -1,12 +1,156 @@
+from collections import deque
 from .color import bcolors
 import datetime
+import os
+import threading
+
+
+class _LogFile:
+
+    """
+    Log file shared by the logger of a scenario and the loggers of its steps. The file is
+    opened when the first line is written and truncated, so it only holds the log of the
+    last run of the scenario. Lines written after it was closed, by a background step
+    that is still running, are appended
+    """
+    def __init__(self, fileName: str) -> None:
+        self.fileName = fileName
+        self.fh = None
+        self.mode = "w"
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        # the file is opened again in the process running the scenario
+        return {"fileName": self.fileName}
+
+    def __setstate__(self, state):
+        self.__init__(state["fileName"])
+
+    def write(self, text: str):
+        with self.lock:
+            if self.fh is None:
+                dirs = os.path.dirname(self.fileName)
+                if dirs:
+                    os.makedirs(dirs, exist_ok=True)
+                self.fh = open(self.fileName, self.mode, encoding='utf8')
+                self.mode = "a"
+            self.fh.write(text)
+
+    def close(self):
+        with self.lock:
+            if self.fh is not None:
+                self.fh.close()
+                self.fh = None
+
 
 class TaskLogger:
-    def __init__(self, funcName):
-        self.msg = ""
+
+    """
+    Log of a scenario or step. Messages are kept as chunks that are only joined when msg
+    is read. With maxSize the log keeps at most maxSize characters: the first half and
+    the last half of the log, with a marker for the characters dropped in between. With
+    logFile every message is also written to the file, which keeps the complete log. With
+    captureOutput the stdout and stderr written by steps are added to the log of the step
+    """
+    def __init__(self, funcName, maxSize: int = None, logFile: str = None, captureOutput: bool = False):
+        if maxSize is not None and maxSize < 2:
+            raise ValueError("maxSize must be at least 2")
         self.funcName = funcName
+        self.maxSize = maxSize
+        self.captureOutput = captureOutput
+        self.logFile = os.path.abspath(logFile) if logFile else None
+        self.file = _LogFile(self.logFile) if self.logFile else None
+        self.head: list[str] = []
+        self.headSize = 0
+        self.tail: deque[str] = deque()
+        self.tailSize = 0
+        self.truncated = 0
+        self.lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    @property
+    def msg(self) -> str:
+        with self.lock:
+            head = "".join(self.head)
+            self.head = [head] if head else []
+            if not self.truncated:
+                return head
+            return f"{head}\n... {self.truncated} characters truncated ...\n{''.join(self.tail)}"
+
+    @msg.setter
+    def msg(self, value: str):
+        with self.lock:
+            self.head,self.headSize,self.tail,self.tailSize,self.truncated = [],0,deque(),0,0
+        self.__append(value)
+
+    def __append(self, text: str):
+        if not text:
+            return
+        with self.lock:
+            if self.maxSize is None:
+                self.head.append(text)
+                self.headSize += len(text)
+                return
+            room = self.maxSize // 2 - self.headSize
+            if room > 0:
+                self.head.append(text[:room])
+                self.headSize += min(room, len(text))
+                text = text[room:]
+            if not text:
+                return
+            self.tail.append(text)
+            self.tailSize += len(text)
+            excess = self.tailSize - (self.maxSize - self.maxSize // 2)
+            while excess > 0:
+                first = self.tail[0]
+                if len(first) <= excess:
+                    self.tail.popleft()
+                    dropped = len(first)
+                else:
+                    self.tail[0] = first[excess:]
+                    dropped = excess
+                self.tailSize -= dropped
+                self.truncated += dropped
+                excess -= dropped
+
+    def __write(self, text: str):
+        self.__append(text)
+        if self.file is not None:
+            self.file.write(text)
+
+    def child(self, funcName) -> "TaskLogger":
+        """
+        Return a logger with the same size limit that writes to the same log file
+        """
+        logger = TaskLogger(funcName, self.maxSize, captureOutput=self.captureOutput)
+        logger.logFile,logger.file = self.logFile,self.file
+        return logger
+
+    def extend(self, logger: "TaskLogger"):
+        """
+        Append the log of a child logger. The child already wrote it to the log file
+        """
+        self.__append(logger.msg)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+    def output(self, stream: str, line: str):
+        """
+        Log a line the step wrote to stdout or stderr
+        """
+        self.__write(f"[{datetime.datetime.now().strftime('%m/%d/%Y, %H:%M:%S')} {self.funcName} {stream}] {line}\n")
 
     def log(self,msg):
-        self.msg += f"[{datetime.datetime.now().strftime('%m/%d/%Y, %H:%M:%S')} {self.funcName}] {msg}\n"
+        self.__write(f"[{datetime.datetime.now().strftime('%m/%d/%Y, %H:%M:%S')} {self.funcName}] {msg}\n")
     def error(self,msg):
-        self.msg += f"{bcolors.FAIL}[{datetime.datetime.now().strftime('%m/%d/%Y, %H:%M:%S')} {self.funcName}] {msg}{bcolors.ENDC}\n"
\ No newline at end of file
+        self.__write(f"{bcolors.FAIL}[{datetime.datetime.now().strftime('%m/%d/%Y, %H:%M:%S')} {self.funcName}] {msg}{bcolors.ENDC}\n")
@@ -1,29 +1,61 @@
 import multiprocessing
-import time
 import queue
 import threading
 
 
 class TaskMonitor(threading.Thread):
 
+    """
+    Collects the process ids of the worker processes running parallel scenarios. Every
+    scenario sends a tuple of (task id, pid) when it starts running in a worker process.
+    The monitor blocks on the queue until a message or the None sentinel sent by cancel
+    arrives
+    """
     def __init__(self):
         super(TaskMonitor, self).__init__()
         self.daemon = True
         self.cancelled = False
         self.signalQueue = multiprocessing.Manager().Queue()
         self.pids = []
+        self.taskPids: dict[str, int] = {}
+        self.lock = threading.Lock()
 
     def run(self):
         while not self.cancelled:
+            message = self.signalQueue.get()
+            if message is None:
+                break
+            self.__store(message)
+
+    def __store(self, message: tuple[str, int]):
+        taskId,pid = message
+        with self.lock:
+            self.pids.append(pid)
+            self.taskPids[taskId] = pid
+
+    def __receive(self):
+        while True:
             try:
-                msg = self.signalQueue.get(block=False)
-                #print(f"task pid: {msg}")
-                self.pids.append(msg)
+                message = self.signalQueue.get(block=False)
             except queue.Empty:
-                pass
-            time.sleep(1)
+                break
+            if message is None:
+                # leave the sentinel for the monitor thread
+                self.signalQueue.put(None)
+                break
+            self.__store(message)
+
+    def getPid(self, taskId: str) -> int:
+        """
+        Return the process id of the worker running a task or None if the task has not
+        started running in a worker process yet
+        """
+        self.__receive()
+        with self.lock:
+            return self.taskPids.get(taskId)
 
     def cancel(self):
         self.cancelled = True
+        self.signalQueue.put(None)
 
         
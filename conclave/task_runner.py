@@ -1,13 +1,12 @@
 import datetime
 import os
 import glob
-from typing import Any, Optional, Union
-from gherkin.token_scanner import TokenScanner
-from gherkin.parser import Parser
+from typing import Any, Callable, Optional, Union
 
 from .junit_report import JUnitReport
 
 from .feedback_adapter import FeedbackAdapter
+from .feedback_worker import AdapterStats, OverflowPolicy
 
 from .scenario_result import ScenarioResult
 from .feedback_schema import FeatureInfo, ScenarioFeedback
@@ -24,37 +23,94 @@ from .scenario_context import ScenarioContext
 import threading
 import concurrent
 from .color import bcolors
-from concurrent.futures import ThreadPoolExecutor, wait, ProcessPoolExecutor
+from concurrent.futures import wait, ProcessPoolExecutor
 from .scenario import Scenario
+from .step import Step
 from itertools import groupby
 import multiprocessing
-from gherkin.token_matcher import TokenMatcher
-from gherkin.dialect import Dialect
-from .custom_keywords import concurrent_keywords, match_stepline
+from .feature_parser import FeatureParser
+from .tag_expression import TagExpression
+from .tag_index import TagIndex
 from .dependency_graph import DependencyGraph
 import uuid
 import time
+import heapq
 import signal
 from .task_monitor import TaskMonitor
 from .task_runner_config import TaskRunnerConfig
+from .task_scheduler import TaskScheduler
+from .scheduling_policy import FifoSchedulingPolicy, SchedulingPolicy
+from .history_store import HistoryStore
+from .result_cache import ResultCache
+from .worker import initializeWorker
+from .step_executor import StepExecutor, configureStepExecutor
+from .event_loop import getEventLoop
+from .remote_executor import RemoteExecutor
+from .shard import loadShardResults, partitionTasks, saveShardResult
+from .result_journal import ResultJournal, loadJournal, summarizeEntry
 from .feedback import Feedback
-from dataclasses import asdict
-
-Dialect.concurrent_keywords = concurrent_keywords
-TokenMatcher.match_StepLine = match_stepline
+from dataclasses import asdict, fields
 
 class TaskRunner:
 
-    def __init__(self,debugMode=False,timeout=3600) -> None:
-        self.parser = Parser()
-        self.completedTasks: list[str] = []
+    def __init__(self,debugMode=False,timeout=3600,schedulingPolicy: SchedulingPolicy=None,historyStore: HistoryStore=None,
+                 maxThreads: int=None,maxProcesses: int=None,startMethod: str="spawn",oversubscription: float=1.0,
+                 workerInitializer: Callable=None,workerInitArgs: tuple=(),preloadModules: list[str]=None,
+                 resultCache: ResultCache=None,maxAsync: int=1000,maxStepThreads: int=64) -> None:
+        self.astCache: str = None
+        self.projectRoot: str = None
+        # directory the paths of the feature files are relative to in the scenario ids
+        self.featureRoot: str = None
+        self.parserProcesses: int = None
+        self.tagIndex: TagIndex = None
+        self.outlineIds: dict[str, list[str]] = {}
         self.groups = {}
-        self.pool = ThreadPoolExecutor()
-        self.parallelPool = ProcessPoolExecutor(max_workers=multiprocessing.cpu_count(),mp_context=multiprocessing.get_context("spawn"))
+        self.maxThreads = maxThreads
+        self.maxProcesses = maxProcesses
+        self.maxAsync = maxAsync
+        self.maxStepThreads = maxStepThreads
+        self.startMethod = startMethod
+        self.oversubscription = oversubscription
+        self.workerInitializer = workerInitializer
+        self.workerInitArgs = workerInitArgs
+        self.preloadModules: list[str] = preloadModules if preloadModules is not None else []
+        self.pool: StepExecutor = None
+        self.parallelPool: ProcessPoolExecutor = None
+        # single worker pools for scenarios with a timeout, started ahead and reused until
+        # their worker is terminated
+        self.idleIsolatedPools: list[ProcessPoolExecutor] = []
+        self.schedulingPolicy = schedulingPolicy if schedulingPolicy is not None else FifoSchedulingPolicy()
+        self.readyQueues: dict[str, list] = {"thread": [], "process": [], "async": []}
+        self.runningTasks: dict[str, int] = {"thread": 0, "process": 0, "async": 0}
+        self.readySequence = 0
+        self.resourceCapacity: dict[str, int] = {}
+        self.resourcesInUse: dict[str, int] = {}
+        self.resourceWaiters: dict[str, list[tuple]] = {}
+        self.remoteWorkers: list[str] = []
+        self.remoteAuthKey: str = None
+        self.remoteExecutors: list[RemoteExecutor] = []
+        self.remoteTasks: dict[concurrent.futures.Future, RemoteExecutor] = {}
+        # cancelled scenarios whose thread is still running and holding their resources
+        self.lingeringTasks: dict[concurrent.futures.Future, Task] = {}
+        self.historyStore = historyStore
+        self.resultCache = resultCache
+        self.rerunFailed = False
+        self.maxFailures: int = None
+        self.failureCount = 0
+        self.cacheKeys: dict[str, str] = {}
         self.taskReport = []
+        self.resultJournal: ResultJournal = None
+        self.maxLogSize: int = 1024*1024
+        self.logDir: str = None
+        self.captureOutput = False
+        self.journalFile: str = None
+        # full task report read back from the journal, loaded once after the run
+        self.journalReport: list[dict[str, Any]] = None
         self.setupTasks: list[Task] = []
         self.teardownTasks: list[Task] = []
-        self.allTaskIds: list[str] = []
+        self.allTaskIds: set[str] = set()
+        self.reportedTasks: set[tuple[str,str]] = set()
+        self.scheduler: TaskScheduler = None
         self.mainTasks: list[Task] = []
         self.debugMode: bool = debugMode
         self.testResult: TestResultInfo = None
@@ -65,20 +121,47 @@ class TaskRunner:
     def run(self, options: Union[list[str],TaskRunnerConfig]) -> TestResultInfo:
         
         if isinstance(options,TaskRunnerConfig):
+            self.__applyPoolConfig(options)
+            self.rerunFailed = options.rerunFailed
+            if self.rerunFailed and self.resultCache is None:
+                raise ValueError("rerunFailed requires a result cache")
+            if options.maxFailures is not None:
+                if options.maxFailures < 1:
+                    raise ValueError("maxFailures must be at least 1")
+                self.maxFailures = options.maxFailures
+            elif options.failFast:
+                self.maxFailures = 1
+            self.journalFile = options.resultJournal
+            if options.maxLogSize is not None:
+                self.maxLogSize = options.maxLogSize
+            self.logDir = options.logDir
+            self.captureOutput = options.captureOutput
+            if options.projectRoot is not None:
+                self.projectRoot = options.projectRoot
             if len(options.featureFiles) > 0:
-                files = self.__getAllFeatureFiles(options.featureFiles)
-                for file in files:
-                    self.__parse(file, options.onlyRunScenarioTags)
+                self.__parseFiles(self.__getAllFeatureFiles(options.featureFiles), self.__getTagExpression(options))
         else:
-            files = self.__getAllFeatureFiles(options)
-            for file in files:
-                self.__parse(file, [])
+            self.__parseFiles(self.__getAllFeatureFiles(options), None)
         
+        self.__reportAmbiguousSteps()
+        self.__resolvePoolSizes()
+        if self.schedulingPolicy.history is None and self.historyStore is not None:
+            self.schedulingPolicy.history = self.historyStore.getScenarioHistory()
+        if isinstance(options,TaskRunnerConfig) and options.shardCount is not None:
+            self.__selectShard(options.shardIndex, options.shardCount)
+        self.scheduler = TaskScheduler(self.allTaskIds, self.groups)
+
         start = time.time()
         startDate = datetime.datetime.now().strftime("%m/%d/%Y, %H:%M:%S")
 
+        if self.journalFile is not None:
+            self.resultJournal = ResultJournal(self.journalFile)
+            self.journalReport = None
+            self.resultJournal.start(startDate, os.getpid(), multiprocessing.cpu_count(), self.groups)
+
         self.taskMonitor.start()
         self.feedback.startFeedback()
+        self.__connectRemoteWorkers()
 
         ## run any setup tasks
         error = self.__runSetupTasks()
@@ -102,6 +185,9 @@ class TaskRunner:
                 os.kill(pid, signal.SIGTERM)
             except:
                 pass
+        self.__shutdownPools()
+        for executor in self.remoteExecutors:
+            executor.shutdown()
 
         ## print test report
         self.__printTestReport()
@@ -112,11 +198,23 @@ class TaskRunner:
             end=endDate,
             numCpu=multiprocessing.cpu_count(),
             pid=os.getpid(),
-            success=len(list(filter(lambda x: "failed" in x["status"], self.taskReport))) <= 0
+            success=len(list(filter(lambda x: "failed" in x["status"], self.taskReport))) <= 0,
+            hosts=sorted(set(t["host"] for t in self.taskReport if t["host"]))
         )
 
+        if self.resultJournal is not None:
+            self.resultJournal.close(self.testResult)
+            self.resultJournal = None
+
         self.feedback.stopFeedback()
 
+        if self.historyStore is not None:
+            self.historyStore.recordRun(self.__getTaskReport(), self.testResult)
+
+        if self.resultCache is not None:
+            self.resultCache.recordTaskReport(self.taskReport, self.cacheKeys)
+            self.resultCache.save()
+
         return self.testResult
 
     def __getAllFeatureFiles(self, paths: list[str]) -> list[str]:
@@ -134,23 +232,41 @@ class TaskRunner:
         return featureFiles
                 
 
-    def __parse(self, featureFile: str, onlyTags: list[str]):
-        result = self.parser.parse(TokenScanner(featureFile))
-        if not result:
-            return
-        
-        if "feature" not in result:
-            return
+    def __getTagExpression(self, options: TaskRunnerConfig) -> Optional[TagExpression]:
+        expressions = []
+        if len(options.onlyRunScenarioTags) > 0:
+            expressions.append(f"({TagExpression.anyOf(options.onlyRunScenarioTags)})")
+        if options.tagExpression:
+            expressions.append(f"({options.tagExpression})")
+        return TagExpression(" and ".join(expressions)) if expressions else None
+
+    def __parseFiles(self, featureFiles: list[str], expression: Optional[TagExpression]):
+        """
+        Parse the feature files and create tasks for the scenarios selected by the tag
+        expression. Scenarios that are filtered out never get a task
+        """
+        parser = FeatureParser(self.astCache, self.parserProcesses, self.startMethod)
+        self.featureRoot = self.__getFeatureRoot(featureFiles)
+        self.tagIndex = TagIndex()
+        for featureFile,document in parser.parseFiles(featureFiles):
+            self.tagIndex.addDocument(featureFile, document)
+        self.__print(f"parsed {parser.parsedFiles} feature files, {parser.cachedFiles} from cache")
+        for s in self.tagIndex.select(expression):
+            self.__getScenario(s.scenario, s.feature, s.featureFile, s.rule, s.outlineRow)
+        # depending on a Scenario Outline means depending on all of its rows
+        if self.outlineIds:
+            for t in self.setupTasks + self.mainTasks + self.teardownTasks:
+                t.depends = [rowId for d in t.depends for rowId in self.outlineIds.get(d, [d])]
+
+    def __reportAmbiguousSteps(self):
+        """
+        Warn about steps of the selected scenarios that match more than one step definition
+        """
+        texts = [step["text"] for t in self.setupTasks + self.mainTasks + self.teardownTasks for step in t.scenario.steps]
+        for text,definitions in Step.findAmbiguousSteps(texts).items():
+            patterns = ", ".join(f"'{d.pattern}' ({d.func.__module__}.{d.func.__name__})" for d in definitions)
+            print(f"{bcolors.WARNING}ambiguous step '{text}' matches {len(definitions)} step definitions: {patterns}. Using '{definitions[0].pattern}'{bcolors.ENDC}")
 
-        if "children" not in result["feature"]:
-            return
-        
-        feature = result["feature"]
-        for child in feature["children"]:
-            if "scenario" in child:
-                sc = child["scenario"]
-                self.__getScenario(sc, feature, onlyTags)
-    
     # def __getFeatureId(self, feature: Any) -> str:
     #     tags = feature["tags"]
     #     id=uuid.uuid4().hex()
@@ -159,23 +275,43 @@ class TaskRunner:
     #         if temp := self.__getIdTag(tg, tag): id = temp
     #     return id
     
-    def __getScenario(self, scenario: Any, feature: Any, onlyIncludeTags: list[str]) -> Optional[Task]:
-        tags = scenario["tags"]
-        isConcurrent,id,depends,dependsGroups,group,runAlways,isSetup,isTeardown,isParallel = False,uuid.uuid4().hex,[],[],None,False,False,False,False
-        
-        # if scenario tags filtering is specified an scenario does not have any tag then exclude this scenario
-        if len(onlyIncludeTags) > 0 and len(tags) <= 0:
+    def __getFeatureRoot(self, featureFiles: list[str]) -> Optional[str]:
+        """
+        Return the project root, or the common directory of the feature files when no
+        project root is configured
+        """
+        if self.projectRoot is not None:
+            return os.path.abspath(self.projectRoot)
+        try:
+            return os.path.commonpath([os.path.dirname(f) for f in featureFiles]) if featureFiles else None
+        except ValueError:
+            # feature files on different drives have no common directory
             return None
 
-        # filter scenario based on tags
-        if len(onlyIncludeTags) > 0:
-            if not any(item["name"] in onlyIncludeTags for item in tags):
-                return None
+    def __getScenarioId(self, scenario: Any, featureFile: str) -> str:
+        """
+        Derive a stable id for a scenario from the feature file path, the scenario line and
+        the scenario name so the same scenario gets the same id across runs. The path is
+        relative to the feature root, so the id does not depend on the working directory
+        """
+        try:
+            path = os.path.relpath(featureFile, self.featureRoot) if self.featureRoot else featureFile
+        except ValueError:
+            path = featureFile
+        path = path.replace(os.sep, "/")
+        return uuid.uuid5(uuid.NAMESPACE_URL, f"{path}:{scenario['location']['line']}:{scenario['name']}").hex
+
+    def __getScenario(self, scenario: Any, feature: Any, featureFile: str, rule: Any = None, outlineRow: int = None) -> Task:
+        tags = scenario["tags"]
+        defaultId = self.__getScenarioId(scenario, featureFile)
+        isConcurrent,id,depends,dependsGroups,group,runAlways,isSetup,isTeardown,isParallel = False,defaultId,[],[],None,False,False,False,False
+        timeout,resources,isAsync = None,[],False
 
         for tag in tags:
             tg = tag["name"]
             if temp := self.__getConcurrentTag(tg): isConcurrent = temp
             if temp := self.__getParallelTag(tg): isParallel = temp
+            if temp := self.__getAsyncTag(tg): isAsync = temp
             if temp := self.__getRunAlwaysTag(tg): runAlways = temp
             if temp := self.__getSetupTag(tg): isSetup = temp
             if temp := self.__getTeardownTag(tg): isTeardown = temp
@@ -183,9 +319,16 @@ class TaskRunner:
             if temp := self.__getDependsTag(tg, tag): depends.append(temp)
             if temp := self.__getDependsGroupsTag(tg, tag): dependsGroups.append(temp)
             if temp := self.__getGroupTag(tg, tag): group = temp
-        sc = Scenario(scenario["name"],scenario,feature,id)
-        t = Task(scenario["name"], sc, feature, id,depends,dependsGroups,runAlways,group, isSetup, isConcurrent,isTeardown,isParallel)
-        self.allTaskIds.append(t.id)
+            if temp := self.__getTimeoutTag(tg, tag): timeout = temp
+            if temp := self.__getResourceTag(tg, tag): resources.append(temp)
+        if outlineRow is not None and id != defaultId:
+            # every row of an outline with an @id_ tag gets an id derived from the outline id
+            outlineId,id = id,f"{id}_{outlineRow}"
+            self.outlineIds.setdefault(outlineId, []).append(id)
+        logFile = os.path.join(self.logDir, f"{id}.log") if self.logDir else None
+        sc = Scenario(scenario["name"],scenario,feature,id,rule,self.maxLogSize,logFile,self.captureOutput)
+        t = Task(scenario["name"], sc, feature, id,depends,dependsGroups,runAlways,group, isSetup, isConcurrent,isTeardown,isParallel,featureFile,timeout,resources,isAsync)
+        self.allTaskIds.add(t.id)
         if group is not None:
             self.groups.setdefault(group, []).append(id)
         if isSetup:
@@ -202,12 +345,27 @@ class TaskRunner:
     def __getIdTag(self, name: str, tag: Any) -> Optional[str]:
         return tag["name"].split("@id_")[-1] if name.startswith("@id_") else None
     
+    def __getTimeoutTag(self, name: str, tag: Any) -> Optional[float]:
+        if not name.startswith("@timeout_"):
+            return None
+        value = tag["name"].split("@timeout_")[-1]
+        try:
+            return float(value)
+        except ValueError:
+            raise Exception(f"invalid timeout tag: {name}. The timeout must be a number of seconds")
+
+    def __getResourceTag(self, name: str, tag: Any) -> Optional[str]:
+        return tag["name"].split("@resource_")[-1] if name.startswith("@resource_") else None
+
     def __getConcurrentTag(self, name: str) -> bool:
         return name == "@concurrent"
     
     def __getParallelTag(self, name: str) -> bool:
         return name == "@parallel"
     
+    def __getAsyncTag(self, name: str) -> bool:
+        return name == "@async"
+
     def __getRunAlwaysTag(self, name: str) -> bool:
         return name == "@runAlways"
 
@@ -223,111 +381,414 @@ class TaskRunner:
     def __getTeardownTag(self, name: str) -> bool:
         return name == "@teardown"
 
-    def __getNextTask(self,taskList) -> list[Task]:
+    def __getNextTask(self) -> list[Task]:
         new_tasks: list[Task] = []
-        skipped_tasks: list[Task] = []
-        self.__print(f"tasks pending: {[(f'name: {t.name}',f'id:{t.id}') for t in taskList]}")
-        for task in taskList:
-            self.__print(f"check pending task: (name:{task.name},id:{task.id})")
-            if len(task.depends) > 0:
-                self.__print(f"task (name:{task.name},id:{task.id}) depends on: {task.depends}")
-                if not set(task.depends).issubset(self.allTaskIds):
-                    self.__addTaskToReport(task, "skipped", None, 0.0, None)
-                    skipped_tasks.append(task)
-                    self.completedTasks.append(task.id)
-                    continue
-                if not set(task.depends).issubset(self.completedTasks):
-                    continue
-                if self.__isParentTaskFailed(task.depends) and not task.runAlways:
-                    self.__addTaskToReport(task, "skipped", None, 0.0, None)
-                    self.__print(f"skip task: (name:{task.name},id:{task.id})")
-                    skipped_tasks.append(task)
-                    self.completedTasks.append(task.id)
-                    continue
-            if len(task.dependsGroups) > 0:
-                self.__print(f"task (name:{task.name},id:{task.id}) depends on groups: {task.dependsGroups}")
-                combine_groups = []
-                for g in task.dependsGroups:
-                    if g in self.groups:
-                        combine_groups += self.groups[g]
-                if not bool(combine_groups):
-                    self.__print(f"no groups matching found for task: (name:{task.name},id:{task.id})")
-                    self.__addTaskToReport(task, "skipped", None, 0.0, None)
-                    skipped_tasks.append(task)
-                    self.completedTasks.append(task.id)
-                    continue
-                if not set(combine_groups).issubset(self.completedTasks):
-                    continue
-                if self.__isParentTaskFailed(combine_groups) and not task.runAlways:
-                    self.__addTaskToReport(task, "skipped", None, 0.0, None)
-                    self.__print(f"dependent tasks failed so skip task: (name:{task.name},id:{task.id})")
-                    skipped_tasks.append(task)
-                    self.completedTasks.append(task.id)
+        while True:
+            ready, skipped = self.scheduler.nextTasks()
+            if not ready and not skipped:
+                break
+            for task in skipped:
+                self.__print(f"skip task: (name:{task.name},id:{task.id})")
+                failed = self.__addTaskToReport(task, "skipped", None, 0.0, None)
+                self.scheduler.markCompleted(task.id, failed)
+            for task in ready:
+                if self.__isCachedPass(task):
+                    self.__print(f"cached task: (name:{task.name},id:{task.id})")
+                    self.__addTaskToReport(task, "success", None, 0.0, None, cached=True)
+                    self.scheduler.markCompleted(task.id, False)
+                else:
+                    new_tasks.append(task)
+        self.__print(f"tasks pending: {[(f'name: {t.name}',f'id:{t.id}') for t in self.scheduler.pendingTasks()]}")
+        return new_tasks
+
+    def __isCachedPass(self, task: Task) -> bool:
+        """
+        Check whether the task passed in an earlier run and does not need to run again.
+        Setup and teardown tasks always run since other tasks may rely on their side effects
+        """
+        if self.resultCache is None or task.isSetup or task.isTeardown:
+            return False
+        key = self.cacheKeys[task.id] = self.resultCache.computeKey(task)
+        if self.rerunFailed:
+            return self.resultCache.getStatus(task.id) == "success"
+        return self.resultCache.isCachedPass(task.id, key)
+
+    def __getTaskKind(self, task: Task) -> str:
+        return task.getMode()
+
+    def __queueTasks(self, tasks: list[Task]):
+        """
+        Add ready tasks to the ready queues ordered by the scheduling policy
+        """
+        for task in tasks:
+            heapq.heappush(self.readyQueues[self.__getTaskKind(task)], (self.schedulingPolicy.priority(task), self.readySequence, task))
+            self.readySequence += 1
+
+    def __dispatchTasks(self, futures: dict) -> list[Task]:
+        """
+        Submit ready tasks to the pools as long as there are free workers. Tasks are only
+        submitted when a worker is free so that the scheduling policy decides the order in
+        which waiting tasks are started
+        """
+        submitted: list[Task] = []
+        capacity = {"thread": self.maxThreads, "process": self.maxProcesses + sum(e.capacity for e in self.remoteExecutors), "async": self.maxAsync}
+        for kind,readyQueue in self.readyQueues.items():
+            while readyQueue and self.runningTasks[kind] < capacity[kind]:
+                item = heapq.heappop(readyQueue)
+                task = item[2]
+                busy = self.__getBusyResource(task)
+                if busy is not None:
+                    # wait for the resource to be released, other tasks can still be dispatched
+                    self.__print(f"task (name:{task.name},id:{task.id}) waiting for resource: {busy}")
+                    self.resourceWaiters.setdefault(busy, []).append(item)
                     continue
-            new_tasks.append(task)
-        if len(skipped_tasks) > 0:
-            taskList = [i for i in taskList if not any(x.id == i.id for x in skipped_tasks)]
-        if len(new_tasks) > 0:
-            taskList = [i for i in taskList if not any(x.id == i.id for x in new_tasks)]
-        return new_tasks, taskList
-
-    def runWorkerThread(self, taskList):
-        tasks_to_submit, taskList = self.__getNextTask(taskList)
+                for r in set(task.resources):
+                    self.resourcesInUse[r] = self.resourcesInUse.get(r, 0) + 1
+                self.__submitTask(task, futures)
+                self.runningTasks[kind] += 1
+                submitted.append(task)
+        return submitted
+
+    def __getBusyResource(self, task: Task) -> Optional[str]:
+        """
+        Return the first resource of a task that has no free capacity. Resources not
+        specified in the configuration have a capacity of 1
+        """
+        for r in set(task.resources):
+            if self.resourcesInUse.get(r, 0) >= self.resourceCapacity.get(r, 1):
+                return r
+        return None
+
+    def __releaseResources(self, task: Task):
+        for r in set(task.resources):
+            self.resourcesInUse[r] -= 1
+            for item in self.resourceWaiters.pop(r, []):
+                heapq.heappush(self.readyQueues[self.__getTaskKind(item[2])], item)
+
+    def __applyPoolConfig(self, options: TaskRunnerConfig):
+        if options.maxThreads is not None:
+            self.maxThreads = options.maxThreads
+        if options.maxProcesses is not None:
+            self.maxProcesses = options.maxProcesses
+        if options.maxAsync is not None:
+            self.maxAsync = options.maxAsync
+        if options.maxStepThreads is not None:
+            self.maxStepThreads = options.maxStepThreads
+        self.astCache = options.astCache
+        self.parserProcesses = options.parserProcesses
+        if options.startMethod is not None:
+            self.startMethod = options.startMethod
+        if options.oversubscription is not None:
+            self.oversubscription = options.oversubscription
+        for module in options.preloadModules:
+            if module not in self.preloadModules:
+                self.preloadModules.append(module)
+        for name,capacity in options.resources.items():
+            if capacity < 1:
+                raise ValueError(f"capacity of resource {name} must be at least 1")
+            self.resourceCapacity[name] = capacity
+        self.remoteWorkers = options.remoteWorkers
+        if options.remoteAuthKey is not None:
+            self.remoteAuthKey = options.remoteAuthKey
+        if self.remoteWorkers and not self.remoteAuthKey:
+            raise ValueError("remoteAuthKey is required to use remote workers")
+
+    def __resolvePoolSizes(self):
+        """
+        Resolve the number of workers in the pools. When the number of processes is not
+        specified it defaults to the number of cpus multiplied by the oversubscription factor
+        """
+        if self.startMethod not in multiprocessing.get_all_start_methods():
+            raise ValueError(f"unsupported start method: {self.startMethod}. Supported start methods: {multiprocessing.get_all_start_methods()}")
+        if self.maxThreads is None:
+            self.maxThreads = min(32, multiprocessing.cpu_count() + 4)
+        if self.maxProcesses is None:
+            self.maxProcesses = max(1, round(multiprocessing.cpu_count() * self.oversubscription))
+        if self.maxAsync < 1:
+            raise ValueError(f"maxAsync must be at least 1")
+        configureStepExecutor(self.maxStepThreads)
+        if self.maxThreads < 1 or self.maxProcesses < 0 or (self.maxProcesses == 0 and not self.remoteWorkers):
+            raise ValueError(f"maxThreads and maxProcesses must be at least 1. maxProcesses can only be 0 when remote workers are used")
+
+    def __selectShard(self, shardIndex: int, shardCount: int):
+        """
+        Only keep the main tasks of this shard. Setup and teardown tasks run on every shard
+        """
+        if shardCount < 1 or shardIndex is None or not 0 <= shardIndex < shardCount:
+            raise ValueError(f"invalid shard {shardIndex} of {shardCount}. The shard index must be between 0 and shardCount-1")
+        shards = partitionTasks(self.mainTasks, self.groups, shardCount, self.schedulingPolicy.history)
+        self.mainTasks = shards[shardIndex]
+        self.__print(f"shard {shardIndex} of {shardCount}: {[t.name for t in self.mainTasks]}")
+
+    def __connectRemoteWorkers(self):
+        """
+        Connect to the remote worker agents. Parallel scenarios are sent to the remote
+        workers when they have free capacity and otherwise run in the local process pool
+        """
+        self.remoteExecutors = []
+        for address in self.remoteWorkers:
+            executor = RemoteExecutor(address, self.remoteAuthKey, self.feedback.notify)
+            executor.connect()
+            self.__print(f"connected to remote worker {executor.name} with {executor.capacity} processes")
+            self.remoteExecutors.append(executor)
+
+    def __getFreeRemoteExecutor(self) -> Optional[RemoteExecutor]:
+        return next((e for e in self.remoteExecutors if e.hasFreeSlot()), None)
+
+    def __getThreadPool(self) -> StepExecutor:
+        if self.pool is None:
+            self.__print(f"create thread pool with {self.maxThreads} workers")
+            self.pool = StepExecutor(self.maxThreads, name="paraworld-scenario")
+        return self.pool
+
+    def __getProcessPool(self) -> ProcessPoolExecutor:
+        if self.parallelPool is None:
+            self.__print(f"create process pool with {self.maxProcesses} workers using start method: {self.startMethod}")
+            context = multiprocessing.get_context(self.startMethod)
+            if self.startMethod == "forkserver":
+                # modules preloaded in the fork server are inherited by every worker forked from it
+                context.set_forkserver_preload(["conclave.scenario", "conclave.step", "conclave.world"] + self.preloadModules)
+            self.parallelPool = ProcessPoolExecutor(
+                max_workers=self.maxProcesses,
+                mp_context=context,
+                initializer=initializeWorker,
+                initargs=(self.preloadModules, self.workerInitializer, self.workerInitArgs, self.maxStepThreads, self.feedback.channel)
+            )
+        return self.parallelPool
+
+    def __shutdownPools(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+        if self.parallelPool is not None:
+            self.parallelPool.shutdown(wait=False)
+            self.parallelPool = None
+        for pool in self.idleIsolatedPools:
+            pool.shutdown(wait=False)
+        self.idleIsolatedPools = []
+
+    def __submitTask(self, task: Task, futures: dict):
+        remoteExecutor = self.__getFreeRemoteExecutor() if task.isParallel and not task.isConcurrent and task.timeout is None else None
+        if remoteExecutor is not None:
+            future = remoteExecutor.submit(task.id, task.scenario, self.__scenarioContextFromTask(task))
+            self.remoteTasks[future] = remoteExecutor
+            futures[future] = task
+            return
+        if task.getMode() == "async":
+            # async scenarios run as coroutines on the event loop of the runner and can be
+            # cancelled without an isolated pool
+            future = getEventLoop().submit(task.scenario.runAsync(queue=None,feedbackQueue=self.feedback.channel,context=self.__scenarioContextFromTask(task)))
+            futures[future] = task
+            if task.timeout is not None:
+                self.taskDeadlines[future] = time.time() + task.timeout
+            return
+        if task.timeout is not None:
+            # scenarios with a timeout, also concurrent ones, run in their own single worker
+            # process, so that the worker can be terminated when the scenario expires without
+            # affecting the shared pools. A thread could only be cancelled before its next step
+            pool = self.__getIsolatedPool()
+            future = pool.submit(task.scenario.run,queue=self.taskMonitor.signalQueue,feedbackQueue=self.feedback.channel,context=self.__scenarioContextFromTask(task))
+        elif task.isConcurrent:
+            future = self.__getThreadPool().submit(task.id,task.scenario.run,queue=None,feedbackQueue=self.feedback.channel,context=self.__scenarioContextFromTask(task))
+        else:
+            future = self.__getProcessPool().submit(task.scenario.run,queue=self.taskMonitor.signalQueue,feedbackQueue=self.feedback.channel,context=self.__scenarioContextFromTask(task))
+        futures[future] = task
+        if task.timeout is not None:
+            self.isolatedPools[future] = pool
+            self.taskDeadlines[future] = time.time() + task.timeout
+
+    def __getIsolatedPool(self) -> ProcessPoolExecutor:
+        if not self.idleIsolatedPools:
+            self.__warmIsolatedPool()
+        return self.idleIsolatedPools.pop()
+
+    def __warmIsolatedPool(self):
+        """
+        Start a single worker pool for scenarios with a timeout. A pool starts its worker
+        with the first submitted call, so the worker is started and initialized right away
+        instead of when a scenario is submitted
+        """
+        pool = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context(self.startMethod),
+            initializer=initializeWorker,
+            initargs=(self.preloadModules, self.workerInitializer, self.workerInitArgs, self.maxStepThreads, self.feedback.channel)
+        )
+        pool.submit(os.getpid)
+        self.idleIsolatedPools.append(pool)
+
+    def __terminateIsolatedPool(self, pool: ProcessPoolExecutor, task: Task):
+        """
+        Terminate the worker of an isolated pool, which is the only process of the pool,
+        and start a replacement for the next scenario with a timeout
+        """
+        for process in list(pool._processes.values()):
+            self.__print(f"terminate worker process {process.pid} running task (name:{task.name},id:{task.id})")
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+        if not self.idleIsolatedPools:
+            self.__warmIsolatedPool()
+
+    def __releaseTask(self, future: concurrent.futures.Future, task: Task):
+        self.runningTasks[self.__getTaskKind(task)] -= 1
+        if task.getMode() == "thread" and task.timeout is None and not future.done():
+            # a cancelled scenario in a thread stops before its next step, so it keeps its
+            # resources until the thread returns
+            self.lingeringTasks[future] = task
+        else:
+            self.__releaseResources(task)
+        self.taskDeadlines.pop(future, None)
+        remoteExecutor = self.remoteTasks.pop(future, None)
+        if remoteExecutor is not None:
+            remoteExecutor.release()
+        pool = self.isolatedPools.pop(future, None)
+        if pool is not None and future.done() and not future.cancelled() and future.exception() is None:
+            # the worker is idle again and runs the next scenario with a timeout
+            self.idleIsolatedPools.append(pool)
+        elif pool is not None:
+            pool.shutdown(wait=False)
+
+    def __cancelTask(self, future: concurrent.futures.Future, task: Task):
+        """
+        Cancel a running task. A scenario running in a thread is cancelled cooperatively and
+        stops before its next step. A scenario running in a process, which includes every
+        scenario with a timeout, has its worker process terminated
+        """
+        future.cancel()
+        if future in self.remoteTasks:
+            self.remoteTasks[future].cancel(task.id)
+        elif future in self.isolatedPools:
+            self.__terminateIsolatedPool(self.isolatedPools.pop(future), task)
+        elif task.getMode() != "process":
+            task.scenario.cancel()
+        else:
+            pid = self.taskMonitor.getPid(task.id)
+            if pid is not None:
+                self.__print(f"terminate worker process {pid} running task (name:{task.name},id:{task.id})")
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except:
+                    pass
+            if self.parallelPool is not None:
+                # terminating a worker breaks the shared pool, so a new pool is created on demand
+                self.parallelPool.shutdown(wait=False, cancel_futures=True)
+                self.parallelPool = None
+
+    def __expireTask(self, future: concurrent.futures.Future, task: Task):
+        self.__print(f"task timed out: (name:{task.name},id:{task.id}, timeout:{task.timeout})")
+        self.__cancelTask(future, task)
+        self.__releaseTask(future, task)
+        failed = self.__addTaskToReport(task,"failed",f"timeout: scenario did not complete within {task.timeout} (s)",task.timeout, None)
+        self.scheduler.markCompleted(task.id, failed)
+
+    def __abortTasks(self, futures: dict):
+        """
+        Stop a phase once the maximum number of failures is reached. Running tasks are
+        cancelled and all running, queued and pending tasks are reported as skipped
+        """
+        self.__print(f"maximum number of failures ({self.maxFailures}) reached. Aborting remaining tasks.")
+        for c,task in futures.items():
+            self.__cancelTask(c, task)
+            self.__releaseTask(c, task)
+            self.__addTaskToReport(task,"skipped",f"cancelled after {self.failureCount} failed scenario(s)",0.0,None)
+            self.scheduler.markCompleted(task.id, True)
+        futures.clear()
+        remaining = [item[2] for queue in self.readyQueues.values() for item in sorted(queue)]
+        remaining += [item[2] for waiters in self.resourceWaiters.values() for item in waiters]
+        remaining += self.scheduler.cancelPending()
+        self.readyQueues = {"thread": [], "process": [], "async": []}
+        self.resourceWaiters = {}
+        for task in remaining:
+            self.__addTaskToReport(task,"skipped",None,0.0,None)
+            self.scheduler.markCompleted(task.id, True)
+
+    def runWorkerThread(self, taskList, failFast: bool=True):
+        self.readyQueues = {"thread": [], "process": [], "async": []}
+        self.runningTasks = {"thread": 0, "process": 0, "async": 0}
+        self.resourcesInUse = {}
+        for task in self.lingeringTasks.values():
+            for r in set(task.resources):
+                self.resourcesInUse[r] = self.resourcesInUse.get(r, 0) + 1
+        self.resourceWaiters = {}
+        self.taskDeadlines: dict[concurrent.futures.Future, float] = {}
+        self.isolatedPools: dict[concurrent.futures.Future, ProcessPoolExecutor] = {}
+        if not self.idleIsolatedPools and any(t.timeout is not None and t.getMode() != "async" for t in taskList):
+            self.__warmIsolatedPool()
+        self.schedulingPolicy.prepare(taskList, self.groups)
+        self.scheduler.schedule(taskList)
         futures = {}
-        for task in tasks_to_submit:
-            if task.isConcurrent:
-                futures[self.pool.submit(task.scenario.run,queue=None, feedbackQueue=self.feedback.messageQueue,context=self.__scenarioContextFromTask(task))] = task
-            elif task.isParallel:
-                futures[self.parallelPool.submit(task.scenario.run,queue=self.taskMonitor.signalQueue,feedbackQueue=self.feedback.messageQueue,context=self.__scenarioContextFromTask(task))] = task
-        
-        
+        self.__queueTasks(self.__getNextTask())
+        tasks_to_submit = self.__dispatchTasks(futures)
+
         self.__print(f"adding new tasks: {[(f'name: {t.name}',f'id:{t.id}') for t in tasks_to_submit]}")
         self.__print(f"tasks in pool: {[(f'name: {t.name}',f'id:{t.id}') for t in futures.values()]}")
 
         startTime = time.time()
-        currentTimeout = self.timeout
-        while futures:
-            done, notDone = wait(futures,return_when=concurrent.futures.FIRST_COMPLETED,timeout=currentTimeout)
-            endTime = time.time()
-            elapsed = endTime-startTime
-            self.__print(f"elapsed time waiting for task to complete: {elapsed}")
-            if elapsed >= currentTimeout:
-                for c in notDone:
-                    self.__print(f"tasks not done: (name:{futures[c].name},id:{futures[c].id}, running:{c.running()},cancelled:{c.cancelled()})")
-                    self.__addTaskToReport(futures[c],"failed","timeout waiting for task to complete",self.timeout, None)
-                self.__print(f"timeout waiting {self.timeout} (s) for remaining tasks to complete. Aborting.")
-                break
-            currentTimeout = currentTimeout - elapsed
-            self.__print(f"Remaining timeout: {currentTimeout}")
-            for c in done:
+        deadline = startTime + self.timeout
+        while futures or (self.lingeringTasks and self.resourceWaiters):
+            currentTimeout = min([deadline] + list(self.taskDeadlines.values())) - time.time()
+            done, notDone = wait(list(futures) + list(self.lingeringTasks),return_when=concurrent.futures.FIRST_COMPLETED,timeout=max(0,currentTimeout))
+            now = time.time()
+            self.__print(f"elapsed time waiting for task to complete: {now-startTime}")
+            for c in [f for f in done if f in self.lingeringTasks]:
+                self.__releaseResources(self.lingeringTasks.pop(c))
+            for c in [f for f in done if f in futures]:
                 fut = futures.pop(c)
-                result = c.result()
+                self.__releaseTask(c, fut)
+                try:
+                    result = c.result()
+                except Exception as e:
+                    self.__print(f"task failed to run: (name:{fut.name},id:{fut.id}): {e}")
+                    failed = self.__addTaskToReport(fut,"failed",f"failed to run scenario: {e}",0.0,None)
+                    self.scheduler.markCompleted(fut.id, failed)
+                    continue
                 print(result.message)
                 self.__print(f"task completed: (name:{fut.name},id:{result.id})")
-                self.completedTasks.append(result.id)
                 if result.exception is not None:
-                    self.__addTaskToReport(fut,"failed",result.exception,result.elapsed, result)
+                    failed = self.__addTaskToReport(fut,"failed",result.exception,result.elapsed, result)
                 else:
-                    self.__addTaskToReport(fut,"success",result.exception,result.elapsed, result)
-                next_tasks,taskList = self.__getNextTask(taskList)
-                if next_tasks is not None:
-                    for t in next_tasks:
-                        self.__print(f"adding new task (name:{t.name},id:{t.id})")
-                        if t.isConcurrent:
-                            item = self.pool.submit(t.scenario.run,queue=None,feedbackQueue=self.feedback.messageQueue,context=self.__scenarioContextFromTask(t))
-                            futures[item] = t
-                        elif t.isParallel:
-                            item = self.parallelPool.submit(t.scenario.run,queue=self.taskMonitor.signalQueue,feedbackQueue=self.feedback.messageQueue,context=self.__scenarioContextFromTask(t))
-                            futures[item] = t
-                self.__print(f"remaining tasks in pool: {[(f'name: {t.name}',f'id:{t.id}') for t in futures.values()]}")
+                    failed = self.__addTaskToReport(fut,"success",result.exception,result.elapsed, result)
+                self.scheduler.markCompleted(result.id, failed)
+            if now >= deadline:
+                for c in [f for f in notDone if f in futures]:
+                    self.__print(f"tasks not done: (name:{futures[c].name},id:{futures[c].id}, running:{c.running()},cancelled:{c.cancelled()})")
+                    self.__cancelTask(c, futures[c])
+                    self.__releaseTask(c, futures[c])
+                    self.__addTaskToReport(futures[c],"failed","timeout waiting for task to complete",self.timeout, None)
+                self.__print(f"timeout waiting {self.timeout} (s) for remaining tasks to complete. Aborting.")
+                break
+            for c in [f for f,d in self.taskDeadlines.items() if d <= now and f in futures]:
+                self.__expireTask(c, futures.pop(c))
+            if failFast and self.maxFailures is not None and self.failureCount >= self.maxFailures:
+                self.__abortTasks(futures)
+                break
+            self.__print(f"Remaining timeout: {deadline-now}")
+            self.__queueTasks(self.__getNextTask())
+            for t in self.__dispatchTasks(futures):
+                self.__print(f"adding new task (name:{t.name},id:{t.id})")
+            self.__print(f"remaining tasks in pool: {[(f'name: {t.name}',f'id:{t.id}') for t in futures.values()]}")
     
+    def __getTaskReport(self) -> list[dict[str, Any]]:
+        """
+        Return the task report with the tasks and scenario results. When the results are
+        journaled only a summary of every task is kept in memory and the full report is
+        read back from the journal
+        """
+        if self.journalFile is not None:
+            if self.journalReport is None:
+                self.journalReport = loadJournal(self.journalFile).taskReport
+            return self.journalReport
+        return self.taskReport
+
     def __printTestReport(self):
         print(f"Test report:\n")
 
-        for key, group in groupby(sorted(self.taskReport,key=lambda x:x["feature"]), lambda x: x["feature"]):
+        for key, group in groupby(sorted(self.__getTaskReport(),key=lambda x:x["feature"]), lambda x: x["feature"]):
             print(f"\nFeature: {key}\n")
             for t in group:
-                if t['status'] == 'success':
+                if t['status'] == 'success' and t.get('cached'):
+                    print(f"\tScenario: {t['name']}: {bcolors.OKGREEN}{t['status']}{bcolors.ENDC} (cached)")
+                elif t['status'] == 'success':
                     print(f"\tScenario: {t['name']}: {bcolors.OKGREEN}{t['status']}{bcolors.ENDC} (elapsed {t['elapsed']})")
                 elif t['status'] == 'skipped':
                     print(f"\tScenario: {t['name']}: {bcolors.WARNING}{t['status']}{bcolors.ENDC} (elapsed {t['elapsed']})")
@@ -352,8 +813,15 @@ class TaskRunner:
                                 print(f"\t\t{bcolors.FAIL}{step['error']}{bcolors.ENDC}")
 
 
+    def __taskDict(self, task: Task) -> dict[str, Any]:
+        """
+        Shallow dictionary of the task fields. Unlike asdict() this does not deep copy the
+        scenario and its gherkin document every time a task is dispatched
+        """
+        return {f.name: getattr(task, f.name) for f in fields(task) if f.name not in ("name","scenario","feature")}
+
     def __scenarioContextFromTask(self,task: Task):
-        data = excludeKeys(asdict(task),["name","scenario","feature"])
+        data = self.__taskDict(task)
         return ScenarioContext(
             **{
                 key: (data[key] if val.default == val.empty else data.get(key, val.default))
@@ -367,18 +835,29 @@ class TaskRunner:
             print(f"{bcolors.OKCYAN}[{datetime.datetime.now().strftime('%m/%d/%Y, %H:%M:%S')} task_manager] {msg}{bcolors.ENDC}\n")
     
 
-    def __isParentTaskFailed(self, groups):
-        ptask = []
-        for t in self.taskReport:
-            if 'id' in t:
-                if any(t['id'] == x for x in groups):
-                    ptask.append(t)
-        return any(y['status'] == "failed" or y['status'] == "skipped" for y in ptask)
-    
-    def __addTaskToReport(self, task: Task, status: str, error: str, elapsed: float, scenarioResult: Any):
-        if not any(task.name == x["name"] and task.feature["name"] == x["feature"] for x in self.taskReport):
-            self.taskReport.append({"name":task.name,"status":status,"error":error, "elapsed": elapsed, "id": task.id, "feature": task.feature["name"], "task": task, "scenario": scenarioResult})
-            self.feedback.notify(asdict(self.__feedbackSchemaFromTaskResult(task,scenarioResult,status,error,elapsed)))
+    def __addTaskToReport(self, task: Task, status: str, error: str, elapsed: float, scenarioResult: Any, cached: bool=False) -> bool:
+        """
+        Add the task result to the report. Returns True if the task was added with a failed
+        or skipped status
+        """
+        key = (task.name, task.feature["name"])
+        if key in self.reportedTasks:
+            return False
+        self.reportedTasks.add(key)
+        if status == "failed":
+            self.failureCount += 1
+        entry = {"name":task.name,"status":status,"error":error, "elapsed": elapsed, "id": task.id, "feature": task.feature["name"],
+                 "host": scenarioResult.host if scenarioResult is not None else None, "task": task, "scenario": scenarioResult, "cached": cached}
+        if self.resultJournal is not None:
+            self.resultJournal.append(entry)
+            entry = summarizeEntry(entry)
+            self.journalReport = None
+        self.taskReport.append(entry)
+        self.feedback.notify(asdict(self.__feedbackSchemaFromTaskResult(task,scenarioResult,status,error,elapsed)))
+        if self.resultJournal is not None:
+            # the journal keeps the scenario and its result, so the task only keeps its fields
+            task.scenario = None
+        return status in ("failed","skipped")
 
     def __runMainTasks(self):
         return self.__runTasks(self.mainTasks)
@@ -387,7 +866,8 @@ class TaskRunner:
         return self.__runTasks(self.setupTasks)
     
     def __runTeardownTasks(self):
-        return self.__runTasks(self.teardownTasks)
+        # teardown tasks still run after the maximum number of failures is reached
+        return self.__runTasks(self.teardownTasks, failFast=False)
     
     def __transformSeqTasks(self, taskList: list[Task]):
         dependTaskId = None
@@ -398,15 +878,15 @@ class TaskRunner:
             dependTaskId = t.id
         return taskList
 
-    def __runTasks(self, taskList):
+    def __runTasks(self, taskList, failFast: bool=True):
         error = False
-        seqtasks = list(filter(lambda x: not x.isConcurrent and not x.isParallel, taskList))
-        contasks = list(filter(lambda x: x.isConcurrent or x.isParallel, taskList))
+        seqtasks = list(filter(lambda x: not x.isConcurrent and not x.isParallel and not x.isAsync, taskList))
+        contasks = list(filter(lambda x: x.isConcurrent or x.isParallel or x.isAsync, taskList))
         seqtasks = self.__transformSeqTasks(seqtasks)
         alltasks = contasks + seqtasks
         self.__print(f"all tasks: {[t.name for t in alltasks]}")
 
-        workerThread = threading.Thread(target=self.runWorkerThread,kwargs={'taskList':alltasks})
+        workerThread = threading.Thread(target=self.runWorkerThread,kwargs={'taskList':alltasks,'failFast':failFast})
         workerThread.start()
         
         workerThread.join()
@@ -418,7 +898,7 @@ class TaskRunner:
     
     def __feedbackSchemaFromTaskResult(self,task: Task, scenarioResult: ScenarioResult,status: str, error: str, elapsed: float):
         obj = ScenarioFeedback()
-        taskDict = asdict(task)
+        taskDict = self.__taskDict(task)
         feedDict = asdict(obj)
         obj = ScenarioFeedback(**{k:(taskDict[k] if k in taskDict else v) for k,v in feedDict.items()})
         obj.status = status
@@ -447,21 +927,65 @@ class TaskRunner:
     
     def generateTimeline(self, outputFilename="timeline_output.html"):
         timeline = Timeline()
-        timeline.generateTimeline(self.taskReport, outputFilename)
+        timeline.generateTimeline(self.__getTaskReport(), outputFilename)
     
     def generateDependencyGraph(self, outputFilename="dependency_output.html"):
         depGraph = DependencyGraph()
-        depGraph.generateGraph(outputFilename,self.taskReport,self.groups)
+        depGraph.generateGraph(outputFilename,self.__getTaskReport(),self.groups)
     
     def generateReport(self, outputFilename="report_output.html"):
         report = Report()
-        report.generateReport(self.taskReport, self.testResult, outputFilename)
+        report.generateReport(self.__getTaskReport(), self.testResult, outputFilename)
     
-    def registerFeedbackAdapter(self,adapter: FeedbackAdapter):
-        self.feedback.addAdapter(adapter)
+    def registerFeedbackAdapter(self,adapter: FeedbackAdapter,maxBuffer: int=10000,overflow: str=OverflowPolicy.BLOCK,batchSize: int=100):
+        """
+        Register a feedback adapter. The adapter runs in its own thread of the feedback process
+        with a buffer of maxBuffer events. The overflow policy decides what happens when the
+        buffer is full: block, drop-oldest or coalesce
+        """
+        self.feedback.addAdapter(adapter,maxBuffer,overflow,batchSize)
+
+    def getFeedbackStats(self) -> list[AdapterStats]:
+        """
+        Return the delivered, dropped, coalesced and pending event counters of every feedback adapter
+        """
+        return self.feedback.getStats()
     
+    def saveShardResult(self, outputFilename="shard_result.json"):
+        """
+        Save the result of this run so it can be merged with the results of the other shards
+        """
+        saveShardResult(outputFilename, self.__getTaskReport(), self.testResult, self.groups)
+
+    def mergeShardResults(self, fileNames: list[str]) -> TestResultInfo:
+        """
+        Merge the results saved by the shards of a run. The timeline, reports and dependency
+        graph can then be generated for the whole run
+        """
+        merged = loadShardResults(fileNames)
+        self.journalFile = None
+        self.journalReport = None
+        self.taskReport = merged.taskReport
+        self.testResult = merged.testResult
+        self.groups = merged.groups
+        return self.testResult
+
+    def loadResultJournal(self, fileName: str) -> TestResultInfo:
+        """
+        Load the results written to a result journal, which can be the partial journal of
+        a run that crashed. The timeline, reports and dependency graph can then be
+        generated from the journaled tasks
+        """
+        journal = loadJournal(fileName)
+        self.journalFile = fileName
+        self.journalReport = journal.taskReport
+        self.taskReport = [summarizeEntry(t) for t in journal.taskReport]
+        self.testResult = journal.testResult
+        self.groups = journal.groups
+        return self.testResult
+
     def generateJUnitReport(self, outputFilename="junit_output.xml"):
         report = JUnitReport()
-        report.generateReport(self.taskReport,self.testResult, outputFilename)
+        report.generateReport(self.__getTaskReport(),self.testResult, outputFilename)
     
 
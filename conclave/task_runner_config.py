@@ -3,4 +3,27 @@ from dataclasses import dataclass, field
 @dataclass
 class TaskRunnerConfig:
     onlyRunScenarioTags: list[str] = field(default_factory=list)
+    tagExpression: str = None
     featureFiles: list[str] = field(default_factory=list)
+    astCache: str = None
+    projectRoot: str = None
+    parserProcesses: int = None
+    maxThreads: int = None
+    maxProcesses: int = None
+    maxAsync: int = None
+    maxStepThreads: int = None
+    startMethod: str = None
+    oversubscription: float = None
+    preloadModules: list[str] = field(default_factory=list)
+    resources: dict[str, int] = field(default_factory=dict)
+    remoteWorkers: list[str] = field(default_factory=list)
+    remoteAuthKey: str = None
+    shardIndex: int = None
+    shardCount: int = None
+    rerunFailed: bool = False
+    failFast: bool = False
+    maxFailures: int = None
+    resultJournal: str = None
+    maxLogSize: int = None
+    logDir: str = None
+    captureOutput: bool = False
\ No newline at end of file
@@ -0,0 +1,118 @@
+from .task import Task
+
+
+class TaskScheduler:
+
+    """
+    Dependency indexed scheduler for tasks. Every pending task keeps the set of
+    dependencies (@depends_ and @dependsGroups_) that have not completed yet together
+    with reverse edges from each dependency to its dependents. When a task completes
+    only its direct dependents are visited, so releasing the next tasks costs O(1) per
+    dependency edge instead of rescanning all pending tasks.
+    """
+    def __init__(self, allTaskIds: set[str], groups: dict[str, list[str]]) -> None:
+        self.allTaskIds = allTaskIds
+        self.groups = groups
+        self.completed: set[str] = set()
+        self.failed: set[str] = set()
+        self.sequence = 0
+        self.pending: dict[int, Task] = {}
+        self.pendingDepends: dict[int, set[str]] = {}
+        self.pendingGroups: dict[int, set[str]] = {}
+        self.groupTaskIds: dict[int, set[str]] = {}
+        self.dependents: dict[str, list[int]] = {}
+        self.ready: list[tuple[int, Task]] = []
+        self.skipped: list[tuple[int, Task]] = []
+
+    def schedule(self, taskList: list[Task]):
+        """
+        Index a list of tasks to be scheduled. Tasks that can never run because they
+        depend on unknown scenarios or groups are skipped right away.
+        """
+        for task in taskList:
+            key = self.sequence
+            self.sequence += 1
+            if not set(task.depends).issubset(self.allTaskIds):
+                self.skipped.append((key,task))
+                continue
+            groupIds = set()
+            for g in task.dependsGroups:
+                if g in self.groups:
+                    groupIds.update(self.groups[g])
+            if len(task.dependsGroups) > 0 and not groupIds:
+                self.skipped.append((key,task))
+                continue
+            self.pending[key] = task
+            self.groupTaskIds[key] = groupIds
+            self.pendingDepends[key] = set(task.depends) - self.completed
+            self.pendingGroups[key] = groupIds - self.completed
+            for parentId in self.pendingDepends[key] | self.pendingGroups[key]:
+                self.dependents.setdefault(parentId, []).append(key)
+            self.__evaluate(key)
+
+    def nextTasks(self) -> tuple[list[Task], list[Task]]:
+        """
+        Return the tasks that became ready to run and the tasks that must be skipped
+        since the last call, both in the order they were scheduled.
+        """
+        ready, self.ready = self.ready, []
+        skipped, self.skipped = self.skipped, []
+        return [t for _,t in sorted(ready,key=lambda x: x[0])], [t for _,t in sorted(skipped,key=lambda x: x[0])]
+
+    def markCompleted(self, taskId: str, failed: bool):
+        """
+        Mark a task as completed and release any dependents waiting for it. A failed
+        task is either a task that failed or a task that has been skipped.
+        """
+        if failed:
+            self.failed.add(taskId)
+        if taskId in self.completed:
+            return
+        self.completed.add(taskId)
+        for key in self.dependents.get(taskId, []):
+            if key not in self.pending:
+                continue
+            self.pendingDepends[key].discard(taskId)
+            self.pendingGroups[key].discard(taskId)
+            self.__evaluate(key)
+
+    def pendingTasks(self) -> list[Task]:
+        return [self.pending[k] for k in sorted(self.pending)]
+
+    def cancelPending(self) -> list[Task]:
+        """
+        Remove all tasks that have not been handed out yet and return them in the order
+        they were scheduled
+        """
+        remaining = sorted(list(self.pending.items()) + self.ready + self.skipped, key=lambda x: x[0])
+        for key in list(self.pending):
+            self.__release(key)
+        self.dependents = {}
+        self.ready, self.skipped = [], []
+        return [t for _,t in remaining]
+
+    def __evaluate(self, key: int):
+        task = self.pending[key]
+        if self.pendingDepends[key]:
+            return
+        if len(task.depends) > 0 and self.__isParentTaskFailed(task.depends) and not task.runAlways:
+            self.__release(key)
+            self.skipped.append((key,task))
+            return
+        if self.pendingGroups[key]:
+            return
+        if len(task.dependsGroups) > 0 and self.__isParentTaskFailed(self.groupTaskIds[key]) and not task.runAlways:
+            self.__release(key)
+            self.skipped.append((key,task))
+            return
+        self.__release(key)
+        self.ready.append((key,task))
+
+    def __release(self, key: int):
+        del self.pending[key]
+        del self.pendingDepends[key]
+        del self.pendingGroups[key]
+        del self.groupTaskIds[key]
+
+    def __isParentTaskFailed(self, parents) -> bool:
+        return any(p in self.failed for p in parents)
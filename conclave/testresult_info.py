@@ -9,3 +9,4 @@ class TestResultInfo:
     numCpu: int
     success: bool
     pid: int
+    hosts: list[str] = field(default_factory=list)
@@ -26,10 +26,13 @@ class Timeline(TemplateBase):
                 if scenarioResult:
                     for step in scenarioResult.steps:
                         if step["pid"] is not None:
-                            processList.setdefault(step["pid"], []).append(step)
+                            processList.setdefault((scenarioResult.host, step["pid"]), []).append(step)
         
+        # when scenarios ran on several hosts the processes are grouped by host as well
+        multipleHosts = len(set(host for host,_ in processList)) > 1
         #print(f"process list: {processList}")
-        for key,val in processList.items():
+        for (host,pid),val in processList.items():
+            key = f"{host}_{pid}" if multipleHosts else pid
             threadIds = [x["threadId"] for x in val]
             threadIds = list(dict.fromkeys(threadIds))
             for threadId in threadIds:
@@ -40,7 +43,7 @@ class Timeline(TemplateBase):
             threadIdGroups = [f"{key}_{x}" for x in threadIds]
             pgroups.append({
                 "id": key,
-                "content": f"Process Id {key}",
+                "content": f"Host {host} Process Id {pid}" if multipleHosts else f"Process Id {pid}",
                 "nestedGroups": threadIdGroups,
                 "treeLevel": 1
             })
@@ -49,7 +52,7 @@ class Timeline(TemplateBase):
                     pitems.append({
                         "id": uuid.uuid4().hex,
                         "content": "",
-                        "group": f"{item['pid']}_{item['threadId']}",
+                        "group": f"{key}_{item['threadId']}",
                         "start": item["start"].strftime("%m/%d/%Y, %H:%M:%S"),
                         "end": item["end"].strftime("%m/%d/%Y, %H:%M:%S"),
                         "type": "background"
@@ -66,7 +69,7 @@ class Timeline(TemplateBase):
         }
         return item
     
-    def __createScenarioItem(self, id, name, elapsed, isSkipped):
+    def __createScenarioItem(self, id, name, elapsed, isSkipped, label="Skipped"):
         if not isSkipped:
             content = f"<h4>{name}</h4><div><i>elapsed:{round(elapsed,2)}</i></div>"
             item = {
@@ -75,7 +78,7 @@ class Timeline(TemplateBase):
             }
             return item
         else:
-            content = f"<h4>{name}</h4><div><i>elapsed:{round(elapsed,2)} (s)</i></div><div><i>Skipped</i></div>"
+            content = f"<h4>{name}</h4><div><i>elapsed:{round(elapsed,2)} (s)</i></div><div><i>{label}</i></div>"
             item = {
                 "id" : id,
                 "content": content,
@@ -145,9 +148,9 @@ class Timeline(TemplateBase):
                             
 
                     dict_filter = lambda x, y: dict([ (i,x[i]) for i in x if i in set(y) ])
-                    allScenarios[t["id"]] = dict_filter(vars(scenarioResult), ("elapsed","pid","threadId","startTime", "endTime",))
+                    allScenarios[t["id"]] = dict_filter(vars(scenarioResult), ("elapsed","pid","threadId","startTime", "endTime","host",))
                 else:
-                    scenarioItem = self.__createScenarioItem(t["id"], t["name"], t["elapsed"], True)
+                    scenarioItem = self.__createScenarioItem(t["id"], t["name"], t["elapsed"], True, "Cached" if t.get("cached") else "Skipped")
                     groups.append(scenarioItem)
                 
                 
@@ -0,0 +1,21 @@
+import importlib
+from typing import Any, Callable
+
+from .feedback_channel import FeedbackChannel
+from .step_executor import configureStepExecutor
+
+
+def initializeWorker(preloadModules: list[str], initializer: Callable, initArgs: tuple[Any, ...], maxStepThreads: int = None,
+                     feedbackChannel: FeedbackChannel = None):
+    """
+    Initialize a worker process in the process pool. The preload modules are imported
+    once per worker, which registers any step definitions they contain, and then the
+    custom initializer is called to do any expensive one time setup for the worker.
+    The feedback channel is passed so the worker process inherits its pipe
+    """
+    if maxStepThreads is not None:
+        configureStepExecutor(maxStepThreads)
+    for module in preloadModules:
+        importlib.import_module(module)
+    if initializer is not None:
+        initializer(*initArgs)
@@ -1,6 +1,12 @@
+from multiprocessing.shared_memory import SharedMemory
 from threading import Lock
 from typing import Any
-import multiprocessing
+import asyncio
+import os
+import uuid
+import weakref
+
+from .world_store import WorldManager, readVersion
 
 class Singleton(type):
     __instances = {}
@@ -14,23 +20,205 @@ class Singleton(type):
         return self.__instances[self]
 
 
+class _PropCache:
+
+    """
+    Props of the World read by the current process. The cache is valid as long as the
+    version in shared memory has not changed. When it changed, only the props written
+    since are dropped
+    """
+    def __init__(self, versionName: str) -> None:
+        self.memory = SharedMemory(name=versionName)
+        self.version = 0
+        self.props: dict[Any, Any] = {}
+        self.lock = Lock()
+
+    def close(self):
+        self.memory.close()
+
+    def get(self, store: Any, key: Any) -> Any:
+        with self.lock:
+            if readVersion(self.memory) != self.version:
+                keys,self.version = store.changedSince(self.version)
+                if keys is None:
+                    self.props.clear()
+                for k in keys or []:
+                    self.props.pop(k, None)
+            if key in self.props:
+                return self.props[key]
+        found,value,version = store.get(key)
+        with self.lock:
+            # a value read after a newer write is not cached, the next read gets it again
+            if version == self.version:
+                self.props[key] = value
+        return value
+
+
+class WorldLock:
+
+    """
+    Lock shared by all processes using the same World. It can be used as a context
+    manager, or as an async context manager by coroutines, and is held by the WorldLock
+    object that acquired it, so every thread or coroutine taking the lock uses a lock of
+    its own from World.lock. A lock held by a process that exited is released when
+    another process waits for it
+    """
+    def __init__(self, store: Any, name: str, timeout: float = None) -> None:
+        self.store = store
+        self.name = name
+        self.timeout = timeout
+        self.token = uuid.uuid4().hex
+
+    def acquire(self, timeout: float = None) -> bool:
+        return self.store.acquire(self.name, self.token, os.getpid(), timeout if timeout is not None else self.timeout)
+
+    async def acquireAsync(self, timeout: float = None) -> bool:
+        """
+        Acquire the lock in a worker thread so the event loop keeps running
+        """
+        future = asyncio.ensure_future(asyncio.to_thread(self.acquire, timeout))
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # the lock acquired after the coroutine was cancelled is released again
+            future.add_done_callback(self.__releaseAcquired)
+            raise
+
+    def __releaseAcquired(self, future: asyncio.Future):
+        if not future.cancelled() and future.exception() is None and future.result():
+            self.release()
+
+    def release(self):
+        self.store.release(self.name, self.token)
+
+    async def releaseAsync(self):
+        await asyncio.to_thread(self.release)
+
+    def __enter__(self) -> "WorldLock":
+        if not self.acquire():
+            raise TimeoutError(f"lock {self.name} was not acquired within {self.timeout} (s)")
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    async def __aenter__(self) -> "WorldLock":
+        if not await self.acquireAsync():
+            raise TimeoutError(f"lock {self.name} was not acquired within {self.timeout} (s)")
+        return self
+
+    async def __aexit__(self, *args):
+        await self.releaseAsync()
+
+
+_caches: dict[tuple[int, str], _PropCache] = {}
+_lock = Lock()
+
+
 class World(metaclass=Singleton):
 
+    """
+    Props shared by all scenarios, including @parallel scenarios in other processes. The
+    props are kept by a manager server and every process caches the props it reads, so
+    reading a prop that did not change is a local lookup.
+
+    Scenarios can coordinate through the World without polling:
+
+    world.increment("orders")
+    world.compareAndSet("state", "idle", "busy")
+    token = world.waitFor("token", timeout=30)
+    with world.lock("database"):
+        ...
+
+    Coroutines use waitForAsync and async with world.lock(...) so they do not block the
+    event loop while they wait
+    """
     def __init__(self) -> None:
-        self.__props = multiprocessing.Manager().dict()
+        self.__memory = SharedMemory(create=True, size=8)
+        self.__memory.buf[:8] = bytes(8)
+        self.__versionName = self.__memory.name
+        self.__manager = WorldManager()
+        self.__manager.start()
+        self.__store = self.__manager.WorldStore(self.__versionName)
+        weakref.finalize(self, World.__release, self.__memory, self.__versionName)
+
+    @staticmethod
+    def __release(memory: SharedMemory, versionName: str):
+        World.__dropCache(versionName)
+        memory.close()
+        try:
+            memory.unlink()
+        except FileNotFoundError:
+            # the segment was already unlinked by another process
+            pass
+
+    @staticmethod
+    def __dropCache(versionName: str):
+        with _lock:
+            cache = _caches.pop((os.getpid(), versionName), None)
+        if cache is not None:
+            cache.close()
+
+    def __getCache(self) -> _PropCache:
+        key = (os.getpid(), self.__versionName)
+        cache = _caches.get(key)
+        if cache is None:
+            with _lock:
+                # a forked process must not use the cache of its parent
+                if key not in _caches:
+                    _caches[key] = _PropCache(self.__versionName)
+                cache = _caches[key]
+        return cache
 
     def setProp(self,key: Any, value: Any):
-        self.__props[key] = value
+        self.__store.set(key, value)
     
     def getProp(self,key: Any) -> Any:
-        if key in self.__props:
-            return self.__props[key]
+        return self.__getCache().get(self.__store, key)
+
+    def increment(self, key: Any, amount: Any = 1) -> Any:
+        """
+        Atomically add amount to a prop, which starts at 0, and return the new value
+        """
+        return self.__store.increment(key, amount)
+
+    def compareAndSet(self, key: Any, expected: Any, value: Any) -> bool:
+        """
+        Atomically set a prop to value if it equals expected. A prop that was never set
+        equals None. Returns whether the prop was set
+        """
+        return self.__store.compareAndSet(key, expected, value)
+
+    def setdefault(self, key: Any, default: Any) -> Any:
+        """
+        Set a prop that was never set to default and return the value of the prop
+        """
+        return self.__store.setdefault(key, default)
+
+    def waitFor(self, key: Any, timeout: float = None) -> Any:
+        """
+        Wait until a prop is set and return its value. Raises TimeoutError when the prop
+        is not set within the timeout
+        """
+        return self.__store.waitFor(key, timeout)
+
+    async def waitForAsync(self, key: Any, timeout: float = None) -> Any:
+        """
+        Wait in a worker thread until a prop is set and return its value
+        """
+        return await asyncio.to_thread(self.__store.waitFor, key, timeout)
+
+    def lock(self, name: str, timeout: float = None) -> WorldLock:
+        """
+        Return a new owner of the named lock shared by all processes using this World
+        """
+        return WorldLock(self.__store, name, timeout)
     
     def __getstate__(self):
         state = self.__dict__.copy()
+        state.pop("_World__memory", None)
+        state.pop("_World__manager", None)
         return state
     
     def __setstate__(self,state):
         self.__dict__.update(state)
-
-    
\ No newline at end of file
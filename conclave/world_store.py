@@ -0,0 +1,159 @@
+import collections
+from multiprocessing.managers import BaseManager
+from multiprocessing.shared_memory import SharedMemory
+import struct
+import threading
+import time
+from typing import Any, Optional
+
+import psutil
+
+
+_VERSION = struct.Struct("Q")
+
+
+def readVersion(memory: SharedMemory) -> int:
+    return _VERSION.unpack_from(memory.buf, 0)[0]
+
+
+class WorldStore:
+
+    """
+    The props of the World, kept in the manager server process. Every write increments
+    the version in shared memory, so a process can tell without asking the server
+    whether its cached props are still valid. The keys written by the last maxChanges
+    writes are kept so a process only drops the props that were changed.
+
+    The manager server runs the calls of every client thread in a thread of its own, so
+    the atomic operations run under the lock of the store and waitFor and acquire block
+    in the server until a write or release wakes them up. A lock held by a process that
+    exited, such as a terminated worker, is released when another owner waits for it
+    """
+    ownerCheckInterval = 1.0
+
+    def __init__(self, versionName: str, maxChanges: int = 10000) -> None:
+        self.props: dict[Any, Any] = {}
+        self.version = 0
+        self.changes: collections.deque = collections.deque(maxlen=maxChanges)
+        self.condition = threading.Condition()
+        # name of a lock to the token of its owner and the pid of the owner's process
+        self.lockOwners: dict[str, tuple[str, int]] = {}
+        # processes started by the runner share its resource tracker, so attaching does not
+        # make the memory go away when the process exits
+        self.memory = SharedMemory(name=versionName)
+
+    def __changed(self, key: Any):
+        # the version is published last so a reader seeing it also sees the change
+        self.version += 1
+        self.changes.append((self.version, key))
+        _VERSION.pack_into(self.memory.buf, 0, self.version)
+        self.condition.notify_all()
+
+    def get(self, key: Any) -> tuple[bool, Any, int]:
+        """
+        Return whether the key exists, its value and the version it was read at
+        """
+        with self.condition:
+            return key in self.props, self.props.get(key), self.version
+
+    def set(self, key: Any, value: Any) -> int:
+        with self.condition:
+            self.props[key] = value
+            self.__changed(key)
+            return self.version
+
+    def increment(self, key: Any, amount: Any = 1) -> Any:
+        """
+        Add amount to the value of the key, which starts at 0, and return the new value
+        """
+        with self.condition:
+            self.props[key] = self.props.get(key, 0) + amount
+            self.__changed(key)
+            return self.props[key]
+
+    def compareAndSet(self, key: Any, expected: Any, value: Any) -> bool:
+        """
+        Set the key to value if its value equals expected. A key that does not exist has
+        the value None
+        """
+        with self.condition:
+            if self.props.get(key) != expected:
+                return False
+            self.props[key] = value
+            self.__changed(key)
+            return True
+
+    def setdefault(self, key: Any, default: Any) -> Any:
+        with self.condition:
+            if key not in self.props:
+                self.props[key] = default
+                self.__changed(key)
+            return self.props[key]
+
+    def waitFor(self, key: Any, timeout: float = None) -> Any:
+        """
+        Wait until the key exists and return its value
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: key in self.props, timeout):
+                raise TimeoutError(f"prop {key} was not set within {timeout} (s)")
+            return self.props[key]
+
+    def __ownerAlive(self, name: str) -> bool:
+        pid = self.lockOwners[name][1]
+        try:
+            if psutil.Process(pid).status() != psutil.STATUS_ZOMBIE:
+                return True
+        except psutil.NoSuchProcess:
+            pass
+        del self.lockOwners[name]
+        return False
+
+    def acquire(self, name: str, owner: str, pid: int, timeout: float = None) -> bool:
+        """
+        Acquire the named lock for owner, running in the process pid. Returns False when
+        the lock was not acquired within the timeout
+        """
+        with self.condition:
+            if self.lockOwners.get(name, (None,))[0] == owner:
+                raise ValueError(f"lock {name} is already held by {owner}")
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while name in self.lockOwners and self.__ownerAlive(name):
+                wait = self.ownerCheckInterval
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                self.condition.wait(wait)
+            self.lockOwners[name] = (owner, pid)
+            return True
+
+    def release(self, name: str, owner: str):
+        with self.condition:
+            if self.lockOwners.get(name, (None,))[0] != owner:
+                raise ValueError(f"lock {name} is not held by {owner}")
+            del self.lockOwners[name]
+            self.condition.notify_all()
+
+    def changedSince(self, version: int) -> tuple[Optional[list[Any]], int]:
+        """
+        Return the keys written after the given version and the current version. The keys
+        are None when the writes are too far back to be known
+        """
+        with self.condition:
+            if self.version - version > len(self.changes):
+                return None, self.version
+            keys = []
+            for v,k in reversed(self.changes):
+                if v <= version:
+                    break
+                keys.append(k)
+            return list(dict.fromkeys(keys)), self.version
+
+
+class WorldManager(BaseManager):
+    pass
+
+
+WorldManager.register("WorldStore", WorldStore)
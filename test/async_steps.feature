@@ -0,0 +1,36 @@
+Feature: Async steps
+
+    Test running I/O bound scenarios as coroutines on an event loop
+
+    Background:
+        (background) Given async background step
+
+    @async
+    Scenario: async scenario 1
+        Then wait asynchronously
+        Then run synchronous step
+
+    @async
+    Scenario: async scenario 2
+        Then wait asynchronously
+        Then run synchronous step
+
+    @async
+    Scenario: async scenario 3
+        Then wait asynchronously
+        Then run synchronous step
+
+    @async
+    @timeout_2
+    Scenario: async scenario with timeout
+        Then wait for a long time
+
+    @async
+    @parallel
+    Scenario: async parallel scenario
+        Then wait asynchronously
+        Then run synchronous step
+
+    @concurrent
+    Scenario: async step in a thread
+        Then wait asynchronously
@@ -0,0 +1,22 @@
+Feature: Concurrent step wakeup
+
+    Test that concurrent steps start as soon as they are queued and that the scenario
+    completes as soon as its last concurrent step completes
+
+    @concurrent
+    Scenario: short concurrent steps
+        Given a short step
+        Concurrently a short step
+        (background) Then a short step
+        Then a short step
+        Concurrently a short step
+
+    @concurrent
+    Scenario: only concurrent steps
+        Concurrently a short step
+        Concurrently a short step
+
+    @parallel
+    Scenario: short concurrent steps in a process
+        Concurrently a short step
+        Then a short step
@@ -0,0 +1,23 @@
+Feature: Distributed execution
+
+    Test that parallel scenarios are executed by remote workers
+
+    @parallel
+    Scenario: remote scenario 1
+        Then calculate on a worker
+
+    @parallel
+    Scenario: remote scenario 2
+        Then calculate on a worker
+
+    @parallel
+    Scenario: remote scenario 3
+        Then calculate on a worker
+
+    @parallel
+    Scenario: remote scenario 4
+        Then calculate on a worker
+
+    @concurrent
+    Scenario: local scenario
+        Then calculate on a worker
@@ -0,0 +1,42 @@
+Feature: Fail fast
+
+    Test that the remaining scenarios are cancelled after the first failure
+
+    @setup
+    Scenario: prepare fail fast
+        Then quick step
+
+    @concurrent
+    @id_smoke
+    Scenario: smoke scenario
+        Then failing step
+
+    @parallel
+    Scenario: slow parallel scenario
+        Then slow step
+
+    @concurrent
+    Scenario: slow concurrent scenario 1
+        Then slow step
+
+    @concurrent
+    Scenario: slow concurrent scenario 2
+        Then slow step
+
+    @concurrent
+    Scenario: queued concurrent scenario
+        Then slow step
+
+    @concurrent
+    @id_independent
+    Scenario: independent scenario
+        Then quick step
+
+    @concurrent
+    @depends_independent
+    Scenario: dependent scenario
+        Then slow step
+
+    @teardown
+    Scenario: clean fail fast
+        Then quick step
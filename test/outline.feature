@@ -0,0 +1,39 @@
+Feature: Scenario outlines and rules
+
+    Test expanding scenario outlines into one scenario per example row
+
+    Background:
+        Given feature background
+
+    @parallel
+    @id_square
+    Scenario Outline: square of <number>
+        Given the number <number>
+        Then the square is <square>
+
+        Examples: small numbers
+            | number | square |
+            | 1      | 1      |
+            | 2      | 4      |
+            | 3      | 9      |
+
+        @concurrent
+        Examples: large numbers
+            | number | square |
+            | 10     | 100    |
+            | 12     | 144    |
+
+    @concurrent
+    @depends_square
+    Scenario: after all squares
+        Then all squares are done
+
+    @concurrent
+    Rule: numbers in a rule
+
+        Background:
+            Given rule background
+
+        @concurrent
+        Scenario: scenario in a rule
+            Then the rule background ran
@@ -0,0 +1,18 @@
+Feature: Output capture
+
+    Test that stdout and stderr are captured per step
+
+    @concurrent
+    Scenario: concurrent thread steps
+        Concurrently print marker alpha
+        Concurrently print marker beta
+        Then print marker gamma
+
+    @async
+    Scenario: async steps
+        Then print marker delta asynchronously
+        Then print marker epsilon
+
+    @parallel
+    Scenario: parallel steps
+        Then print marker zeta
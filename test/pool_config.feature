@@ -0,0 +1,19 @@
+Feature: Pool configuration
+
+    Test that the sizes of the thread and process pools can be configured
+
+    @concurrent
+    Scenario: concurrent scenario 1
+        Then use a worker
+
+    @concurrent
+    Scenario: concurrent scenario 2
+        Then use a worker
+
+    @parallel
+    Scenario: parallel scenario 1
+        Then use a worker
+
+    @parallel
+    Scenario: parallel scenario 2
+        Then use a worker
@@ -0,0 +1,15 @@
+Feature: Remote worker
+
+    Test that cancelling a scenario on a remote worker does not run the other scenarios twice
+
+    @parallel
+    Scenario: hanging scenario
+        Then sleep on the agent for 60 seconds
+
+    @parallel
+    Scenario: running scenario
+        Then sleep on the agent for 8 seconds
+
+    @parallel
+    Scenario: queued scenario
+        Then sleep on the agent for 1 seconds
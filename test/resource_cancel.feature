@@ -0,0 +1,17 @@
+Feature: Resources of cancelled scenarios
+
+    Test that a cancelled scenario running in a thread keeps its resources until its thread returns
+
+    @concurrent
+    @resource_printer
+    Scenario: printer holder
+        Then hold the printer for 3 seconds
+
+    @concurrent
+    Scenario: failing printer check
+        Then fail after 1 seconds
+
+    @teardown
+    @resource_printer
+    Scenario: printer user
+        Then hold the printer for 0 seconds
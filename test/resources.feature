@@ -0,0 +1,37 @@
+Feature: Resource limits
+
+    Test that scenarios using a shared resource respect the capacity of the resource
+
+    @concurrent
+    @resource_database
+    Scenario: database scenario 1
+        Then use the database
+
+    @concurrent
+    @resource_database
+    Scenario: database scenario 2
+        Then use the database
+
+    @parallel
+    @resource_database
+    Scenario: database scenario 3
+        Then use the database
+
+    @parallel
+    @resource_database
+    Scenario: database scenario 4
+        Then use the database
+
+    @concurrent
+    @resource_license
+    Scenario: licensed scenario 1
+        Then use the license
+
+    @concurrent
+    @resource_license
+    Scenario: licensed scenario 2
+        Then use the license
+
+    @concurrent
+    Scenario: unrestricted scenario
+        Then use the license
@@ -0,0 +1,17 @@
+Feature: Result cache
+
+    Test that passing scenarios are not executed again when nothing changed
+
+    @concurrent
+    @id_passing
+    Scenario: passing scenario
+        Then cached step passes
+
+    @concurrent
+    @depends_passing
+    Scenario: dependent scenario
+        Then cached step passes
+
+    @concurrent
+    Scenario: flaky scenario
+        Then cached step may fail
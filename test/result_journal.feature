@@ -0,0 +1,24 @@
+Feature: Result journal
+
+    Test that scenario results are journaled and the reports are generated from the journal
+
+    @setup
+    Scenario: prepare journal
+        Then run journal step
+
+    @concurrent
+    Scenario: journaled scenario 1
+        Then run journal step
+
+    @parallel
+    Scenario: journaled scenario 2
+        Then run journal step
+
+    @concurrent
+    Scenario: failing journaled scenario
+        Then run journal step
+        Then fail journal step
+
+    @teardown
+    Scenario: clean journal
+        Then run journal step
@@ -0,0 +1,11 @@
+Feature: Scenario ids
+
+    Test that scenarios without an @id tag get the same id across runs
+
+    @concurrent
+    Scenario: scenario without id 1
+        Then run id step
+
+    @concurrent
+    Scenario: scenario without id 2
+        Then run id step
@@ -0,0 +1,45 @@
+Feature: Scenario and step timeouts
+
+    Test that hung scenarios and steps are stopped when they time out
+
+    @parallel
+    @timeout_2
+    @id_hungprocess
+    Scenario: hung parallel scenario
+        Then record the worker process as hung
+        Then hang for 30 seconds
+
+    @concurrent
+    @timeout_2
+    @id_hungthread
+    Scenario: hung concurrent scenario
+        Then record the worker process as hungthread
+        Then hang for 3 seconds
+        Then hang for 30 seconds
+
+    @concurrent
+    Scenario: hung step
+        Then hang with step timeout
+
+    @parallel
+    @timeout_10
+    @id_intime
+    Scenario: parallel scenario completing in time
+        Then record the worker process as intime
+        Then hang for 1 seconds
+
+    @parallel
+    @timeout_10
+    @depends_intime
+    Scenario: parallel scenario reusing the worker
+        Then record the worker process as reused
+
+    @concurrent
+    Scenario: hung worker is terminated
+        Then the worker process hung is terminated within 5 seconds
+        Then the worker process hungthread is terminated within 5 seconds
+
+    @concurrent
+    @depends_hungprocess
+    Scenario: depends on hung scenario
+        Then hang for 1 seconds
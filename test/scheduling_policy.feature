@@ -0,0 +1,21 @@
+Feature: Scheduling policy
+
+    Test that scenarios are dispatched by the scheduling policy
+
+    @concurrent
+    Scenario: short scenario
+        Then sleep for 1 seconds
+
+    @concurrent
+    Scenario: medium scenario
+        Then sleep for 2 seconds
+
+    @id_long
+    @concurrent
+    Scenario: long scenario
+        Then sleep for 3 seconds
+
+    @depends_long
+    @concurrent
+    Scenario: after long scenario
+        Then sleep for 1 seconds
@@ -0,0 +1,39 @@
+Feature: Sharding
+
+    Test that scenarios are partitioned into shards and the shard results merged
+
+    @setup
+    Scenario: prepare environment
+        Then run shard step
+
+    @concurrent
+    @id_first
+    Scenario: first of chain
+        Then run shard step
+
+    @concurrent
+    @depends_first
+    Scenario: second of chain
+        Then run shard step
+
+    @parallel
+    @group_pair
+    Scenario: grouped scenario
+        Then run shard step
+
+    @concurrent
+    @dependsGroups_pair
+    Scenario: depends on group
+        Then run shard step
+
+    @concurrent
+    Scenario: independent scenario 1
+        Then run shard step
+
+    @concurrent
+    Scenario: independent scenario 2
+        Then run shard step
+
+    @teardown
+    Scenario: clean environment
+        Then run shard step
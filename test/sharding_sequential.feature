@@ -0,0 +1,15 @@
+Feature: Sharding sequential scenarios
+
+    Test that scenarios without @concurrent or @parallel tags are spread over the shards
+
+    Scenario: sequential scenario 1
+        Then run shard step
+
+    Scenario: sequential scenario 2
+        Then run shard step
+
+    Scenario: sequential scenario 3
+        Then run shard step
+
+    Scenario: sequential scenario 4
+        Then run shard step
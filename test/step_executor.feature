@@ -0,0 +1,30 @@
+Feature: Shared step executor
+
+    Test running the concurrent steps of all scenarios on one bounded step executor
+
+    @concurrent
+    Scenario: concurrent steps 1
+        Concurrently a shared step
+        Concurrently a shared step
+        (background) Then a shared step
+        Then a sequential step
+
+    @concurrent
+    Scenario: concurrent steps 2
+        Concurrently a shared step
+        Concurrently a shared step
+        (background) Then a shared step
+        Then a sequential step
+
+    @concurrent
+    Scenario: concurrent steps 3
+        Concurrently a shared step
+        Concurrently a shared step
+        Then a sequential step
+
+    @parallel
+    Scenario: concurrent steps in a process
+        Concurrently a shared step
+        Concurrently a shared step
+        Concurrently a shared step
+        Then a sequential step
@@ -0,0 +1,9 @@
+Feature: Step definition index
+
+    Test looking up step definitions through the step index
+
+    @concurrent
+    Scenario: indexed steps
+        Given the indexed step 1
+        When the indexed step 2
+        Then the ambiguous indexed step
@@ -0,0 +1,24 @@
+@checkout
+Feature: Tag expressions
+
+    Test selecting scenarios with boolean tag expressions
+
+    @concurrent
+    @smoke
+    Scenario: smoke scenario
+        Then tagged step
+
+    @concurrent
+    @smoke
+    @slow
+    Scenario: slow smoke scenario
+        Then tagged step
+
+    @concurrent
+    @slow
+    Scenario: slow scenario
+        Then tagged step
+
+    @concurrent
+    Scenario: untagged scenario
+        Then tagged step
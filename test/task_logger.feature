@@ -0,0 +1,14 @@
+Feature: Task logger
+
+    Test that scenario logs are capped and the complete log is written to the log file
+
+    @concurrent
+    @id_chatty
+    Scenario: chatty scenario
+        Given log 20000 lines
+        Then log 20000 lines
+
+    @parallel
+    @id_chattyprocess
+    Scenario: chatty parallel scenario
+        Given log 20000 lines
@@ -0,0 +1,51 @@
+import asyncio
+import time
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+@Step(pattern="^async background step$")
+async def asyncBackgroundStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"async background step")
+    await asyncio.sleep(2)
+
+@Step(pattern="^wait asynchronously$")
+async def waitAsynchronously(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"wait asynchronously")
+    await asyncio.sleep(2)
+
+@Step(pattern="^wait for a long time$")
+async def waitLong(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    await asyncio.sleep(60)
+
+@Step(pattern="^run synchronous step$")
+def runSynchronousStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"run synchronous step")
+    time.sleep(0.5)
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    tr = TaskRunner(debugMode=True,maxThreads=1,maxProcesses=1)
+    testResult = tr.run(TaskRunnerConfig(featureFiles=["async_steps.feature"]))
+
+    print("\nprogram elapsed time :", testResult.elapsed)
+    statuses = {t["name"]: t["status"] for t in tr.taskReport}
+    print(f"statuses: {statuses}")
+
+    tr.generateTimeline()
+    tr.generateReport()
+
+    expected = {name: "success" for name in statuses}
+    expected["async scenario with timeout"] = "failed"
+    # the async scenarios overlap on the event loop even though there is a single thread worker
+    if statuses != expected or len(statuses) != 6 or testResult.elapsed > 12:
+        print(f"Test failed")
+        os._exit(1)
@@ -0,0 +1,45 @@
+import sys
+import os
+import time
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.task_monitor import TaskMonitor
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+@Step(pattern="^a short step$")
+def shortStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    time.sleep(0.05)
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    failed = False
+
+    monitor = TaskMonitor()
+    monitor.start()
+    monitor.signalQueue.put(("task", 1234))
+    start = time.time()
+    while monitor.getPid("task") is None and time.time() - start < 1:
+        time.sleep(0.01)
+    monitor.cancel()
+    monitor.join(1)
+    print(f"monitor stopped after {time.time()-start} (s)")
+    failed = failed or monitor.is_alive() or monitor.getPid("task") != 1234
+
+    tr = TaskRunner(debugMode=True)
+    testResult = tr.run(TaskRunnerConfig(featureFiles=["concurrent_wakeup.feature"]))
+    print("\nprogram elapsed time :", testResult.elapsed)
+    tr.generateReport()
+    for t in tr.taskReport:
+        print(f"{t['name']}: {t['elapsed']} (s)")
+        # the steps take 0.1-0.2 seconds so the old one second polling would show up here
+        failed = failed or t["elapsed"] > 0.6
+    failed = failed or not testResult.success
+    if failed:
+        print(f"Test failed")
+        os._exit(1)
@@ -0,0 +1,51 @@
+import time
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.remote_worker import RemoteWorker
+from conclave.feedback_adapter import NullFeedbackAdapter
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+import socket
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+@Step(pattern="^calculate on a worker$")
+def calculate(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"calculate on worker process {os.getpid()} of agent {os.getppid()}")
+    time.sleep(1)
+
+def startWorker(port: int):
+    RemoteWorker(authKey="test",host="localhost",port=port,maxProcesses=2).serve(maxConnections=1)
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=startWorker, args=(port,)) for port in (6101, 6102)]
+    for w in workers:
+        w.start()
+
+    tr = TaskRunner(debugMode=True,maxProcesses=0)
+    tr.registerFeedbackAdapter(NullFeedbackAdapter())
+    testResult = tr.run(TaskRunnerConfig(featureFiles=["distributed.feature"],remoteWorkers=["localhost:6101","localhost:6102"],remoteAuthKey="test"))
+
+    print("\nprogram elapsed time :", testResult.elapsed)
+    print(f"hosts: {testResult.hosts}")
+
+    for w in workers:
+        w.join(timeout=30)
+
+    tr.generateTimeline()
+    tr.generateReport()
+
+    # remote and local scenarios report their host the same way
+    agents = {str(w.pid) for w in workers}
+    remote = [t for t in tr.taskReport if t["name"].startswith("remote")]
+    ranOnAgents = all(t["scenario"].steps[0]["log"].split("of agent ")[-1].strip() in agents for t in remote)
+    if not testResult.success or testResult.hosts != [socket.gethostname()] or len(remote) != 4 or not ranOnAgents:
+        print(f"Test failed")
+        os._exit(1)
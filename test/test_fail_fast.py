@@ -0,0 +1,61 @@
+import subprocess
+import time
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+@Step(pattern="^quick step$")
+def quickStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"quick step")
+
+@Step(pattern="^failing step$")
+def failingStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    time.sleep(1)
+    raise Exception("smoke test failed")
+
+@Step(pattern="^slow step$")
+def slowStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    time.sleep(30)
+
+def runFailFast():
+    tr = TaskRunner(debugMode=True,maxThreads=3,maxProcesses=1)
+    testResult = tr.run(TaskRunnerConfig(featureFiles=["fail_fast.feature"],failFast=True))
+
+    print("\nprogram elapsed time :", testResult.elapsed)
+    statuses = {t["name"]: t["status"] for t in tr.taskReport}
+    print(f"statuses: {statuses}")
+
+    expected = {
+        "prepare fail fast": "success",
+        "smoke scenario": "failed",
+        "slow parallel scenario": "skipped",
+        "slow concurrent scenario 1": "skipped",
+        "slow concurrent scenario 2": "skipped",
+        "queued concurrent scenario": "skipped",
+        "clean fail fast": "success"
+    }
+    if testResult.success or testResult.elapsed > 20 or any(statuses.get(k) != v for k,v in expected.items()) or len(statuses) != 9:
+        print(f"Test failed")
+        os._exit(1)
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    if "--run" in sys.argv:
+        runFailFast()
+        sys.exit(0)
+    # the process must not wait for the cancelled scenarios to finish their 30 second steps
+    start = time.time()
+    returncode = subprocess.run([sys.executable, os.path.abspath(__file__), "--run"]).returncode
+    wallTime = time.time() - start
+    print(f"process wall time: {wallTime}")
+    if returncode != 0 or wallTime > 20:
+        print(f"Test failed")
+        os._exit(1)
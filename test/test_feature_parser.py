@@ -0,0 +1,77 @@
+import sys
+import os
+import tempfile
+import time
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.feature_parser import FeatureParser
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+FEATURE = """Feature: Generated feature {index}
+
+    Background:
+        (background) Given parsed step
+
+    @concurrent
+    Scenario: generated scenario {index} 1
+        Given parsed step
+        Concurrently parsed step
+        * parsed step
+
+    @concurrent
+    Scenario: generated scenario {index} 2
+        Then parsed step
+"""
+
+@Step(pattern="^parsed step$")
+def parsedStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"parsed step")
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    if os.path.isfile("ast_cache.json"):
+        os.remove("ast_cache.json")
+    failed = False
+    with tempfile.TemporaryDirectory() as featureDir:
+        files = []
+        for i in range(20):
+            fileName = os.path.join(featureDir, f"generated_{i}.feature")
+            with open(fileName, "w", encoding='utf8') as fh:
+                fh.write(FEATURE.format(index=i))
+            files.append(fileName)
+
+        parser = FeatureParser("ast_cache.json", maxProcesses=2)
+        documents = parser.parseFiles(files)
+        print(f"first parse: parsed {parser.parsedFiles}, cached {parser.cachedFiles}")
+        keywords = [s["keyword"] for s in documents[0][1]["feature"]["children"][1]["scenario"]["steps"]]
+        print(f"step keywords: {keywords}")
+        failed = failed or parser.parsedFiles != 20 or keywords != ["Given ","Concurrently ","* "]
+
+        parser = FeatureParser("ast_cache.json", maxProcesses=2)
+        failed = failed or parser.parseFiles(files) != documents or parser.parsedFiles != 0 or parser.cachedFiles != 20
+        print(f"second parse: parsed {parser.parsedFiles}, cached {parser.cachedFiles}")
+
+        # one file changes and another one is only touched
+        time.sleep(0.01)
+        with open(files[0], "a", encoding='utf8') as fh:
+            fh.write("\n    @concurrent\n    Scenario: added scenario\n        Then parsed step\n")
+        os.utime(files[1])
+        parser = FeatureParser("ast_cache.json", maxProcesses=2)
+        parser.parseFiles(files)
+        print(f"third parse: parsed {parser.parsedFiles}, cached {parser.cachedFiles}")
+        failed = failed or parser.parsedFiles != 1 or parser.cachedFiles != 19
+
+        tr = TaskRunner(debugMode=False)
+        testResult = tr.run(TaskRunnerConfig(featureFiles=[featureDir],astCache="ast_cache.json",parserProcesses=2))
+        print(f"scenarios run: {len(tr.taskReport)}")
+        failed = failed or not testResult.success or len(tr.taskReport) != 41
+
+    if failed:
+        print(f"Test failed")
+        os._exit(1)
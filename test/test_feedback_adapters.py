@@ -0,0 +1,164 @@
+import sys
+import os
+import tempfile
+import threading
+import time
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.feedback_adapter import FeedbackAdapter
+from conclave.feedback_schema import ScenarioFeedback, StepFeedback
+from conclave.feedback_worker import FeedbackAdapterWorker, OverflowPolicy
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+STEPS = 100
+
+FEATURE = """Feature: Feedback adapters
+
+    @concurrent
+    @id_first
+    Scenario: register a late adapter
+        Given a late adapter is registered
+
+    @concurrent
+    @depends_first
+    Scenario: many tiny steps
+{steps}
+"""
+
+class FileFeedbackAdapter(FeedbackAdapter):
+
+    """
+    Writes a line for every event to a file, optionally sleeping to simulate a slow adapter
+    """
+    def __init__(self, fileName: str, delay: float = 0):
+        self.fileName = fileName
+        self.delay = delay
+
+    def onNotifyScenario(self, schema: ScenarioFeedback):
+        self.__write(f"scenario {schema.name} {schema.status}")
+
+    def onNotifyStep(self, schema: StepFeedback):
+        self.__write(f"step {schema.text} {schema.status}")
+
+    def __write(self, line: str):
+        time.sleep(self.delay)
+        with open(self.fileName, "a", encoding='utf8') as fh:
+            fh.write(line + "\n")
+
+
+class BatchFeedbackAdapter(FeedbackAdapter):
+
+    def __init__(self, fileName: str):
+        self.fileName = fileName
+
+    def onNotifyBatch(self, events):
+        with open(self.fileName, "a", encoding='utf8') as fh:
+            fh.write(f"{len(events)}\n")
+
+class GateFeedbackAdapter(FeedbackAdapter):
+
+    """
+    Keeps the events it receives and holds every event until the gate is opened
+    """
+    def __init__(self):
+        self.gate = threading.Event()
+        self.events = []
+
+    def onNotifyScenario(self, schema: ScenarioFeedback):
+        self.gate.wait()
+        self.events.append(schema)
+
+    def onNotifyStep(self, schema: StepFeedback):
+        self.gate.wait()
+        self.events.append(schema)
+
+
+def testCoalesceRows() -> bool:
+    """
+    Steps of two outline rows share the scenario name, line and column. Their events are
+    only coalesced when the buffer is full and only with a pending event of the same row
+    """
+    adapter = GateFeedbackAdapter()
+    worker = FeedbackAdapterWorker(adapter, maxBuffer=3, overflow=OverflowPolicy.COALESCE, batchSize=1)
+    worker.put(ScenarioFeedback(id="first", name="first", status="starting"))
+    while worker.stats.pending > 0:
+        time.sleep(0.01)
+    row = {"name": "outline", "line": 3, "column": 5}
+    worker.put(StepFeedback(scenario=row, scenarioKey="row1", line=4, column=9, status="starting"))
+    worker.put(StepFeedback(scenario=row, scenarioKey="row2", line=4, column=9, status="starting"))
+    worker.put(StepFeedback(scenario=row, scenarioKey="row1", line=4, column=9, status="success"))
+    belowCapacity = worker.stats.coalesced
+    worker.put(StepFeedback(scenario=row, scenarioKey="row2", line=4, column=9, status="success"))
+    adapter.gate.set()
+    worker.stop()
+    received = [(e.scenarioKey, e.status) for e in adapter.events[1:]]
+    print(f"coalesce rows: {received}, {worker.stats}")
+    return belowCapacity == 0 and worker.stats.coalesced == 1 and worker.stats.dropped == 0 and \
+        received == [("row1","starting"),("row2","success"),("row1","success")]
+
+tr: TaskRunner = None
+tempDir = tempfile.mkdtemp()
+
+def readLines(name: str) -> list[str]:
+    fileName = os.path.join(tempDir, name)
+    if not os.path.isfile(fileName):
+        return []
+    with open(fileName, "r", encoding='utf8') as fh:
+        return fh.read().splitlines()
+
+@Step(pattern="^a tiny step$")
+def tinyStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    pass
+
+@Step(pattern="^a late adapter is registered$")
+def lateAdapter(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    tr.registerFeedbackAdapter(FileFeedbackAdapter(os.path.join(tempDir, "late.txt")))
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    failed = False
+    featureFile = os.path.join(tempDir, "feedback_adapters.feature")
+    with open(featureFile, "w", encoding='utf8') as fh:
+        fh.write(FEATURE.format(steps="        Given a tiny step\n" * STEPS))
+
+    tr = TaskRunner(debugMode=False)
+    tr.registerFeedbackAdapter(FileFeedbackAdapter(os.path.join(tempDir, "all.txt")))
+    tr.registerFeedbackAdapter(FileFeedbackAdapter(os.path.join(tempDir, "slow.txt"), delay=0.05), maxBuffer=10, overflow=OverflowPolicy.DROP_OLDEST)
+    tr.registerFeedbackAdapter(FileFeedbackAdapter(os.path.join(tempDir, "coalesce.txt"), delay=0.05), maxBuffer=10, overflow=OverflowPolicy.COALESCE)
+    tr.registerFeedbackAdapter(BatchFeedbackAdapter(os.path.join(tempDir, "batch.txt")), batchSize=50)
+    tr.registerFeedbackAdapter(FileFeedbackAdapter(os.path.join(tempDir, "coalesce_all.txt")), overflow=OverflowPolicy.COALESCE)
+    try:
+        tr.registerFeedbackAdapter(BatchFeedbackAdapter(os.path.join(tempDir, "invalid.txt")), overflow="unknown")
+        failed = True
+    except ValueError as e:
+        print(f"expected error: {e}")
+    testResult = tr.run(TaskRunnerConfig(featureFiles=[featureFile]))
+    print(f"program elapsed time : {testResult.elapsed}")
+
+    stats = tr.getFeedbackStats()
+    for s in stats:
+        print(s)
+    allEvents = readLines("all.txt")
+    lateEvents = readLines("late.txt")
+    batches = [int(n) for n in readLines("batch.txt")]
+    print(f"all: {len(allEvents)}, slow: {len(readLines('slow.txt'))}, coalesce: {len(readLines('coalesce.txt'))}, late: {len(lateEvents)}, batches: {batches}")
+    # every step reports that it started and completed and every scenario starts and completes
+    expected = 2 * (STEPS + 1) + 4
+    failed = failed or not testResult.success or len(allEvents) != expected or sum(batches) != expected
+    failed = failed or max(batches) > 50 or stats[0].delivered != expected or stats[0].dropped != 0
+    failed = failed or stats[1].dropped == 0 or stats[1].delivered + stats[1].dropped != expected
+    failed = failed or stats[2].coalesced + stats[2].dropped == 0
+    # nothing is coalesced while the buffer has room
+    failed = failed or stats[4].delivered != expected or stats[4].coalesced + stats[4].dropped != 0
+    failed = failed or len(readLines("coalesce_all.txt")) != expected
+    failed = failed or len(stats) != 6 or not any(e.startswith("step a tiny step") for e in lateEvents)
+    failed = not testCoalesceRows() or failed
+    if failed:
+        print(f"Test failed")
+        os._exit(1)
@@ -0,0 +1,94 @@
+import sys
+import os
+import tempfile
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.feedback_adapter import FeedbackAdapter
+from conclave.feedback import Feedback
+from conclave.feedback_schema import ScenarioFeedback, StepFeedback
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+import queue
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+STEPS = 200
+
+FEATURE = """Feature: Feedback channel
+
+    @parallel
+    Scenario: many tiny steps in a process
+{steps}
+    @concurrent
+    Scenario: many tiny steps in a thread
+{steps}
+        Concurrently a tiny step
+"""
+
+class CountingFeedbackAdapter(FeedbackAdapter):
+
+    """
+    Writes a line for every feedback event to a file, since the adapter runs in the
+    feedback process
+    """
+    def __init__(self, fileName: str):
+        self.fileName = fileName
+
+    def onNotifyScenario(self, schema: ScenarioFeedback):
+        with open(self.fileName, "a", encoding='utf8') as fh:
+            fh.write(f"scenario {schema.name} {schema.status}\n")
+
+    def onNotifyStep(self, schema: StepFeedback):
+        with open(self.fileName, "a", encoding='utf8') as fh:
+            fh.write(f"step {schema.scenario['name']} {schema.feature['name']} {schema.status} {schema.pid}\n")
+
+@Step(pattern="^a tiny step$")
+def tinyStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    pass
+
+def testMetadataPruned() -> bool:
+    """
+    Feed the records of a scenario that ran twice and of a scenario still running to the
+    feedback loop and check that only the metadata of the running scenario is kept
+    """
+    feedback = Feedback()
+    q = queue.Queue()
+    scenarioInfo, featureInfo = ("s", 1, 1, [], "", 1), ("f", [], "")
+    step = ("step", "key1", "success", 1, 1, None, None, 0.0, None, "", 1, 1, "Given ", "a tiny step")
+    q.put([("meta", "key1", scenarioInfo, featureInfo, "1"), step])
+    q.put([("meta", "key2", scenarioInfo, featureInfo, "1"), ("meta", "key3", scenarioInfo, featureInfo, "2")])
+    q.put([("scenario", {"type": "ScenarioFeedback", "id": "1", "status": "starting"})])
+    q.put([("scenario", {"type": "ScenarioFeedback", "id": "1", "status": "success"})])
+    q.put("STOP")
+    feedback.runFeedback(q)
+    print(f"metadata after the run: {list(feedback.metadata)} {feedback.metadataKeys}")
+    return list(feedback.metadata) == ["key3"] and feedback.metadataKeys == {"2": ["key3"]}
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    failed = False
+    failed = not testMetadataPruned()
+    with tempfile.TemporaryDirectory() as tempDir:
+        featureFile = os.path.join(tempDir, "feedback_channel.feature")
+        with open(featureFile, "w", encoding='utf8') as fh:
+            fh.write(FEATURE.format(steps="        Given a tiny step\n" * STEPS))
+        for startMethod in ("spawn", "forkserver"):
+            eventFile = os.path.join(tempDir, f"events_{startMethod}.txt")
+            tr = TaskRunner(debugMode=False, startMethod=startMethod)
+            tr.registerFeedbackAdapter(CountingFeedbackAdapter(eventFile))
+            testResult = tr.run(TaskRunnerConfig(featureFiles=[featureFile]))
+            print(f"{startMethod}: program elapsed time : {testResult.elapsed}")
+            with open(eventFile, "r", encoding='utf8') as fh:
+                events = fh.read().splitlines()
+            steps = [e for e in events if e.startswith("step ")]
+            scenarios = [e for e in events if e.startswith("scenario ")]
+            print(f"{startMethod}: {len(steps)} step events, {len(scenarios)} scenario events")
+            # every step reports that it started and that it completed
+            failed = failed or not testResult.success or len(steps) != 2 * (2 * STEPS + 1) or len(scenarios) != 4
+            failed = failed or sum(1 for e in steps if e.startswith("step many tiny steps in a process Feedback channel success")) != STEPS
+    if failed:
+        print(f"Test failed")
+        os._exit(1)
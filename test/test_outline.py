@@ -0,0 +1,59 @@
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+@Step(pattern="^feature background$")
+def featureBackground(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"feature background")
+
+@Step(pattern="^rule background$")
+def ruleBackground(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    context.ruleBackground = True
+
+@Step(pattern="^the rule background ran$")
+def ruleBackgroundRan(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    assert context.ruleBackground
+
+@Step(pattern="^the number (\\d+)$")
+def theNumber(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    context.number = int(match.group(1))
+
+@Step(pattern="^the square is (\\d+)$")
+def theSquare(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    assert context.number * context.number == int(match.group(1))
+
+@Step(pattern="^all squares are done$")
+def allSquaresDone(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"all squares are done")
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    tr = TaskRunner(debugMode=True,maxProcesses=2)
+    testResult = tr.run(TaskRunnerConfig(featureFiles=["outline.feature"]))
+
+    print("\nprogram elapsed time :", testResult.elapsed)
+    tasks = {t["name"]: t["task"] for t in tr.taskReport}
+    print(f"tasks: {[(name, t.id, t.getMode()) for name,t in tasks.items()]}")
+
+    tr.generateTimeline()
+    tr.generateReport()
+
+    rows = [t for name,t in tasks.items() if name.startswith("square of")]
+    last = next(t for t in tr.taskReport if t["name"] == "after all squares")
+    lastStart = last["scenario"].startTime if last["scenario"] else None
+    failed = not testResult.success or len(tasks) != 7 or len(rows) != 5
+    failed = failed or sorted(t.id for t in rows) != ["square_1","square_2","square_3","square_4","square_5"]
+    failed = failed or sorted(t.getMode() for t in rows) != ["process","process","process","thread","thread"]
+    failed = failed or tasks["after all squares"].depends != ["square_1","square_2","square_3","square_4","square_5"]
+    failed = failed or any(t["scenario"].endTime > lastStart for t in tr.taskReport if t["name"].startswith("square of"))
+    if failed:
+        print(f"Test failed")
+        os._exit(1)
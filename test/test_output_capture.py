@@ -0,0 +1,62 @@
+import asyncio
+import io
+import time
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+MARKERS = ["alpha","beta","gamma","delta","epsilon","zeta"]
+
+@Step(pattern="^print marker (\\w+)$")
+def printMarker(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    marker = match.group(1)
+    for i in range(20):
+        print(f"out-{marker}-{i}")
+        print(f"err-{marker}-{i}", file=sys.stderr)
+        time.sleep(0.01)
+    # a line without a newline is logged when the step completes
+    sys.stdout.write(f"tail-{marker}")
+
+@Step(pattern="^print marker (\\w+) asynchronously$")
+async def printMarkerAsync(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    marker = match.group(1)
+    for i in range(20):
+        print(f"out-{marker}-{i}")
+        await asyncio.sleep(0.01)
+    sys.stdout.write(f"tail-{marker}")
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    console = io.StringIO()
+    stdout,sys.stdout = sys.stdout,console
+    tr = TaskRunner(debugMode=False,maxProcesses=1)
+    testResult = tr.run(TaskRunnerConfig(featureFiles=["output_capture.feature"],captureOutput=True))
+    sys.stdout = stdout
+    failed = not testResult.success or len(tr.taskReport) != 3
+    logs = {}
+    for t in tr.taskReport:
+        for step in t["scenario"].steps:
+            marker = step["text"].split(" ")[2]
+            logs[marker] = step["log"]
+    for marker in MARKERS:
+        log = logs.get(marker, "")
+        others = [m for m in MARKERS if m != marker and f"-{m}-" in log]
+        stderr = marker not in ("delta",)
+        print(f"{marker}: {log.count(f'stdout] out-{marker}-')} stdout lines, {log.count(f'stderr] err-{marker}-')} stderr lines, others: {others}")
+        failed = failed or log.count(f"stdout] out-{marker}-") != 20 or f"stdout] tail-{marker}\n" not in log or others
+        failed = failed or (stderr and log.count(f"stderr] err-{marker}-") != 20)
+    # the runner still prints to the console but the step output only shows up in the logs
+    lines = console.getvalue().split("\n")
+    print(f"console lines: {len(lines)}")
+    failed = failed or "Test report:" not in lines or any(l.startswith(("out-","err-","tail-")) for l in lines)
+    if failed:
+        print(f"Test failed")
+        os._exit(1)
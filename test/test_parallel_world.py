@@ -16,13 +16,14 @@ from conclave.scenario_scope import ScenarioScope
 def step1(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
     logger.log(f"step 1")
     world.setProp("itemA","hello")
-    time.sleep(10)
 
 @Step(pattern="^step 2$")
 def step2(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
     logger.log(f"step 1")
-    value = world.getProp("itemA")
+    value = world.waitFor("itemA", timeout=60)
     logger.log(f"itemA: {value}")
+    if value != "hello":
+        raise Exception(f"unexpected itemA: {value}")
 
 if __name__ == '__main__':
     print(f"cpu count: {multiprocessing.cpu_count()}")
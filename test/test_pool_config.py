@@ -0,0 +1,52 @@
+import time
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+@Step(pattern="^use a worker$")
+def useWorker(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"use a worker")
+    time.sleep(1)
+
+def overlapping(results) -> bool:
+    return results[0].startTime < results[1].endTime and results[1].startTime < results[0].endTime
+
+def invalidConfig(**kwargs) -> bool:
+    try:
+        TaskRunner(**kwargs).run(TaskRunnerConfig(featureFiles=["pool_config.feature"]))
+        return False
+    except ValueError as e:
+        print(f"expected error: {e}")
+        return True
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    # the options of the config override the options of the runner
+    tr = TaskRunner(debugMode=True,maxThreads=1,maxProcesses=2)
+    testResult = tr.run(TaskRunnerConfig(featureFiles=["pool_config.feature"],maxThreads=2,maxProcesses=1,startMethod="spawn"))
+    print("\nprogram elapsed time :", testResult.elapsed)
+    concurrent = [t["scenario"] for t in tr.taskReport if t["name"].startswith("concurrent")]
+    parallel = [t["scenario"] for t in tr.taskReport if t["name"].startswith("parallel")]
+    print(f"threads: {tr.maxThreads}, processes: {tr.maxProcesses}, parallel pids: {[r.pid for r in parallel]}")
+    failed = not testResult.success or tr.maxThreads != 2 or tr.maxProcesses != 1
+    # two threads run the concurrent scenarios at the same time and a single process runs
+    # the parallel scenarios one after the other
+    failed = failed or not overlapping(concurrent) or overlapping(parallel) or parallel[0].pid != parallel[1].pid
+
+    # without maxProcesses the number of processes follows the oversubscription factor
+    tr = TaskRunner(oversubscription=2.0)
+    testResult = tr.run(TaskRunnerConfig(featureFiles=["pool_config.feature"]))
+    failed = failed or not testResult.success or tr.maxProcesses != max(1, round(multiprocessing.cpu_count() * 2.0))
+
+    failed = failed or not invalidConfig(startMethod="unknown") or not invalidConfig(maxThreads=0)
+    if failed:
+        print(f"Test failed")
+        os._exit(1)
@@ -0,0 +1,75 @@
+import time
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from multiprocessing.connection import AuthenticationError, Client
+from conclave.feature_parser import FeatureParser
+from conclave.remote_executor import RemoteExecutor
+from conclave.remote_worker import RemoteWorker
+from conclave.scenario import Scenario
+from conclave.scenario_context import ScenarioContext
+from conclave.scenario_result import ScenarioResult
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+@Step(pattern="^sleep on the agent for (\\d+) seconds$")
+def sleepOnAgent(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    time.sleep(int(match.group(1)))
+
+def startWorker(port: int):
+    RemoteWorker(authKey="test",port=port,maxProcesses=2,preloadModules=["test_remote_worker"]).serve(maxConnections=1)
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    failed = False
+    try:
+        RemoteWorker(authKey="")
+        failed = True
+    except ValueError:
+        pass
+    worker = multiprocessing.get_context("spawn").Process(target=startWorker, args=(6111,))
+    worker.start()
+
+    # a connection with the wrong key is rejected without stopping the agent
+    deadline = time.time() + 30
+    while True:
+        try:
+            Client(("127.0.0.1", 6111), authkey=b"wrong")
+            failed = True
+            break
+        except AuthenticationError:
+            break
+        except ConnectionRefusedError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.2)
+
+    executor = RemoteExecutor("127.0.0.1:6111", "test", lambda batch: None)
+    executor.connect()
+    featureFile,document = FeatureParser().parseFiles([os.path.abspath("remote_worker.feature")])[0]
+    futures = {}
+    for child in document["feature"]["children"]:
+        scenario = Scenario(child["scenario"]["name"], child["scenario"], document["feature"], child["scenario"]["name"])
+        futures[scenario.name] = executor.submit(scenario.id, scenario, ScenarioContext(id=scenario.id, isParallel=True))
+    # the hanging and the running scenario have started, the queued scenario waits for a worker
+    time.sleep(3)
+    start = time.time()
+    executor.cancel("hanging scenario")
+    results = {name: (f.exception(timeout=60) or f.result()) for name,f in futures.items()}
+    elapsed = time.time() - start
+    executor.shutdown()
+    worker.join(timeout=30)
+    print(f"results after {elapsed} (s): {results}")
+
+    failed = failed or not isinstance(results["hanging scenario"], Exception) or isinstance(results["hanging scenario"], ScenarioResult)
+    # a scenario that was running when the pool broke is reported instead of run again
+    failed = failed or not isinstance(results["running scenario"], Exception) or "worker pool restarted" not in str(results["running scenario"])
+    failed = failed or not isinstance(results["queued scenario"], ScenarioResult) or results["queued scenario"].exception is not None
+    failed = failed or elapsed > 30
+    if failed:
+        print(f"Test failed")
+        os._exit(1)
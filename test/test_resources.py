@@ -0,0 +1,69 @@
+import time
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+@Step(pattern="^use the database$")
+def useDatabase(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"use the database")
+    time.sleep(1)
+
+@Step(pattern="^use the license$")
+def useLicense(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"use the license")
+    time.sleep(1)
+
+printerUse = []
+
+@Step(pattern="^hold the printer for (\\d+) seconds$")
+def holdPrinter(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    start = time.time()
+    time.sleep(int(match.group(1)))
+    printerUse.append((start, time.time()))
+
+@Step(pattern="^fail after (\\d+) seconds$")
+def failAfter(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    time.sleep(int(match.group(1)))
+    raise Exception("printer check failed")
+
+def maxOverlapping(results):
+    events = sorted([(r.startTime, 1) for r in results] + [(r.endTime, -1) for r in results], key=lambda x: (x[0], x[1]))
+    current, highest = 0, 0
+    for _,delta in events:
+        current += delta
+        highest = max(highest, current)
+    return highest
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    tr = TaskRunner(debugMode=True,maxProcesses=2)
+    testResult = tr.run(TaskRunnerConfig(featureFiles=["resources.feature"],resources={"database": 2}))
+
+    print("\nprogram elapsed time :", testResult.elapsed)
+
+    database = [t["scenario"] for t in tr.taskReport if "database" in t["name"]]
+    license = [t["scenario"] for t in tr.taskReport if "licensed" in t["name"]]
+    print(f"max concurrent database scenarios: {maxOverlapping(database)}")
+    print(f"max concurrent licensed scenarios: {maxOverlapping(license)}")
+
+    failed = not testResult.success or maxOverlapping(database) > 2 or maxOverlapping(license) > 1
+
+    # the printer holder is cancelled by the failure while its step is still using the printer
+    tr = TaskRunner(debugMode=True)
+    testResult = tr.run(TaskRunnerConfig(featureFiles=["resource_cancel.feature"],failFast=True))
+    status = {t["name"]: t["status"] for t in tr.taskReport}
+    print(f"printer use: {printerUse}, status: {status}")
+    failed = failed or status != {"printer holder": "skipped", "failing printer check": "failed", "printer user": "success"}
+    failed = failed or len(printerUse) != 2 or printerUse[1][0] < printerUse[0][1]
+
+    if failed:
+        print(f"Test failed")
+        os._exit(1)
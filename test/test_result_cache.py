@@ -0,0 +1,53 @@
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.result_cache import ResultCache
+from conclave.before_scenario import BeforeScenario
+from conclave.step import Step
+from conclave.world import World
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+shouldFail = {"value": True}
+
+@Step(pattern="^cached step passes$")
+def cachedStepPasses(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"cached step passes")
+
+@Step(pattern="^cached step may fail$")
+def cachedStepMayFail(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    if shouldFail["value"]:
+        raise Exception("flaky scenario failed")
+
+def run(rerunFailed: bool = False):
+    tr = TaskRunner(debugMode=True,resultCache=ResultCache("result_cache.json"))
+    testResult = tr.run(TaskRunnerConfig(featureFiles=["result_cache.feature"],rerunFailed=rerunFailed))
+    executed = sorted(t["name"] for t in tr.taskReport if not t["cached"])
+    print(f"executed scenarios: {executed}")
+    return testResult,executed
+
+if __name__ == '__main__':
+    if os.path.isfile("result_cache.json"):
+        os.remove("result_cache.json")
+
+    # first run executes everything and the flaky scenario fails
+    testResult,first = run()
+    # only the failed scenario runs again
+    shouldFail["value"] = False
+    rerunResult,rerun = run(rerunFailed=True)
+    # nothing changed so everything is cached
+    cachedResult,cached = run()
+
+    # a new hook changes the hash of every scenario
+    @BeforeScenario()
+    def beforeScenario(logger: TaskLogger, world: World, context: ScenarioScope):
+        logger.log(f"before scenario")
+    changedResult,changed = run()
+
+    if testResult.success or len(first) != 3 or not rerunResult.success or rerun != ["flaky scenario"] \
+        or not cachedResult.success or cached != [] or not changedResult.success or len(changed) != 3:
+        print(f"Test failed")
+        os._exit(1)
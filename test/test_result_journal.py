@@ -0,0 +1,73 @@
+import time
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave import task_runner
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.result_journal import loadJournal
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+@Step(pattern="^run journal step$")
+def runJournalStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"run journal step")
+    time.sleep(0.2)
+
+@Step(pattern="^fail journal step$")
+def failJournalStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    raise Exception("journal step failed")
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    journalFile = "reports/result_journal.ndjson"
+    # count how often the runner reads the journal back
+    loads = []
+    def countingLoadJournal(fileName):
+        loads.append(fileName)
+        return loadJournal(fileName)
+    task_runner.loadJournal = countingLoadJournal
+    tr = TaskRunner(debugMode=True,maxProcesses=1)
+    testResult = tr.run(TaskRunnerConfig(featureFiles=["result_journal.feature"],resultJournal=journalFile))
+    tr.generateReport("reports/journal_report.html")
+    tr.generateJUnitReport("reports/journal_junit.xml")
+    tr.generateTimeline("reports/journal_timeline.html")
+    print(f"summary: {tr.taskReport}")
+
+    failed = testResult.success or len(tr.taskReport) != 5
+    # only the summary of every scenario is kept in memory
+    failed = failed or any("task" in t or "scenario" in t for t in tr.taskReport)
+    failed = failed or any(t.scenario is not None for t in tr.setupTasks + tr.mainTasks + tr.teardownTasks)
+    # the run and every report share a single read of the journal
+    print(f"journal loads: {len(loads)}")
+    failed = failed or len(loads) != 1
+    journal = loadJournal(journalFile)
+    failed = failed or not journal.complete or journal.testResult != testResult
+    failed = failed or [t["name"] for t in journal.taskReport] != [t["name"] for t in tr.taskReport]
+    failed = failed or any(t["scenario"] is None or not t["scenario"].steps for t in journal.taskReport)
+    with open("reports/journal_junit.xml", "r", encoding='utf8') as fh:
+        failed = failed or fh.read().count("<testcase") != 5
+
+    # cut the journal in the middle of a record as if the run crashed
+    with open(journalFile, "r", encoding='utf8') as fh:
+        lines = fh.readlines()
+    partialFile = "reports/partial_journal.ndjson"
+    with open(partialFile, "w", encoding='utf8') as fh:
+        fh.writelines(lines[:3])
+        fh.write(lines[3][:len(lines[3])//2])
+    loader = TaskRunner()
+    partialResult = loader.loadResultJournal(partialFile)
+    loader.generateReport("reports/partial_report.html")
+    loader.generateJUnitReport("reports/partial_junit.xml")
+    print(f"partial: {[t['name'] for t in loader.taskReport]} {partialResult}")
+    failed = failed or partialResult.success or len(loader.taskReport) != 2
+    failed = failed or [t["name"] for t in loader.taskReport] != [t["name"] for t in tr.taskReport[:2]]
+    with open("reports/partial_junit.xml", "r", encoding='utf8') as fh:
+        failed = failed or fh.read().count("<testcase") != 2
+    if failed:
+        print(f"Test failed")
+        os._exit(1)
@@ -0,0 +1,45 @@
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+@Step(pattern="^run id step$")
+def runIdStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"run id step")
+
+def scenarioIds(featureFiles: list[str], cwd: str, projectRoot: str = None) -> dict[str, str]:
+    current = os.getcwd()
+    os.chdir(cwd)
+    try:
+        tr = TaskRunner()
+        tr.run(TaskRunnerConfig(featureFiles=featureFiles,projectRoot=projectRoot))
+    finally:
+        os.chdir(current)
+    # the steps of the other feature files may not be defined, so only the ids are compared
+    return {t["name"]: t["id"] for t in tr.taskReport}
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    testDir = os.path.dirname(os.path.abspath(__file__))
+    rootDir = os.path.dirname(testDir)
+    # the id does not depend on the directory the run is started from
+    fromTestDir = scenarioIds(["scenario_id.feature"], testDir)
+    fromRootDir = scenarioIds(["test/scenario_id.feature"], rootDir)
+    print(f"ids: {fromTestDir} {fromRootDir}")
+    failed = len(fromTestDir) != 2 or fromTestDir != fromRootDir or len(set(fromTestDir.values())) != 2
+
+    # with a project root the id does not depend on the other feature files of the run
+    alone = scenarioIds(["scenario_id.feature"], testDir, projectRoot=rootDir)
+    together = scenarioIds(["scenario_id.feature", "test-dir"], testDir, projectRoot=rootDir)
+    print(f"ids with project root: {alone}")
+    failed = failed or len(alone) != 2 or any(together.get(name) != id for name,id in alone.items())
+    if failed:
+        print(f"Test failed")
+        os._exit(1)
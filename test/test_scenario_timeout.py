@@ -0,0 +1,63 @@
+import time
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+import psutil
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+@Step(pattern="^hang for (\d+) seconds$")
+def hang(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"hang for {match.group(1)} seconds")
+    time.sleep(int(match.group(1)))
+
+@Step(pattern="^hang with step timeout$", timeout=1)
+def hangWithTimeout(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"hang with step timeout")
+    time.sleep(30)
+
+@Step(pattern="^record the worker process as (\\w+)$")
+def recordWorker(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    world.setProp(f"pid_{match.group(1)}", os.getpid())
+
+@Step(pattern="^the worker process (\\w+) is terminated within (\\d+) seconds$")
+def workerTerminated(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    pid = world.waitFor(f"pid_{match.group(1)}", timeout=5)
+    deadline = time.time() + int(match.group(2))
+    while psutil.pid_exists(pid) and psutil.Process(pid).status() != psutil.STATUS_ZOMBIE:
+        if time.time() > deadline:
+            raise Exception(f"worker process {pid} is still running")
+        time.sleep(0.1)
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    tr = TaskRunner(debugMode=True,timeout=60)
+    testResult = tr.run(["scenario_timeout.feature"])
+
+    print("\nprogram elapsed time :", testResult.elapsed)
+
+    expected = {
+        "hung parallel scenario": "failed",
+        "hung concurrent scenario": "failed",
+        "hung step": "failed",
+        "parallel scenario completing in time": "success",
+        "parallel scenario reusing the worker": "success",
+        "hung worker is terminated": "success",
+        "depends on hung scenario": "skipped"
+    }
+    actual = {t["name"]: t["status"] for t in tr.taskReport}
+    # a scenario with a timeout reuses the worker of the last one that completed in time
+    pids = {t["name"]: t["scenario"].pid for t in tr.taskReport if t["scenario"] is not None}
+    print(f"worker processes: {pids}")
+    reused = pids.get("parallel scenario reusing the worker") == pids.get("parallel scenario completing in time")
+    # a concurrent scenario with a timeout runs in a worker process of its own as well
+    world = World()
+    reused = reused and world.getProp("pid_hungthread") not in (None, os.getpid())
+    if actual != expected or not reused or testResult.elapsed > 20:
+        print(f"Test failed: {actual}")
+        os._exit(1)
@@ -0,0 +1,49 @@
+import time
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+from conclave.history_store import HistoryStore
+from conclave.scheduling_policy import CriticalPathFirstPolicy, SchedulingPolicy
+
+@Step(pattern="^sleep for (\d+) seconds$")
+def sleepStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"sleep for {match.group(1)} seconds")
+    time.sleep(int(match.group(1)))
+
+class HalfPolicy(SchedulingPolicy):
+
+    """
+    A policy that does not implement priority
+    """
+    pass
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    # a policy without priority fails when it is created instead of when a task is dispatched
+    try:
+        HalfPolicy()
+        print(f"Test failed")
+        os._exit(1)
+    except TypeError as e:
+        print(f"policy without priority: {e}")
+    store = HistoryStore("scheduling_history.db")
+    tr = TaskRunner(debugMode=True,schedulingPolicy=CriticalPathFirstPolicy(),historyStore=store)
+    testResult = tr.run(["scheduling_policy.feature"])
+
+    print("\nprogram elapsed time :", testResult.elapsed)
+
+    for stats in store.getScenarioStats():
+        print(f"scenario: {stats.name} runs: {stats.runs} p50: {stats.p50} p95: {stats.p95} failure rate: {stats.failureRate}")
+
+    tr.generateTimeline()
+
+    if not testResult.success:
+        print(f"Test failed")
+        os._exit(1)
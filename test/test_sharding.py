@@ -0,0 +1,58 @@
+import time
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+@Step(pattern="^run shard step$")
+def runShardStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"run shard step")
+    time.sleep(0.5)
+
+def shardOf(shards, name):
+    return [i for i,names in enumerate(shards) if name in names]
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    shards = []
+    for index in range(2):
+        tr = TaskRunner(debugMode=True,maxProcesses=1)
+        testResult = tr.run(TaskRunnerConfig(featureFiles=["sharding.feature"],shardIndex=index,shardCount=2))
+        tr.saveShardResult(f"shard_result_{index}.json")
+        shards.append([t["name"] for t in tr.taskReport])
+        print(f"shard {index}: {shards[index]}")
+
+    merger = TaskRunner()
+    testResult = merger.mergeShardResults(["shard_result_0.json","shard_result_1.json"])
+    merger.generateTimeline()
+    merger.generateReport()
+    merger.generateJUnitReport()
+    merged = [t["name"] for t in merger.taskReport]
+    print(f"merged: {merged}")
+
+    failed = not testResult.success or len(merged) != 8 or len(set(merged)) != 8
+    failed = failed or shardOf(shards, "first of chain") != shardOf(shards, "second of chain")
+    failed = failed or shardOf(shards, "grouped scenario") != shardOf(shards, "depends on group")
+    failed = failed or shardOf(shards, "prepare environment") != [0,1] or shardOf(shards, "clean environment") != [0,1]
+    failed = failed or any(len(shardOf(shards, name)) != 1 for name in ("independent scenario 1","independent scenario 2","first of chain","grouped scenario"))
+    failed = failed or not all(len(s) > 2 for s in shards)
+
+    # a suite without @concurrent or @parallel tags is spread over the shards as well
+    sequential = []
+    for index in range(2):
+        tr = TaskRunner(debugMode=True)
+        testResult = tr.run(TaskRunnerConfig(featureFiles=["sharding_sequential.feature"],shardIndex=index,shardCount=2))
+        sequential.append([t["name"] for t in tr.taskReport])
+        failed = failed or not testResult.success
+        print(f"sequential shard {index}: {sequential[index]}")
+    failed = failed or not all(sequential) or sorted(sum(sequential, [])) != [f"sequential scenario {i}" for i in range(1, 5)]
+    if failed:
+        print(f"Test failed")
+        os._exit(1)
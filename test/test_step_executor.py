@@ -0,0 +1,63 @@
+import sys
+import os
+import threading
+import time
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.step import Step
+from conclave.step_executor import StepExecutor, getStepExecutor
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+running = {}
+lock = threading.Lock()
+
+@Step(pattern="^a shared step$")
+def sharedStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    pid = os.getpid()
+    with lock:
+        running[pid] = running.get(pid, 0) + 1
+        current = running[pid]
+    logger.log(f"running steps: {current} thread: {threading.current_thread().name}")
+    assert threading.current_thread().name.startswith("paraworld-step")
+    assert current <= 2, f"{current} steps running at the same time"
+    time.sleep(0.2)
+    with lock:
+        running[pid] -= 1
+
+@Step(pattern="^a sequential step$")
+def sequentialStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"sequential step")
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    failed = False
+
+    # steps are taken from the scenario queues in turn
+    executor = StepExecutor(maxWorkers=1)
+    order = []
+    gate = threading.Event()
+    executor.submit("blocker", gate.wait)
+    futures = [executor.submit("a", order.append, f"a{i}") for i in range(3)] + [executor.submit("b", order.append, "b0")]
+    cancelled = executor.submit("a", order.append, "cancelled")
+    cancelled.cancel()
+    gate.set()
+    for f in futures:
+        f.result()
+    time.sleep(0.1)
+    print(f"execution order: {order}")
+    failed = failed or order != ["a0","b0","a1","a2"] or len(executor.threads) != 1
+
+    tr = TaskRunner(debugMode=True, maxProcesses=1)
+    testResult = tr.run(TaskRunnerConfig(featureFiles=["step_executor.feature"], maxStepThreads=2))
+    print("\nprogram elapsed time :", testResult.elapsed)
+    tr.generateReport()
+    print(f"step threads: {len(getStepExecutor().threads)}")
+    failed = failed or not testResult.success or len(getStepExecutor().threads) != 2
+    if failed:
+        print(f"Test failed")
+        os._exit(1)
@@ -0,0 +1,85 @@
+import sys
+import os
+import re
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.step import Step
+from conclave.step_definition import StepDefinition
+from conclave.step_index import StepIndex, literalPrefix
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+@Step(pattern="^the indexed step (\\d+)$")
+def indexedStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"indexed step {match.group(1)}")
+
+@Step(pattern="^the ambiguous indexed step$")
+def ambiguousStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"ambiguous step")
+
+@Step(pattern="ambiguous indexed")
+def ambiguousStep2(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    raise Exception("the first registered definition must be used")
+
+def linearSearch(definitions: list[tuple[re.Pattern, StepDefinition]], text: str):
+    for regex,d in definitions:
+        if regex.search(text):
+            return d
+    return None
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    failed = False
+
+    prefixes = {
+        "^I login$": "I login", "^I (login|logout)$": "I ", "^ab?c": "a", "^a+b": "a",
+        "^\\d+ items": "", "^\\$5 total": "$5 total", "I login": "", "^a|b": "", "^(?i)abc": ""
+    }
+    for pattern,expected in prefixes.items():
+        if literalPrefix(pattern) != expected:
+            print(f"wrong prefix for {pattern}: {literalPrefix(pattern)}")
+            failed = True
+
+    # the index must give the same result as a linear search over the definitions
+    definitions = [StepDefinition(f"^user {i} (opens|closes) page (\\d+)$", None) for i in range(2000)]
+    definitions += [StepDefinition("^user 7 opens", None), StepDefinition("page 3$", None), StepDefinition("^(\\w+) waits$", None)]
+    index = StepIndex()
+    for d in definitions:
+        index.add(d)
+    compiled = [(re.compile(d.pattern), d) for d in definitions]
+    texts = [f"user {i} opens page {i % 7}" for i in range(0, 2000, 13)] + ["user 7 opens page 3", "someone waits", "nobody", "user 77 opens page 3"]
+    for text in texts:
+        if index.find(text)[0] is not linearSearch(compiled, text):
+            print(f"wrong definition for '{text}'")
+            failed = True
+
+    # a lookup only runs the patterns of its buckets and the unanchored patterns
+    print(f"buckets of user 7: {index.buckets.get('user 7 ')} {index.buckets.get('user 7 o')}, unanchored: {index.unanchored}")
+    failed = failed or index.buckets.get("user 7 ") != [7] or index.buckets.get("user 7 o") != [2000]
+    failed = failed or index.unanchored != [2001, 2002] or sorted(index.bucketLengths) != [7, 8]
+
+    # lookups are memoized until a definition is added
+    index.memo.clear()
+    first = index.find("user 7 opens page 3")
+    failed = failed or "user 7 opens page 3" not in index.memo or index.find("user 7 opens page 3") is not first
+    index.add(StepDefinition("^nobody$", None))
+    failed = failed or index.memo != {} or index.find("nobody")[0] is not index.definitions[-1][1]
+
+    ambiguous = index.findAmbiguous(["user 7 opens page 3", "user 8 opens page 1"])
+    print(f"ambiguous: {list(ambiguous)}")
+    failed = failed or list(ambiguous) != ["user 7 opens page 3"] or len(ambiguous["user 7 opens page 3"]) != 3
+
+    tr = TaskRunner(debugMode=True)
+    testResult = tr.run(TaskRunnerConfig(featureFiles=["step_index.feature"]))
+    print("\nprogram elapsed time :", testResult.elapsed)
+    tr.generateReport()
+    failed = failed or not testResult.success
+    failed = failed or list(Step.findAmbiguousSteps(["the ambiguous indexed step"])) != ["the ambiguous indexed step"]
+    failed = failed or Step.getStep("the indexed step 3")[1].group(1) != "3"
+    if failed:
+        print(f"Test failed")
+        os._exit(1)
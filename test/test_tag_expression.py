@@ -0,0 +1,56 @@
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.feature_parser import FeatureParser
+from conclave.tag_index import TagIndex
+from conclave.tag_expression import TagExpression
+from conclave.step import Step
+from conclave.world import World
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+@Step(pattern="^tagged step$")
+def taggedStep(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"tagged step")
+
+def names(index: TagIndex, expression: str):
+    return [s.scenario["name"] for s in index.select(expression)]
+
+if __name__ == '__main__':
+    index = TagIndex.fromDocuments(FeatureParser().parseFiles([os.path.abspath("tag_expression.feature")]))
+    print(f"tags: {index.getTags()}")
+
+    expected = {
+        "@smoke": ["smoke scenario", "slow smoke scenario"],
+        "@smoke and not @slow": ["smoke scenario"],
+        "not @smoke and not @slow": ["untagged scenario"],
+        "@checkout and not (@smoke or @slow)": ["untagged scenario"],
+        "@slow or @smoke and not @slow": ["smoke scenario", "slow smoke scenario", "slow scenario"],
+        "@unknown": [],
+        "@checkout": ["smoke scenario", "slow smoke scenario", "slow scenario", "untagged scenario"],
+    }
+    failed = False
+    for expression,scenarios in expected.items():
+        print(f"{expression}: {names(index, expression)}")
+        failed = failed or names(index, expression) != scenarios
+        # evaluating the expression per scenario gives the same selection as the index
+        failed = failed or [s.scenario["name"] for s in index.scenarios if TagExpression(expression).evaluate(s.tags)] != scenarios
+
+    for invalid in ["@smoke and", "(@smoke", "smoke", "@smoke @slow"]:
+        try:
+            TagExpression(invalid)
+            print(f"invalid expression accepted: {invalid}")
+            failed = True
+        except ValueError as e:
+            print(f"{e}")
+
+    tr = TaskRunner(debugMode=True)
+    testResult = tr.run(TaskRunnerConfig(featureFiles=["tag_expression.feature"],tagExpression="@smoke and not @slow"))
+    failed = failed or not testResult.success or [t["name"] for t in tr.taskReport] != ["smoke scenario"] or len(tr.mainTasks) != 1
+
+    if failed:
+        print(f"Test failed")
+        os._exit(1)
@@ -0,0 +1,56 @@
+import time
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.task_runner_config import TaskRunnerConfig
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+from conclave.junit_report import JUnitReport
+
+@Step(pattern="^log (\\d+) lines$")
+def logLines(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    for i in range(int(match.group(1))):
+        logger.log(f"line {i}")
+
+def testAppend() -> bool:
+    # appending many messages must not copy the whole log every time
+    logger = TaskLogger("append")
+    start = time.time()
+    for i in range(200000):
+        logger.log(f"message {i}")
+    elapsed = time.time() - start
+    print(f"200000 messages logged in {elapsed} (s)")
+    capped = TaskLogger("capped", 100)
+    for i in range(1000):
+        capped.log(f"message {i}")
+    msg = capped.msg
+    print(f"capped log: {msg}")
+    return elapsed < 10 and logger.msg.count("\n") == 200000 and msg.startswith("[") and msg.endswith("message 999\n") and "characters truncated" in msg
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    failed = not testAppend()
+    maxLogSize = 10000
+    tr = TaskRunner(debugMode=False,maxProcesses=1)
+    testResult = tr.run(TaskRunnerConfig(featureFiles=["task_logger.feature"],maxLogSize=maxLogSize,logDir="reports/logs"))
+    tr.generateJUnitReport("reports/logger_junit.xml")
+    failed = failed or not testResult.success or len(tr.taskReport) != 2
+    for t in tr.taskReport:
+        result = t["scenario"]
+        with open(result.logFile, "r", encoding='utf8') as fh:
+            lines = fh.read().count(" line ")
+        expected = 40000 if t["id"] == "chatty" else 20000
+        print(f"{t['name']}: message {len(result.message)} characters, log file {result.logFile} with {lines} lines")
+        failed = failed or len(result.message) > maxLogSize + 100 or "characters truncated" not in result.message
+        failed = failed or lines != expected or os.path.basename(result.logFile) != f"{t['id']}.log"
+        failed = failed or any(len(s["log"]) > maxLogSize + 100 for s in result.steps)
+    with open("reports/logger_junit.xml", "r", encoding='utf8') as fh:
+        failed = failed or fh.read().count("[[ATTACHMENT|") != 2
+    if failed:
+        print(f"Test failed")
+        os._exit(1)
@@ -0,0 +1,17 @@
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+import multiprocessing
+from worker_steps import setupWorker
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    tr = TaskRunner(debugMode=True,startMethod="forkserver",maxProcesses=2,preloadModules=["worker_steps"],workerInitializer=setupWorker,workerInitArgs=("test",))
+    testResult = tr.run(["worker_initializer.feature"])
+
+    print("\nprogram elapsed time :", testResult.elapsed)
+
+    if not testResult.success:
+        print(f"Test failed")
+        os._exit(1)
@@ -0,0 +1,141 @@
+import asyncio
+import threading
+import time
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.step import Step
+from conclave.world import World
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+@Step(pattern="^produce (\\d+) items$")
+def produce(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    for i in range(int(match.group(1))):
+        world.setProp(f"item{i}", i * i)
+
+@Step(pattern="^consume (\\d+) items$")
+def consume(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    for i in range(int(match.group(1))):
+        value = world.waitFor(f"item{i}", timeout=60)
+        if value != i * i:
+            raise Exception(f"item{i}: {value}")
+
+@Step(pattern="^update counters (\\d+) times$")
+def updateCounters(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    for _ in range(int(match.group(1))):
+        world.increment("increments")
+        while True:
+            value = world.getProp("swaps")
+            if world.compareAndSet("swaps", value, (value or 0) + 1):
+                break
+        # a read-modify-write with getProp and setProp is safe under the lock
+        with world.lock("locked", timeout=60):
+            world.setProp("locked", (world.getProp("locked") or 0) + 1)
+
+def testLocal() -> bool:
+    world = World()
+    failed = world.setdefault("default", 1) != 1 or world.setdefault("default", 2) != 1
+    failed = failed or world.compareAndSet("cas", 1, 2) or not world.compareAndSet("cas", None, 1) or world.getProp("cas") != 1
+    failed = failed or world.increment("inc", 5) != 5 or world.increment("inc") != 6 or world.getProp("inc") != 6
+    start = time.time()
+    try:
+        world.waitFor("never", timeout=0.2)
+        failed = True
+    except TimeoutError:
+        failed = failed or time.time() - start < 0.2
+    with world.lock("local"):
+        # the lock is held by this thread so another thread can not acquire it
+        acquired = []
+        thread = threading.Thread(target=lambda: acquired.append(world.lock("local").acquire(timeout=0.2)))
+        thread.start()
+        thread.join()
+        failed = failed or acquired != [False]
+    lock = world.lock("local")
+    failed = failed or not lock.acquire(timeout=0)
+    try:
+        world.lock("local").release()
+        failed = True
+    except ValueError:
+        pass
+    lock.release()
+    return not failed
+
+async def holdAsync(world: World, order: list):
+    async with world.lock("async", timeout=5):
+        order.append("holder")
+        await asyncio.sleep(0.5)
+
+async def waitAsync(world: World, order: list):
+    await asyncio.sleep(0.1)
+    async with world.lock("async", timeout=5):
+        order.append("waiter")
+    order.append(await world.waitForAsync("async", timeout=5))
+
+async def tick(ticks: list):
+    for _ in range(10):
+        await asyncio.sleep(0.05)
+        ticks.append(time.time())
+
+async def setAsync(world: World):
+    await asyncio.sleep(0.8)
+    world.setProp("async", "set")
+
+def testAsync() -> bool:
+    """
+    Coroutines on the same event loop wait for each other's lock and keep the loop running
+    while they wait
+    """
+    world = World()
+    order,ticks = [],[]
+    async def main():
+        await asyncio.gather(holdAsync(world, order), waitAsync(world, order), tick(ticks), setAsync(world))
+    asyncio.run(main())
+    print(f"async order: {order}, ticks: {len(ticks)}")
+    return order == ["holder", "waiter", "set"] and len(ticks) == 10 and ticks[-1] - ticks[0] < 1
+
+def holdLock(world: World, name: str):
+    world.lock(name).acquire()
+    world.setProp(f"{name}Held", True)
+    time.sleep(60)
+
+def testDeadOwner() -> bool:
+    """
+    A lock held by a process that was terminated is released for the next owner
+    """
+    world = World()
+    process = multiprocessing.get_context("spawn").Process(target=holdLock, args=(world, "dead"))
+    process.start()
+    world.waitFor("deadHeld", timeout=60)
+    # the lock is waited for before and after the process is terminated
+    locks = [world.lock("dead"), world.lock("dead")]
+    acquired = []
+    thread = threading.Thread(target=lambda: acquired.append(locks[0].acquire(timeout=10)))
+    thread.start()
+    time.sleep(0.5)
+    process.terminate()
+    process.join()
+    thread.join()
+    if acquired == [True]:
+        locks[0].release()
+    acquired.append(locks[1].acquire(timeout=10))
+    print(f"lock of terminated process acquired: {acquired}")
+    if acquired[-1]:
+        locks[1].release()
+    return acquired == [True, True]
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    failed = not testLocal() or not testAsync() or not testDeadOwner()
+    tr = TaskRunner(debugMode=False,maxProcesses=4)
+    testResult = tr.run(["world_atomic.feature"])
+    world = World()
+    counters = [world.getProp("increments"), world.getProp("swaps"), world.getProp("locked")]
+    print(f"counters: {counters}")
+    print("\nprogram elapsed time :", testResult.elapsed)
+    if failed or not testResult.success or counters != [800, 800, 800]:
+        print(f"Test failed")
+        os._exit(1)
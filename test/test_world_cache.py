@@ -0,0 +1,94 @@
+import time
+import sys
+import os
+from typing import Match
+sys.path.append(os.path.join(os.path.dirname(__file__),'../'))
+from conclave.task_runner import TaskRunner
+from conclave.step import Step
+from conclave.world import World, _caches, _PropCache
+from multiprocessing.shared_memory import SharedMemory
+import multiprocessing
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+@Step(pattern="^set prop ready$")
+def setReady(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    world.setProp("config", {"retries": 3})
+    world.setProp("ready", True)
+
+@Step(pattern="^wait for prop ready$")
+def waitReady(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    deadline = time.time() + 60
+    while not world.getProp("ready"):
+        if time.time() > deadline:
+            raise Exception("ready was not set")
+        time.sleep(0.01)
+
+@Step(pattern="^write prop (\\w+) up to (\\d+)$")
+def writeProp(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    for i in range(1, int(match.group(2)) + 1):
+        world.setProp(match.group(1), i)
+        time.sleep(0.01)
+
+@Step(pattern="^read prop (\\w+) until (\\d+)$")
+def readPropUntil(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    deadline = time.time() + 60
+    last = None
+    while world.getProp(match.group(1)) != int(match.group(2)):
+        value = world.getProp(match.group(1))
+        if value is not None and last is not None and value < last:
+            raise Exception(f"read {value} after {last}")
+        last = value if value is not None else last
+        if time.time() > deadline:
+            raise Exception(f"last value read: {last}")
+
+@Step(pattern="^read prop (\\w+) (\\d+) times$")
+def readProp(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    start = time.time()
+    for _ in range(int(match.group(2))):
+        if world.getProp(match.group(1)) != {"retries": 3}:
+            raise Exception("unexpected value")
+    elapsed = time.time() - start
+    logger.log(f"read {match.group(2)} props in {elapsed} (s)")
+    if elapsed > 2:
+        raise Exception(f"reading cached props took {elapsed} (s)")
+
+def testLocal() -> bool:
+    world = World()
+    failed = world.getProp("missing") is not None
+    world.setProp("local", 1)
+    failed = failed or world.getProp("local") != 1
+    world.setProp("local", 2)
+    failed = failed or world.getProp("local") != 2
+    # more writes than the store remembers drop the whole cache
+    for i in range(10050):
+        world.setProp(f"key{i % 10}", i)
+    failed = failed or world.getProp("local") != 2 or world.getProp("key9") != 10049
+    return not failed
+
+def testRelease() -> bool:
+    """
+    Releasing a World closes and drops the prop cache of the process and tolerates a
+    segment that was already unlinked
+    """
+    memory = SharedMemory(create=True, size=8)
+    cache = _caches[(os.getpid(), memory.name)] = _PropCache(memory.name)
+    World._World__release(memory, memory.name)
+    failed = (os.getpid(), memory.name) in _caches or cache.memory.buf is not None
+    memory = SharedMemory(create=True, size=8)
+    memory.unlink()
+    try:
+        World._World__release(memory, memory.name)
+    except FileNotFoundError:
+        failed = True
+    return not failed
+
+if __name__ == '__main__':
+    print(f"cpu count: {multiprocessing.cpu_count()}")
+    failed = not testLocal() or not testRelease()
+    tr = TaskRunner(debugMode=False,maxProcesses=2)
+    testResult = tr.run(["world_cache.feature"])
+    print("\nprogram elapsed time :", testResult.elapsed)
+    if failed or not testResult.success:
+        print(f"Test failed")
+        os._exit(1)
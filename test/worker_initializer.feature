@@ -0,0 +1,15 @@
+Feature: Worker initializer
+
+    Test that parallel workers are initialized once with preloaded step definitions
+
+    @parallel
+    Scenario: scenario 1
+        Then the worker has been initialized
+
+    @parallel
+    Scenario: scenario 2
+        Then the worker has been initialized
+
+    @parallel
+    Scenario: scenario 3
+        Then the worker has been initialized
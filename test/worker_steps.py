@@ -0,0 +1,18 @@
+import os
+from typing import Match
+from conclave.step import Step
+from conclave.world import World
+from conclave.task_logger import TaskLogger
+from conclave.scenario_scope import ScenarioScope
+
+workerSetup = {}
+
+def setupWorker(name: str):
+    workerSetup["name"] = name
+    workerSetup["pid"] = os.getpid()
+
+@Step(pattern="^the worker has been initialized$")
+def workerInitialized(logger: TaskLogger, world: World,match: Match[str], context: ScenarioScope):
+    logger.log(f"worker setup: {workerSetup}")
+    if workerSetup.get("pid") != os.getpid():
+        raise Exception(f"worker was not initialized in process {os.getpid()}")
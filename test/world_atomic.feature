@@ -0,0 +1,27 @@
+Feature: Atomic world operations
+
+    Test that scenarios in threads and processes coordinate through atomic world operations
+
+    @parallel
+    Scenario: producer
+        Then produce 20 items
+
+    @parallel
+    Scenario: consumer
+        Then consume 20 items
+
+    @parallel
+    Scenario: counter in process 1
+        Then update counters 200 times
+
+    @parallel
+    Scenario: counter in process 2
+        Then update counters 200 times
+
+    @concurrent
+    Scenario: counter in thread 1
+        Then update counters 200 times
+
+    @concurrent
+    Scenario: counter in thread 2
+        Then update counters 200 times
@@ -0,0 +1,14 @@
+Feature: World cache
+
+    Test that props read from the World are cached and writes are seen by other processes
+
+    @parallel
+    Scenario: write props
+        Given wait for prop ready
+        Then write prop counter up to 50
+
+    @parallel
+    Scenario: read props
+        Given set prop ready
+        Then read prop counter until 50
+        Then read prop config 20000 times